@@ -4,6 +4,7 @@ from rdflib import Namespace, ConjunctiveGraph, Graph
 from rdflib.namespace import DC, DCTERMS, FOAF, XSD, RDFS, RDF
 
 from extended_nanopub.namespaces import NP
+from .NamespaceRegistry import NamespaceRegistry
 
 
 class CommonNanopub:
@@ -20,6 +21,10 @@ class CommonNanopub:
         self.config.optionxform = str
         self.config.read(path_to_properties)
 
+        # Namespaces and terms shared by all the nanopublications
+        self.registry = NamespaceRegistry(self.config['NAMESPACES'])
+        self.bound_graph = None
+
         # Data directory path
         self.datadir = self.config['PATHS']['datadir']
         self.ontoPath = self.datadir + self.config["PATHS.ONTOLOGY"]["ontology"]
@@ -28,9 +33,7 @@ class CommonNanopub:
         """
         Create a dictionary with ('namespace_id', URL) of each namespace defined in the classification class.
         """
-        self.namespaces = {nid: Namespace(uri) for nid, uri in self.config['NAMESPACES'].items()}
-        self.namespaces["this"] = Namespace(self.namespaces["npuri"] + nanopub_id)
-        self.namespaces["sub"] = Namespace(self.namespaces["npuri"] + nanopub_id + "#")
+        self.namespaces = self.registry.nanopub_namespaces(self.registry.namespaces["npuri"], nanopub_id)
 
     def read_data(self):
         """
@@ -78,26 +81,26 @@ class CommonNanopub:
         # Get useful namespaces
         # self.get_namespaces()
         graph_name = self.namespaces["sub"][identifier]
-        graph = Graph(store=self.nanopub_graph.store, identifier=graph_name)
-
-        # Bind the imported namespaces (from rdflib.namespace) to a prefix for more readable output
-        graph.bind("foaf", FOAF)
-        graph.bind("xsd", XSD)
-        graph.bind("rdfs", RDFS)
-        graph.bind("rdf", RDF)
-        graph.bind("dc", DC)
-        graph.bind("dcterms", DCTERMS)
-
-        # Bind the external ontologies
-        for nid, uri in self.namespaces.items():
-            graph.bind(nid, Namespace(uri))
+        # The graphs of a nanopublication share the store and the namespace manager of the named graph
+        graph = Graph(store=self.nanopub_graph.store, identifier=graph_name,
+                      namespace_manager=self.nanopub_graph.namespace_manager)
+
+        if self.bound_graph is not self.nanopub_graph:
+            # Bind the imported namespaces (from rdflib.namespace) and the external ontologies to a prefix for more
+            # readable output, once per nanopublication
+            nanopub_bindings = (("this", self.namespaces["this"]), ("sub", self.namespaces["sub"]))
+            for nid, uri in self.registry.bindings + nanopub_bindings:
+                graph.bind(nid, uri)
+            self.bound_graph = self.nanopub_graph
 
         return graph
 
-    def initializeNanopubGraphs(self):
+    def initializeNanopubGraphs(self, knowledge_prov=True):
         """
         Initialize all components of the extended_nanopub.
         :param self: self object.
+        :param knowledge_prov: (bool) whether the nanopublication has a knowledge provenance graph (linked from the
+        head), otherwise it has the four graphs of a plain nanopublication.
         """
         # Initialize Head Graph
         self.head_graph = self.initializeGraph(f"head")
@@ -121,17 +124,18 @@ class CommonNanopub:
         self.head_graph.add((
             self.nanopub_graph.identifier,
             NP.hasPublicationInfo,
-            self.namespaces["sub"]["publicationInfo"],
-        ))
-        self.head_graph.add((
-            self.nanopub_graph.identifier,
-            NP.hasKnowledgeProv,
-            self.namespaces["sub"]["knowledgeProv"],
+            self.namespaces["sub"]["pubinfo"],
         ))
+        if knowledge_prov:
+            self.head_graph.add((
+                self.nanopub_graph.identifier,
+                NP.hasKnowledgeProv,
+                self.namespaces["sub"]["knowledgeprov"],
+            ))
 
         # Initialize all components
         self.assertion_graph = self.initializeGraph(f"assertion")
         self.pubinfo_graph = self.initializeGraph(f"pubinfo")
         self.provenance_graph = self.initializeGraph(f"provenance")
-        self.knowledgeprov_graph = self.initializeGraph(f"knowledgeprov")
+        self.knowledgeprov_graph = self.initializeGraph(f"knowledgeprov") if knowledge_prov else None
 
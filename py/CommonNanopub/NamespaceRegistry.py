@@ -0,0 +1,52 @@
+from functools import lru_cache, partial
+from types import MappingProxyType
+
+from rdflib import Namespace, URIRef
+from rdflib.namespace import DC, DCTERMS, FOAF, XSD, RDFS, RDF
+
+
+class InternedNamespace(Namespace):
+    """
+    Namespace returning the same URIRef for the terms requested repeatedly (e.g., predicates and classes) instead of
+    creating a new one for every nanopublication.
+    """
+
+    def __new__(cls, value, cache_size=4096):
+        namespace = super().__new__(cls, value)
+        namespace.term = lru_cache(maxsize=cache_size)(partial(Namespace.term, namespace))
+        return namespace
+
+
+class NamespaceRegistry:
+    """
+    Namespaces and terms shared by all the nanopublications of a run, computed once from the NAMESPACES section
+    of the properties file. Only the namespaces of each nanopublication (this and sub) are created per nanopub.
+    """
+
+    # namespaces imported from rdflib.namespace bound in every graph
+    RDFLIB_BINDINGS = (("foaf", FOAF), ("xsd", XSD), ("rdfs", RDFS), ("rdf", RDF), ("dc", DC), ("dcterms", DCTERMS))
+
+    def __init__(self, config_namespaces, term_cache_size=1 << 16):
+        """
+        Initialisation function.
+
+        :param config_namespaces: (dict) URI of each namespace defined in the property files.
+        :param term_cache_size: (int) number of URIRefs (e.g., genes and diseases) kept by term.
+        """
+        self.namespaces = MappingProxyType({nid: InternedNamespace(uri) for nid, uri in config_namespaces.items()})
+        # prefixes bound in every graph, followed by the namespaces of each nanopublication (see nanopub_namespaces)
+        self.bindings = self.RDFLIB_BINDINGS + tuple(self.namespaces.items())
+        self.term = lru_cache(maxsize=term_cache_size)(URIRef)
+
+    def nanopub_namespaces(self, base, nanopub_id):
+        """
+        Namespaces of a nanopublication: the shared namespaces, this and sub.
+
+        :param base: (str) URI of the namespace of the nanopublications.
+        :param nanopub_id: (str) identifier of the nanopublication.
+        :return: (dict) namespaces of the nanopublication.
+        """
+        namespaces = dict(self.namespaces)
+        namespaces["this"] = Namespace(base + nanopub_id)
+        namespaces["sub"] = Namespace(base + nanopub_id + "#")
+        return namespaces
@@ -1,8 +1,67 @@
+import os
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
 import pandas as pd
 from CommonNanopub.CommonNanopub import CommonNanopub
-from rdflib import Namespace, ConjunctiveGraph
+from extended_nanopub import Profile, load_profile
+from extended_nanopub.sign_utils import load_signer
+from extended_nanopub.store import new_graph
+from Logger import ProgressReporter, StageProfiler
+
+from .bundle import NanopubBundleWriter
+from .delta import compute_delta, fingerprint_facts
+from .direct_writer import DirectNanopubWriter
+from .evidence import EvidenceIndex
+from .manifest import INPUT_COLUMNS, fingerprint_files, fingerprint_nanopubs, read_manifest, write_manifest
+from .utils import _extractGCSID, process_gcs, classify_truth_values
+
+# CoreNanopub object shared with the worker processes, which inherit it (data and evidence index included) when the
+# pool is forked instead of receiving it with every task
+_worker_nanopub = None
+
+
+def _serialize_chunk(chunk):
+    """
+    Create and serialize the nanopubs of a chunk of GCS facts in a worker process.
 
-from .utils import _extractGCSID, process_gcs
+    :param chunk: (tuple(int, int)) start and end position of the chunk in the gcs table.
+    :return: (int, dict, list(tuple(str, str)), list(tuple(str, str, bytes)), list(tuple(str, str)), dict) number
+        of serialized nanopubs, progress counters, errors (GCS id and error message), with the bundle output, blocks
+        of the chunk, when signing, local and trusty URI of the signed nanopubs and the stages recorded by the
+        profiler.
+    """
+    start, end = chunk
+    nanopub = _worker_nanopub
+    # progress is aggregated and logged by the parent process
+    nanopub.progress = ProgressReporter(nanopub.logger, "Serialized nanopublications", unit="nanopubs",
+                                        interval=float("inf"))
+    nanopub.errors = []
+    nanopub.trusty_uris = []
+    nanopub.profiler.reset()
+    if nanopub.bundles is not None:
+        nanopub.pending_blocks = []
+    nanopub.gcs.iloc[start:end].apply(nanopub._tryCreateNanopub, axis=1)
+    return nanopub.progress.done, dict(nanopub.progress.counters), nanopub.errors, nanopub.pending_blocks, \
+        nanopub.trusty_uris, nanopub.profiler.stats()
+
+
+def _read_chunks(path, chunk_size):
+    """
+    Read a csv or parquet table in chunks.
+
+    :param path: (str) path to the table.
+    :param chunk_size: (int) number of rows per chunk.
+    :return: (iterator(pandas.DataFrame)) chunks of the table.
+    """
+    if path.endswith(".parquet"):
+        # pyarrow is only required by the parquet tables
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, index_col=False, chunksize=chunk_size)
 
 
 class CoreNanopub(CommonNanopub):
@@ -20,10 +79,30 @@ class CoreNanopub(CommonNanopub):
         :param sample: (bool) whether to consider a sample or the full dump.
         """
         self.serialization_formats = self.config["SERIALIZATION"]["formats"].split(",")
+        self.serialization_engine = self.config["SERIALIZATION"].get("engine", "rdflib")
+        self.verify_serialization = self.config["SERIALIZATION"].getboolean("verify", fallback=False)
+        if self.serialization_engine == "direct":
+            self.direct_writer = DirectNanopubWriter(self.config["NAMESPACES"])
+        # rdflib store of the graphs of each nanopub (rdflib engine)
+        self.compact_store = self.config["SERIALIZATION"].get("store", "default") == "compact"
+        self.serialization_output = self.config["SERIALIZATION"].get("output", "files")
+        self.bundle_compression = self.config["SERIALIZATION"].get("compression", "none")
+        # fixed creation time of the nanopubs (e.g., the release date of the dump), otherwise the serialization time
+        created = self.config["SERIALIZATION"].get("created", "")
+        self.fixed_created = datetime.fromisoformat(created) if created else None
+        self.skip_unchanged = self.config["SERIALIZATION"].getboolean("skip_unchanged", fallback=False)
+        if self.skip_unchanged and self.fixed_created is None:
+            raise ValueError("skip_unchanged requires a fixed creation time of the nanopubs (SERIALIZATION.created)")
+        if self.skip_unchanged and self.serialization_output != "files":
+            raise ValueError("skip_unchanged is only supported with the files output")
         serialization_prop = "PATHS.SERIALIZATION.SAMPLE" if sample else "PATHS.SERIALIZATION"
         self.serialization_path = {}
         for ser_format in self.serialization_formats:
             self.serialization_path[ser_format] = self.datadir + self.config[serialization_prop][ser_format]
+        self.manifest_path = self.datadir + self.config[serialization_prop]["manifest"]
+        self.partition_path = self.config["PATHS.DATASET"]["partitions"]
+        self.trusty_uris_path = self.datadir + self.config[serialization_prop]["trusty_uris"]
+        self.profiling_path = self.datadir + self.config[serialization_prop]["profiling"]
         if sample:
             self.gcs_path = self.config["PATHS.DATASET"]["gcs_sample"]
             self.gcs_sentence_path = self.config["PATHS.DATASET"]["gcs_sentence_sample"]
@@ -31,19 +110,79 @@ class CoreNanopub(CommonNanopub):
             self.gcs_path = self.config["PATHS.DATASET"]["gcs"]
             self.gcs_sentence_path = self.config["PATHS.DATASET"]["gcs_sentence"]
 
+    def set_signing(self):
+        """
+        Load the RSA key pair signing the nanopubs (SIGNING section, otherwise the keys of the local nanopub profile).
+        The private key is imported once and shared with the worker processes.
+        """
+        private_key = self.config["SIGNING"].get("private_key", "")
+        if private_key:
+            public_key = self.config["SIGNING"].get("public_key", "")
+            self.profile = Profile(name="", orcid_id="", private_key=Path(private_key),
+                                   public_key=Path(public_key) if public_key else None)
+        else:
+            self.profile = load_profile()
+        self.signer = load_signer(self.profile)
+
+    def set_profiling(self, profile):
+        """
+        Set up the instrumentation of the stages of the serialization (PROFILING section), reported at the end of
+        create_nanopub_graphs.
+
+        :param profile: (bool) whether to profile the stages even if PROFILING.enabled is false.
+        """
+        profiling = self.config["PROFILING"]
+        self.profiler = StageProfiler(self.logger, enabled=profile or profiling.getboolean("enabled", fallback=False),
+                                      memory=profiling.getboolean("memory", fallback=False),
+                                      snapshot_every=profiling.getint("snapshot_every", fallback=0),
+                                      snapshot_dir=self.profiling_path + "snapshots/")
+
+    def store_trusty_uris(self):
+        """
+        Store the trusty URI of each signed nanopub (columns uri and trusty_uri, as the published_uris file), keeping
+        the ones of the previous runs for the nanopubs not signed again.
+        """
+        trusty_uris = pd.DataFrame(self.trusty_uris, columns=["uri", "trusty_uri"])
+        if os.path.exists(self.trusty_uris_path):
+            previous = pd.read_csv(self.trusty_uris_path, index_col=False, dtype=str)
+            trusty_uris = pd.concat([previous.loc[~previous["uri"].isin(trusty_uris["uri"])], trusty_uris])
+        trusty_uris.to_csv(self.trusty_uris_path, index=False)
+        self.logger.info(f"Trusty URIs of {len(self.trusty_uris)} signed nanopublications stored at "
+                         f"{self.trusty_uris_path}")
+
     def read_data(self):
         """
         Read csv files into dataframes.
 
+        Parquet files (see prepare_dataset.columnar) are memory-mapped and already contain the GCS ids.
+        Sentences are also grouped by GCS in an evidence index, used to retrieve the sentences of each nanopub.
+
         :param self: self object.
         """
+        self.gcs, self.gcs_sentence = self.read_tables(self.gcs_path, self.gcs_sentence_path)
+        self.evidence = EvidenceIndex(self.gcs_sentence)
+
+    def read_tables(self, gcs_path, gcs_sentence_path):
+        """
+        Read the GCS facts and their sentences.
 
-        self.gcs = pd.read_csv(self.datadir+self.gcs_path, index_col=False)
-        self.gcs["gcs_uri"] = self.gcs["id"]
-        # self.gcs["id"] = self.gcs["id"].apply(lambda x: x.lstrip("http://gda.dei.unipd.it/cecore/resource/GCS#"))
-        self.gcs["id"] = self.gcs["id"].apply(_extractGCSID)
-        self.gcs.set_index("id", inplace=True)
-        self.gcs_sentence = pd.read_csv(self.datadir+self.gcs_sentence_path, index_col=False)
+        :param gcs_path: (str) path to the GCS facts (csv or parquet), relative to the data directory.
+        :param gcs_sentence_path: (str) path to the sentences (csv or parquet), relative to the data directory.
+        :return: (pandas.DataFrame, pandas.DataFrame) GCS facts indexed by GCS id and their sentences.
+        """
+        if gcs_path.endswith(".parquet"):
+            gcs = pd.read_parquet(self.datadir+gcs_path, engine="pyarrow", memory_map=True)
+        else:
+            gcs = pd.read_csv(self.datadir+gcs_path, index_col=False)
+            gcs["gcs_uri"] = gcs["id"]
+            # gcs["id"] = gcs["id"].apply(lambda x: x.lstrip("http://gda.dei.unipd.it/cecore/resource/GCS#"))
+            gcs["id"] = gcs["id"].apply(_extractGCSID)
+        gcs.set_index("id", inplace=True)
+        if gcs_sentence_path.endswith(".parquet"):
+            gcs_sentence = pd.read_parquet(self.datadir+gcs_sentence_path, engine="pyarrow", memory_map=True)
+        else:
+            gcs_sentence = pd.read_csv(self.datadir+gcs_sentence_path, index_col=False)
+        return gcs, gcs_sentence
 
     def process_data(self):
         """
@@ -57,14 +196,83 @@ class CoreNanopub(CommonNanopub):
         self.logger.info(f"Dropped {len(self.invalidGCS)} inconclusive GCS facts - "
                          f"{len(self.gcs.index)} GCS facts remaining (originally {original_len})")
 
+    def classify_data(self):
+        """
+        Assign the truth value of all the GCS facts, checking that UNCERTAIN facts are consistent with their
+        likelihoods before serializing any nanopub.
+
+        :raises ValueError: if some UNCERTAIN facts should have been assigned a gene type.
+        """
+        truth_values, inconsistent = classify_truth_values(self.gcs)
+        if len(inconsistent.index) > 0:
+            for gcs_id, description in inconsistent.items():
+                self.logger.error(f"GCS {gcs_id} {description}")
+            raise ValueError(f"{len(inconsistent.index)} GCS facts deemed as \"UNRELIABLE\" are inconsistent with "
+                             f"their likelihoods (e.g., GCS {inconsistent.index[0]} {inconsistent.iloc[0]})")
+        self.gcs = self.gcs.join(truth_values)
+
+    def select_delta(self, updates=False):
+        """
+        Keep only the GCS facts added or changed since the previous release (PATHS.DATASET.previous_gcs and
+        PATHS.DATASET.previous_gcs_sentence), comparing the processed facts and their sentences by GCS id.
+
+        :param updates: (bool) whether the nanopubs of changed facts supersede the previous ones.
+        """
+        previous_gcs, previous_gcs_sentence = self.read_tables(self.config["PATHS.DATASET"]["previous_gcs"],
+                                                               self.config["PATHS.DATASET"]["previous_gcs_sentence"])
+        previous_gcs = previous_gcs.loc[~previous_gcs.index.isin(process_gcs(previous_gcs))]
+        added, self.removedGCS, changed = compute_delta(fingerprint_facts(previous_gcs, previous_gcs_sentence),
+                                                        fingerprint_facts(self.gcs, self.gcs_sentence))
+        self.logger.info(f"Delta with the previous release: {len(added)} added, {len(self.removedGCS)} removed, "
+                         f"{len(changed)} changed GCS facts - {len(self.gcs.index) - len(added) - len(changed)} "
+                         f"unchanged GCS facts skipped")
+        self.gcs = self.gcs.loc[self.gcs.index.isin(added + changed)]
+        if updates:
+            self.supersededGCS = set(changed)
+            self.publishedURIs = self.read_published_uris()
+
+    def skip_serialized(self):
+        """
+        Skip the GCS facts whose nanopubs were already serialized by a previous run from the same fact, sentences and
+        settings, according to the manifest of the serialization, as long as their files were not modified or removed
+        since then.
+        """
+        settings = f"{self.fixed_created.isoformat()}|{self.serialization_engine}|{self.sign_nanopubs}"
+        supersedes = {}
+        for gcs_id in self.supersededGCS:
+            published_uri = self.publishedURIs.get(str(self.registry.namespaces["corenp"][gcs_id]))
+            if published_uri is not None:
+                supersedes[gcs_id] = published_uri
+        manifest = fingerprint_nanopubs(self.gcs, self.gcs_sentence, settings, supersedes)
+        self.manifests.append(manifest)
+        _, _, changed = compute_delta(self.previous_manifest[INPUT_COLUMNS], manifest)
+        unchanged = manifest.index.isin(self.previous_manifest.index) & ~manifest.index.isin(changed)
+        # the files of the unchanged nanopubs must be the ones stored by the previous runs
+        candidates = manifest.index[unchanged]
+        unchanged[unchanged] = fingerprint_files(self.serialization_path, candidates) == \
+            self.previous_manifest.loc[candidates, "files"].to_numpy()
+        self.gcs = self.gcs.loc[~unchanged]
+        self.logger.info(f"Manifest {self.manifest_path}: {unchanged.sum()} unchanged nanopublications skipped - "
+                         f"{len(self.gcs.index)} nanopublications to be serialized")
+
+    def read_published_uris(self):
+        """
+        Read the URIs under which the previous nanopubs were published (e.g., their trusty URIs), if available.
+
+        :return: (dict) published URI of each local nanopub URI.
+        """
+        published_path = self.config["PATHS.DATASET"].get("published_uris")
+        if not published_path or not os.path.exists(self.datadir+published_path):
+            return {}
+        published = pd.read_csv(self.datadir+published_path, index_col=False, dtype=str)
+        return dict(zip(published["uri"], published["trusty_uri"]))
+
     def get_namespaces(self, gcs_id):
         """
         Create a dictionary with ('namespace_id', URL) of each namespace defined in the property files.
         """
-        self.namespaces = {nid: Namespace(uri) for nid, uri in self.config['NAMESPACES'].items()}
-        # Add the considered extended_nanopub's namespaces
-        self.namespaces["this"] = Namespace(self.namespaces["corenp"] + gcs_id)
-        self.namespaces["sub"] = Namespace(self.namespaces["corenp"] + gcs_id + "#")
+        # Shared namespaces and the considered extended_nanopub's namespaces
+        self.namespaces = self.registry.nanopub_namespaces(self.registry.namespaces["corenp"], gcs_id)
 
     def initializeFullGraph(self, identifier):
         """
@@ -78,29 +286,259 @@ class CoreNanopub(CommonNanopub):
         self.get_namespaces(identifier)
         # Create the named graph
         graph_name = self.namespaces["corenp"][identifier]
-        self.nanopub_graph = ConjunctiveGraph(identifier=graph_name)
+        self.nanopub_graph = new_graph(self.compact_store, identifier=graph_name)
 
         return self
 
-    def create_nanopub_graphs(self, sample=False):
+    def _tryCreateNanopub(self, gcs_row):
+        """
+        Create the nanopub of a GCS fact, recording the error instead of raising it.
+
+        :param gcs_row: (pandas.Series) row comprise the fact's information.
+        """
+        try:
+            self._createNanopub(gcs_row)
+        except Exception as e:
+            self.errors.append((gcs_row.name, f"{type(e).__name__}: {e}"))
+            self.progress.count(failed=1)
+
+    def create_nanopubs_parallel(self, workers, chunk_size):
+        """
+        Create and serialize the nanopubs with a pool of worker processes, each one processing a chunk of GCS facts
+        at a time.
+
+        :param workers: (int) number of worker processes.
+        :param chunk_size: (int) number of GCS facts per chunk.
+        :raises RuntimeError: if some nanopubs could not be created.
+        """
+        global _worker_nanopub
+        n_gcs = len(self.gcs.index)
+        chunks = [(start, min(start + chunk_size, n_gcs)) for start in range(0, n_gcs, chunk_size)]
+        self.logger.info(f"Serializing {len(chunks)} chunks of {chunk_size} GCS facts with {workers} workers")
+        errors = []
+        _worker_nanopub = self
+        try:
+            with get_context("fork").Pool(workers) as pool:
+                for done, counters, chunk_errors, blocks, trusty_uris, stages in pool.imap_unordered(
+                        _serialize_chunk, chunks):
+                    for name, ser_format, block in blocks or []:
+                        self.bundles[ser_format].append(name, block)
+                    self.progress.update(done, **counters)
+                    errors.extend(chunk_errors)
+                    self.trusty_uris.extend(trusty_uris)
+                    # worker stages overlap in time, hence their seconds may exceed the elapsed time
+                    self.profiler.merge(stages)
+        finally:
+            _worker_nanopub = None
+        if errors:
+            for gcs_id, message in errors:
+                self.logger.error(f"Nanopublication {gcs_id} not created -- {message}")
+            raise RuntimeError(f"{len(errors)} nanopublications could not be created "
+                               f"(e.g., GCS {errors[0][0]}: {errors[0][1]})")
+
+    def create_nanopub_graphs(self, sample=False, delta=False, retract=False, workers=1, chunk_size=1000,
+                              sign=False, partitions=0, profile=False):
         """
         Iterate over the facts and create a extended_nanopub for each of them.
+
+        :param sample: (bool) whether to consider a sample or the full dump.
+        :param delta: (bool) whether to create only the nanopubs of the facts added or changed since the previous
+            release (see select_delta).
+        :param retract: (bool) in delta mode, whether to create retraction nanopubs for the removed facts and to
+            mark the nanopubs of changed facts as superseding the previous ones.
+        :param workers: (int) number of worker processes serializing the nanopubs (1 serializes them sequentially).
+        :param chunk_size: (int) number of GCS facts assigned to a worker at a time.
+        :param sign: (bool) whether to sign the nanopubs and replace their local URIs with trusty URIs (see
+            store_trusty_uris).
+        :param partitions: (int) number of partitions serialized one at a time, bounding the memory to the size of a
+            partition (see partition_tables), 0 to read the whole tables at once.
+        :param profile: (bool) whether to record the time (and memory) of each stage and store a report (see
+            set_profiling).
         :return: self object.
         """
         self.logger.info(f"--- Reading and Processing Data ---")
 
         self.set_paths(sample)
-        self.read_data()
-        self.process_data()
-        self.logger.info(f"--- Reading and Processing COMPLETED ---")
+        self.set_profiling(profile)
+        self.sign_nanopubs = sign
+        self.trusty_uris = []
+        if sign:
+            if self.serialization_engine != "rdflib":
+                raise ValueError("Signing requires the rdflib serialization engine")
+            self.set_signing()
+        self.removedGCS = []
+        self.supersededGCS = set()
+        self.publishedURIs = {}
+        self.manifests = []
+        if self.skip_unchanged:
+            self.previous_manifest = read_manifest(self.manifest_path)
+        # in delta mode, the nanopubs are appended to the existing bundles (bundle output)
+        self.append_bundles = delta
+        self.bundles = None
+        try:
+            if partitions > 0:
+                if delta:
+                    raise ValueError("The delta mode reads the whole tables and cannot be used with partitions")
+                with self.profiler.stage("partition_tables"):
+                    self.to_be_serialized = self.partition_tables(partitions)
+                self.logger.info(f"--- Reading and Processing COMPLETED ---")
+                self.start_serialization()
+                for partition in range(partitions):
+                    with self.profiler.stage("read_data"):
+                        self.read_partition(partition)
+                    partition_size = len(self.gcs.index)
+                    with self.profiler.stage("process_data"):
+                        self.process_data()
+                    with self.profiler.stage("prepare_facts"):
+                        self.prepare_facts()
+                    # dropped and skipped GCS facts are not serialized
+                    self.progress.total -= partition_size - len(self.gcs.index)
+                    self.serialize_facts(workers, chunk_size)
+            else:
+                with self.profiler.stage("read_data"):
+                    self.read_data()
+                with self.profiler.stage("process_data"):
+                    self.process_data()
+                if delta:
+                    with self.profiler.stage("select_delta"):
+                        self.select_delta(updates=retract)
+                with self.profiler.stage("prepare_facts"):
+                    self.prepare_facts()
+                self.to_be_serialized = len(self.gcs.index)
+                self.logger.info(f"--- Reading and Processing COMPLETED ---")
+                self.start_serialization()
+                self.serialize_facts(workers, chunk_size)
+            self.progress.close()
+            if retract and self.removedGCS:
+                self.logger.info(f"+++ Retracting {len(self.removedGCS)} removed GCS facts +++")
+                for gcs_id in self.removedGCS:
+                    self._createRetractionNanopub(gcs_id)
+        finally:
+            if partitions > 0:
+                # the partitions are a copy of the tables, removed even if the serialization failed
+                self.remove_partitions(range(partitions))
+            # the index of the bundles is stored even if some nanopubs could not be created
+            if self.bundles is not None:
+                for bundle in self.bundles.values():
+                    bundle.close()
+        if sign:
+            self.store_trusty_uris()
+        if self.skip_unchanged:
+            manifest = pd.concat(self.manifests)
+            manifest["files"] = fingerprint_files(self.serialization_path, manifest.index)
+            write_manifest(self.manifest_path, self.previous_manifest, manifest)
+        self.profiler.report(self.profiling_path + "report.json")
+        return self
+
+    def prepare_facts(self):
+        """
+        Assign the truth values of the GCS facts to be serialized and skip the unchanged ones (see skip_unchanged).
+        """
+        self.classify_data()
+        if self.skip_unchanged:
+            self.skip_serialized()
+
+    def start_serialization(self):
+        """
+        Open the bundles (bundle output) and start reporting the serialization progress.
+        """
         self.logger.info(f"+++ Start Nanopublications Serialization +++")
         self.current_serialized = 1
-        self.to_be_serialized = len(self.gcs.index)
-        self.gcs.apply(self._createNanopub, axis=1)
-        return self
+        self.bundles = None
+        self.pending_blocks = None
+        if self.serialization_output == "bundle":
+            self.bundles = {ser_format: NanopubBundleWriter(self.serialization_path[ser_format], ser_format,
+                                                            shards=self.config["SERIALIZATION"].getint("shards"),
+                                                            compression=self.bundle_compression,
+                                                            append=self.append_bundles)
+                            for ser_format in self.serialization_formats}
+        self.progress = ProgressReporter(self.logger, "Serialized nanopublications", total=self.to_be_serialized,
+                                         unit="nanopubs")
+
+    def serialize_facts(self, workers, chunk_size):
+        """
+        Create and serialize the nanopubs of the GCS facts read and processed.
+
+        :param workers: (int) number of worker processes serializing the nanopubs (1 serializes them sequentially).
+        :param chunk_size: (int) number of GCS facts assigned to a worker at a time.
+        """
+        if workers > 1:
+            self.create_nanopubs_parallel(workers, chunk_size)
+        else:
+            self.gcs.apply(self._createNanopub, axis=1)
+
+    def partition_tables(self, partitions):
+        """
+        Split the GCS facts and their sentences into partitions by a hash of the GCS URI (PATHS.DATASET.partitions),
+        reading both tables in chunks of SERIALIZATION.read_chunk_size rows. The sentences of the GCS facts of a
+        partition are all in the same partition, hence each partition can be read and serialized on its own.
+
+        :param partitions: (int) number of partitions.
+        :return: (int) number of GCS facts.
+        """
+        read_chunk_size = self.config["SERIALIZATION"].getint("read_chunk_size", fallback=100000)
+        os.makedirs(self.datadir + self.partition_path, exist_ok=True)
+        n_gcs = 0
+        for table, path, key in [("gcs", self.gcs_path, "id"), ("gcs_sentence", self.gcs_sentence_path, "gcs")]:
+            self.logger.info(f"Partitioning {path} into {partitions} partitions")
+            partition_files = [open(self.datadir + self.partition_path + f"{table}-{partition:04d}.csv", "w",
+                                    encoding="utf-8", newline="")
+                               for partition in range(partitions)]
+            try:
+                header = True
+                for chunk in _read_chunks(self.datadir + path, read_chunk_size):
+                    if table == "gcs" and "gcs_uri" in chunk.columns:
+                        # typed layout (see prepare_dataset.columnar): partitions store the GCS URI as id
+                        chunk = chunk.drop(columns="id").rename(columns={"gcs_uri": "id"})
+                    if table == "gcs":
+                        n_gcs += len(chunk.index)
+                    if header:
+                        for partition_file in partition_files:
+                            chunk.iloc[:0].to_csv(partition_file, index=False)
+                        header = False
+                    assignment = pd.util.hash_array(chunk[key].astype(str).to_numpy(dtype=object)) % partitions
+                    for partition, partition_chunk in chunk.groupby(assignment):
+                        partition_chunk.to_csv(partition_files[partition], index=False, header=False)
+            finally:
+                for partition_file in partition_files:
+                    partition_file.close()
+        return n_gcs
+
+    def read_partition(self, partition):
+        """
+        Read the GCS facts of a partition and their sentences (see partition_tables).
+
+        :param partition: (int) considered partition.
+        """
+        self.gcs, self.gcs_sentence = self.read_tables(self.partition_path + f"gcs-{partition:04d}.csv",
+                                                       self.partition_path + f"gcs_sentence-{partition:04d}.csv")
+        self.evidence = EvidenceIndex(self.gcs_sentence)
+        self.logger.info(f"Partition {partition}: {len(self.gcs.index)} GCS facts, "
+                         f"{len(self.gcs_sentence.index)} sentences")
+        # the partition is in memory, its files are no longer needed
+        self.remove_partitions([partition])
+
+    def remove_partitions(self, partitions):
+        """
+        Remove the files of some partitions (see partition_tables), and their directory once empty.
+
+        :param partitions: (iterable(int)) partitions.
+        """
+        for partition in partitions:
+            for table in ["gcs", "gcs_sentence"]:
+                try:
+                    os.remove(self.datadir + self.partition_path + f"{table}-{partition:04d}.csv")
+                except FileNotFoundError:
+                    pass
+        try:
+            os.rmdir(self.datadir + self.partition_path)
+        except OSError:
+            # other partitions (or other files) are left
+            pass
 
 
     from .core_nanopub_creation import _createNanopub, _populateAssertionGraph, \
         _populateProvenanceGraph, _populateKnowledgeProvGraph, _populatePubInfoGraph, _insertEvidence, \
-        _insertConsistencyCondition, _insertSufficiencyCondition
+        _insertConsistencyCondition, _insertSufficiencyCondition, _insertSupersedes, _createRetractionNanopub, \
+        _buildNanopub, _writeNanopubDirect, _storeNanopub, _signNanopub
 
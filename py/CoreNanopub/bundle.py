@@ -0,0 +1,92 @@
+import gzip
+import json
+import os
+import zlib
+
+import pandas as pd
+from extended_nanopub.bundle import BUNDLE_INDEX, BUNDLE_META, NanopubBundle, shard_name
+
+COMPRESSIONS = ["none", "gzip"]
+
+
+def encode_block(text, compression="none"):
+    """
+    Encode a serialized nanopub as a block of a bundle.
+
+    :param text: (str) serialized nanopub.
+    :param compression: (str) none or gzip (each block is a separate gzip member).
+    :return: (bytes) encoded block.
+    """
+    data = text.encode("utf-8")
+    if compression == "gzip":
+        return gzip.compress(data, mtime=0)
+    return data
+
+
+class NanopubBundleWriter:
+    """
+    Append the nanopubs serialized in a format to a fixed number of shard files instead of one file per nanopub.
+
+    Each nanopub is a separate (optionally compressed) block, assigned to a shard by a hash of its GCS id; an index
+    with the shard, offset and length of each block (index.csv) allows reading a single nanopub with one seek (see
+    extended_nanopub.bundle.NanopubBundle).
+    """
+
+    def __init__(self, directory, ser_format, shards=16, compression="none", append=False):
+        """
+        Initialisation function.
+
+        :param directory: (str) directory of the bundle.
+        :param ser_format: (str) serialization format of the nanopubs.
+        :param shards: (int) number of shard files.
+        :param compression: (str) none or gzip.
+        :param append: (bool) whether to append to the existing bundle of the directory (e.g., in delta mode), whose
+            nanopubs are kept unless appended again, otherwise the shard files are replaced.
+        :raises ValueError: if the existing bundle has another format, number of shards or compression.
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown bundle compression {compression} (expected one of {COMPRESSIONS})")
+        self.directory = directory
+        self.ser_format = ser_format
+        self.shards = shards
+        self.compression = compression
+        os.makedirs(directory, exist_ok=True)
+        # shard, offset and length of the block of each nanopub, the previous blocks of appended nanopubs are replaced
+        self.index = {}
+        append = append and os.path.exists(os.path.join(directory, BUNDLE_META))
+        if append:
+            previous = NanopubBundle(directory)
+            settings = {"format": ser_format, "shards": shards, "compression": compression}
+            previous_settings = {key: previous.meta[key] for key in settings}
+            if previous_settings != settings:
+                raise ValueError(f"Cannot append to the bundle {directory}: its settings {previous_settings} differ "
+                                 f"from {settings}")
+            self.index.update(previous.index)
+        mode = "ab" if append else "wb"
+        self.files = [open(os.path.join(directory, shard_name(ser_format, shard, compression)), mode)
+                      for shard in range(shards)]
+
+    def append(self, gcs_id, block):
+        """
+        Append the block of a nanopub to its shard.
+
+        :param gcs_id: (str) ID of the GCS (or name of the nanopub).
+        :param block: (bytes) encoded nanopub (see encode_block).
+        """
+        shard = zlib.crc32(gcs_id.encode("utf-8")) % self.shards
+        shard_file = self.files[shard]
+        self.index[gcs_id] = (shard, shard_file.tell(), len(block))
+        shard_file.write(block)
+
+    def close(self):
+        """
+        Close the shard files and store the index.
+        """
+        for shard_file in self.files:
+            shard_file.close()
+        pd.DataFrame([(gcs_id,) + entry for gcs_id, entry in self.index.items()],
+                     columns=["id", "shard", "offset", "length"]) \
+            .to_csv(os.path.join(self.directory, BUNDLE_INDEX), index=False)
+        with open(os.path.join(self.directory, BUNDLE_META), "w") as meta_file:
+            json.dump({"format": self.ser_format, "shards": self.shards, "compression": self.compression,
+                       "nanopubs": len(self.index)}, meta_file, indent=2)
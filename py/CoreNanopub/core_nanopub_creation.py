@@ -1,16 +1,14 @@
-from CoreNanopub.utils import _extractSentenceID, _extractGCSID
+from CoreNanopub.utils import _extractSentenceID, _extractGCSID, sufficiency_criteria, SUFFICIENCY_THRESHOLD, \
+    CONSISTENCY_THRESHOLD
+from CoreNanopub.bundle import encode_block
 from extended_nanopub import ExtendedNanopub
-from rdflib import URIRef, Literal
+from extended_nanopub.namespaces import NP
+from extended_nanopub.sign_utils import add_signature
+from extended_nanopub.utils import extract_enp_metadata
+from rdflib import URIRef, Literal, ConjunctiveGraph
 from rdflib.namespace import DCTERMS, XSD, RDFS, RDF
 from datetime import datetime
 
-assigned_certainty_degree = {"ONCOGENE": "AGTOncogeneLikelihood",
-                             "BIOMARKER": "EGRPassiveLikelihood",
-                             "TSG": "AGTTSGLikelihood"}
-assigned_certainty_degree_support = {"ONCOGENE": "AGTOncogeneSupport",
-                                     "BIOMARKER": "EGRPassiveSupport",
-                                     "TSG": "AGTTSGSupport"}
-
 
 def _createNanopub(self, gcs_row):
     """
@@ -18,23 +16,213 @@ def _createNanopub(self, gcs_row):
     :param gcs_row: (pandas.Series) row comprise the fact's information.
     :return:
     """
-    self.logger.info(f"+++ Creating nanopublication {gcs_row.name} ({self.current_serialized}/{self.to_be_serialized})")
+    self.logger.debug(f"+++ Creating nanopublication {gcs_row.name} ({self.current_serialized}/{self.to_be_serialized})")
     self.current_serialized += 1
-    self.initializeFullGraph(gcs_row.name)
+    self.created = self.fixed_created or datetime.now()
+    with self.profiler.item(gcs_row.name):
+        if self.serialization_engine == "direct":
+            self._writeNanopubDirect(gcs_row)
+        else:
+            np = self._buildNanopub(gcs_row)
+            if self.sign_nanopubs:
+                with self.profiler.stage("_signNanopub"):
+                    rdf = self._signNanopub(np)
+            else:
+                rdf = np._rdf
+            self.logger.debug(f"Serializing nanopublication {gcs_row.name}")
+            for ser_format in self.serialization_formats:
+                with self.profiler.stage(f"serialize:{ser_format}"):
+                    text = rdf.serialize(format=ser_format)
+                with self.profiler.stage(f"write:{ser_format}"):
+                    self._storeNanopub(gcs_row.name, ser_format, text)
+    self.progress.update(uncertain=int(gcs_row["hasType"] == "UNCERTAIN"),
+                         reliable=int(gcs_row["hasType"] != "UNCERTAIN"))
+    return None
 
-    self.initializeNanopubGraphs()
 
-    self._populateAssertionGraph(gcs_row),
-    self._populateProvenanceGraph(),
-    self._populatePubInfoGraph(gcs_row),
-    self._populateKnowledgeProvGraph(gcs_row)
+def _buildNanopub(self, gcs_row):
+    """
+    Build the graphs of the nanopublication of a GCS fact.
+
+    :param self: self object.
+    :param gcs_row: (pandas.Series) row comprise the fact's information.
+    :return: (ExtendedNanopub) nanopublication of the GCS fact.
+    """
+    with self.profiler.stage("initializeGraphs"):
+        self.initializeFullGraph(gcs_row.name)
 
-    np = ExtendedNanopub(rdf=self.nanopub_graph)
-    self.logger.info(f"Serializing nanopublication {gcs_row.name}")
+        self.initializeNanopubGraphs()
+
+    with self.profiler.stage("_populateAssertionGraph"):
+        self._populateAssertionGraph(gcs_row)
+    with self.profiler.stage("_populateProvenanceGraph"):
+        self._populateProvenanceGraph()
+    with self.profiler.stage("_populatePubInfoGraph"):
+        self._populatePubInfoGraph(gcs_row)
+    with self.profiler.stage("_populateKnowledgeProvGraph"):
+        self._populateKnowledgeProvGraph(gcs_row)
+    if gcs_row.name in self.supersededGCS:
+        self._insertSupersedes(gcs_row.name)
+
+    with self.profiler.stage("ExtendedNanopub"):
+        return ExtendedNanopub.from_graph(self.nanopub_graph)
+
+
+def _writeNanopubDirect(self, gcs_row):
+    """
+    Render the nanopublication of a GCS fact with the direct writer, without building its graphs. In verify mode,
+    the graphs are built as well and compared with the rendered ones.
+
+    :param self: self object.
+    :param gcs_row: (pandas.Series) row comprise the fact's information.
+    """
+    evidence = list(self.evidence.sentences_of(gcs_row["gcs_uri"]))
+    supersedes = None
+    if gcs_row.name in self.supersededGCS:
+        supersedes = self.publishedURIs.get(str(self.namespaces["corenp"][gcs_row.name]))
+    if self.verify_serialization:
+        # discarded sentences are counted while building the graphs
+        expected_np = self._buildNanopub(gcs_row)
+    else:
+        self.progress.count(discarded_sentences=sum(not isinstance(sentence_class, str)
+                                                    for _, sentence_class, _ in evidence))
     for ser_format in self.serialization_formats:
-        np._rdf.serialize(self.serialization_path[ser_format] + f"{gcs_row.name}.{ser_format}", format=ser_format)
-        self.logger.info(f"+++ Nanopublication saved at {self.serialization_path[ser_format]}{gcs_row.name}.{ser_format}")
-    return None
+        with self.profiler.stage(f"render:{ser_format}"):
+            text = self.direct_writer.render(ser_format, gcs_row.name, gcs_row, evidence, self.created, supersedes)
+        if self.verify_serialization:
+            _verifySerialization(expected_np, text, ser_format, gcs_row.name)
+        with self.profiler.stage(f"write:{ser_format}"):
+            self._storeNanopub(gcs_row.name, ser_format, text)
+
+
+def _storeNanopub(self, name, ser_format, text):
+    """
+    Store a serialized nanopublication in its own file or, with the bundle output, append it to a shard file.
+
+    :param self: self object.
+    :param name: (str) name of the nanopublication (e.g., the GCS ID).
+    :param ser_format: (str) serialization format.
+    :param text: (str) serialized nanopublication.
+    """
+    if self.bundles is None:
+        with open(self.serialization_path[ser_format] + f"{name}.{ser_format}", "w", encoding="utf-8") as ser_file:
+            ser_file.write(text)
+        self.logger.debug(f"+++ Nanopublication saved at {self.serialization_path[ser_format]}{name}.{ser_format}")
+    elif self.pending_blocks is not None:
+        # worker process: blocks are appended to the bundle by the parent process
+        self.pending_blocks.append((name, ser_format, encode_block(text, self.bundle_compression)))
+    else:
+        self.bundles[ser_format].append(name, encode_block(text, self.bundle_compression))
+        self.logger.debug(f"+++ Nanopublication {name} appended to the {ser_format} bundle")
+
+
+def _verifySerialization(expected_np, text, ser_format, gcs_id):
+    """
+    Check that a nanopublication rendered by the direct writer has the same graphs as the one serialized by rdflib.
+
+    CORE nanopublications have no blank nodes, hence the graphs are isomorphic if they contain the same quads.
+
+    :param expected_np: (ExtendedNanopub) nanopublication built with rdflib.
+    :param text: (str) nanopublication rendered by the direct writer.
+    :param ser_format: (str) serialization format.
+    :param gcs_id: (str) ID of the considered GCS.
+    :raises ValueError: if the graphs differ.
+    """
+    expected = ConjunctiveGraph()
+    expected.parse(data=expected_np._rdf.serialize(format=ser_format), format=ser_format)
+    rendered = ConjunctiveGraph()
+    rendered.parse(data=text, format=ser_format)
+    expected_quads = {(s, p, o, g.identifier) for s, p, o, g in expected.quads((None, None, None, None))}
+    rendered_quads = {(s, p, o, g.identifier) for s, p, o, g in rendered.quads((None, None, None, None))}
+    if expected_quads != rendered_quads:
+        raise ValueError(f"The {ser_format} serialization of nanopublication {gcs_id} differs from rdflib's: "
+                         f"{len(expected_quads - rendered_quads)} missing and "
+                         f"{len(rendered_quads - expected_quads)} unexpected quads")
+
+
+def _createRetractionNanopub(self, gcs_id):
+    """
+    Create a nanopublication retracting the nanopublication of a GCS fact removed from CORE-KB.
+
+    :param self: self object.
+    :param gcs_id: (str) ID of the removed GCS.
+    """
+    self.logger.debug(f"+++ Creating retraction of nanopublication {gcs_id}")
+    self.initializeFullGraph(f"{gcs_id}_retraction")
+
+    # a retraction has no knowledge provenance, hence a plain four-graph head
+    self.initializeNanopubGraphs(knowledge_prov=False)
+
+    creator = self.namespaces["orcid"]["0000-0002-0676-682X"]
+    retracted_uri = str(self.namespaces["corenp"][gcs_id])
+    # Retract the published nanopub (or the local one if the published URI is unknown)
+    self.assertion_graph.add((creator, self.namespaces["npx"]["retracts"],
+                              URIRef(self.publishedURIs.get(retracted_uri, retracted_uri))))
+    self.provenance_graph.add((self.assertion_graph.identifier, self.namespaces["prov"]["wasAttributedTo"], creator))
+    self.pubinfo_graph.add((self.nanopub_graph.identifier, DCTERMS.created,
+                            Literal(self.fixed_created or datetime.now(), datatype=XSD.dateTime)))
+    self.pubinfo_graph.add((self.nanopub_graph.identifier, DCTERMS.creator, creator))
+    self.pubinfo_graph.add((self.nanopub_graph.identifier, DCTERMS.rights,
+                            self.registry.term("http://opendatacommons.org/licenses/odbl/1.0/")))
+
+    np = ExtendedNanopub.from_graph(self.nanopub_graph)
+    rdf = self._signNanopub(np) if self.sign_nanopubs else np._rdf
+    _checkHeadGraphs(rdf, f"{gcs_id}_retraction")
+    for ser_format in self.serialization_formats:
+        self._storeNanopub(f"{gcs_id}_retraction", ser_format, rdf.serialize(format=ser_format))
+
+
+def _checkHeadGraphs(rdf, name):
+    """
+    Check that the head of a nanopublication links exactly the graphs it contains.
+
+    :param rdf: (rdflib.ConjunctiveGraph) nanopublication.
+    :param name: (str) name of the nanopublication.
+    :raises ValueError: if a graph linked by the head is missing, or a graph is not linked by the head.
+    """
+    np_meta = extract_enp_metadata(rdf)
+    declared = {np_meta.head, np_meta.assertion, np_meta.provenance, np_meta.pubinfo}
+    if np_meta.knowledgeprov is not None:
+        declared.add(np_meta.knowledgeprov)
+    present = {g.identifier for _, _, _, g in rdf.quads((None, None, None, None))}
+    if declared != present:
+        raise ValueError(f"The head of nanopublication {name} does not match its graphs: "
+                         f"{sorted(map(str, declared - present))} missing and "
+                         f"{sorted(map(str, present - declared))} not linked")
+
+
+def _signNanopub(self, np):
+    """
+    Sign a nanopublication with the private key loaded once per run (see CoreNanopub.set_signing) and replace its
+    local URIs (e.g., corenp:<id> and sub:assertion) with trusty URIs.
+
+    :param self: self object.
+    :param np: (ExtendedNanopub) nanopublication built by _buildNanopub.
+    :return: (rdflib.ConjunctiveGraph) signed nanopublication.
+    """
+    local_uri = str(self.nanopub_graph.identifier)
+    signed_rdf = add_signature(np.rdf, self.profile, self.namespaces["sub"], self.pubinfo_graph.identifier,
+                               signer=self.signer)
+    trusty_uri = next(signed_rdf.subjects(RDF.type, NP.Nanopublication))
+    self.trusty_uris.append((local_uri, str(trusty_uri)))
+    self.logger.debug(f"Nanopublication {local_uri} signed with trusty URI {trusty_uri}")
+    return signed_rdf
+
+
+def _insertSupersedes(self, gcs_id):
+    """
+    Mark the nanopublication of a changed GCS fact as superseding the one of the previous release.
+
+    :param self: self object.
+    :param gcs_id: (str) ID of the changed GCS.
+    """
+    published_uri = self.publishedURIs.get(str(self.namespaces["corenp"][gcs_id]))
+    if published_uri is None:
+        # the new nanopub has the same local URI as the previous one
+        self.logger.debug(f"Published URI of nanopublication {gcs_id} unknown -- supersedes not added")
+        return
+    self.pubinfo_graph.add((self.nanopub_graph.identifier, self.namespaces["npx"]["supersedes"],
+                            URIRef(published_uri)))
 
 
 def _populateAssertionGraph(self, gcs_row):
@@ -44,16 +232,16 @@ def _populateAssertionGraph(self, gcs_row):
     :param self: self object.
     :param gcs_row: (pandas.Series) row with GCS information.
     """
+    gcs = URIRef(gcs_row["gcs_uri"])
     # Add GCS
-    self.assertion_graph.add((URIRef(gcs_row["gcs_uri"]), RDF.type, self.namespaces["ceonto"]["GCS"]))
-    # Add involved disease
-    self.assertion_graph.add((URIRef(gcs_row["gcs_uri"]), self.namespaces["ceonto"]["involves"],
-                              URIRef(gcs_row["involves"])))
+    self.assertion_graph.add((gcs, RDF.type, self.namespaces["ceonto"]["GCS"]))
+    # Add involved disease (diseases and genes are shared by many GCS facts)
+    self.assertion_graph.add((gcs, self.namespaces["ceonto"]["involves"], self.registry.term(gcs_row["involves"])))
     # Add involved gene
-    self.assertion_graph.add((URIRef(gcs_row["gcs_uri"]), self.namespaces["ceonto"]["expressedBy"],
-                              URIRef(gcs_row["expressedBy"])))
+    self.assertion_graph.add((gcs, self.namespaces["ceonto"]["expressedBy"],
+                              self.registry.term(gcs_row["expressedBy"])))
     # Add gene's class
-    self.assertion_graph.add((URIRef(gcs_row["gcs_uri"]), self.namespaces["ceonto"]["hasType"],
+    self.assertion_graph.add((gcs, self.namespaces["ceonto"]["hasType"],
                               Literal(gcs_row["hasType"], datatype=XSD.string)))
 
 
@@ -66,33 +254,34 @@ def _populatePubInfoGraph(self, gcs_row):
     """
     # Add created timestamp
     self.pubinfo_graph.add((self.nanopub_graph.identifier, DCTERMS.created,
-                            Literal(datetime.now(), datatype=XSD.dateTime)))
+                            Literal(self.created, datatype=XSD.dateTime)))
     # Add creator
     self.pubinfo_graph.add((self.nanopub_graph.identifier, DCTERMS.creator,
-                            URIRef(self.namespaces["orcid"]["0000-0002-0676-682X"])))
+                            self.namespaces["orcid"]["0000-0002-0676-682X"]))
     # Add authors
     self.pubinfo_graph.add((self.nanopub_graph.identifier, self.namespaces["pav"]["authoredBy"],
-                            URIRef(self.namespaces["orcid"]["0000-0002-0676-682X"])))
+                            self.namespaces["orcid"]["0000-0002-0676-682X"]))
     self.pubinfo_graph.add((self.nanopub_graph.identifier, self.namespaces["pav"]["authoredBy"],
-                            URIRef(self.namespaces["orcid"]["0000-0003-0362-5893"])))
+                            self.namespaces["orcid"]["0000-0003-0362-5893"]))
     self.pubinfo_graph.add((self.nanopub_graph.identifier, self.namespaces["pav"]["authoredBy"],
-                            URIRef(self.namespaces["orcid"]["0000-0003-4970-4554"])))
+                            self.namespaces["orcid"]["0000-0003-4970-4554"]))
     self.pubinfo_graph.add((self.nanopub_graph.identifier, self.namespaces["pav"]["authoredBy"],
-                            URIRef(self.namespaces["orcid"]["0000-0001-5015-5498"])))
+                            self.namespaces["orcid"]["0000-0001-5015-5498"]))
     self.pubinfo_graph.add((self.nanopub_graph.identifier, self.namespaces["pav"]["authoredBy"],
-                            URIRef(self.namespaces["orcid"]["00009-0009-2515-4771"])))
+                            self.namespaces["orcid"]["00009-0009-2515-4771"]))
     # Add license
     self.pubinfo_graph.add((self.nanopub_graph.identifier, DCTERMS.rights,
-                            URIRef("http://opendatacommons.org/licenses/odbl/1.0/")))
+                            self.registry.term("http://opendatacommons.org/licenses/odbl/1.0/")))
     # Add subject (Gene-Disease Associations)
     self.pubinfo_graph.add((self.nanopub_graph.identifier, DCTERMS.subject,
-                            URIRef(self.namespaces["SIO"]["001123"])))
+                            self.namespaces["SIO"]["001123"]))
 
     if gcs_row["hasType"] != "UNCERTAIN":
         # Add reference to the RDF dataset
         self.pubinfo_graph.add((self.nanopub_graph.identifier, self.namespaces["prv"]["usedData"],
-                                URIRef("https://doi.org/10.5281/zenodo.7577127")))
-        self.pubinfo_graph.add((URIRef("https://doi.org/10.5281/zenodo.7577127"), self.namespaces["pav"]["version"],
+                                self.registry.term("https://doi.org/10.5281/zenodo.7577127")))
+        self.pubinfo_graph.add((self.registry.term("https://doi.org/10.5281/zenodo.7577127"),
+                                self.namespaces["pav"]["version"],
                                 Literal("v1.1", datatype=XSD.string)))
 
 
@@ -107,7 +296,7 @@ def _populateProvenanceGraph(self):
                               self.namespaces["ECO"]["0000203"]))
     # Add Entity
     self.provenance_graph.add((self.assertion_graph.identifier, self.namespaces["prov"]["wasDerivedFrom"],
-                              URIRef("https://gda.dei.unipd.it/")))
+                              self.registry.term("https://gda.dei.unipd.it/")))
     # Link Evidence to the assertion
     self.provenance_graph.add((self.assertion_graph.identifier, self.namespaces["wi"]["evidence"],
                                self.namespaces["ceonto"]["gcsEvidence"]))
@@ -129,129 +318,72 @@ def _populateKnowledgeProvGraph(self, gcs_row):
     :param gcs_row: (pandas.Series) row with GCS information.
     """
     # Add supporting or contrasting sentences
-    restricted_df = self.gcs_sentence.loc[self.gcs_sentence["gcs"] == gcs_row["gcs_uri"]]
-    restricted_df.apply(self._insertEvidence, axis=1)
+    for sentence, sentence_class, gcs_class in self.evidence.sentences_of(gcs_row["gcs_uri"]):
+        self._insertEvidence(gcs_row["gcs_uri"], sentence, sentence_class, gcs_class)
     # Link assertion to the assigned truth value
     self.knowledgeprov_graph.add((self.assertion_graph.identifier,
                                   self.namespaces["PROV-K"]["hasTruthValue"],
                                   self.namespaces["corekp"][f"{gcs_row.name}"]))
-    # Add Truth Value
-    if gcs_row["hasType"] == "UNCERTAIN":
-        self.logger.info(f"Nanopub {gcs_row.name} is an UNCERTAIN fact")
-        # Add unreliable fact
-        # Check if the fact failed the sufficiency check
-        if gcs_row["CCSNotInformativeLikelihood"] > 0.7:
-            # CCS failed the sufficiency check
-            # Add insufficient evidence fact
-            self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
-                                         RDF.type, self.namespaces["PROV-K"]["InsufficientEvidence"]))
-            # Add unreliability reason
-            if gcs_row["PTNotInformativeLikelihood"] > 0.7:
-                self.logger.info(f"Nanopub {gcs_row.name} is uncertain due to insufficient evidence for CCS and GCI")
-                # Both CCS and CGI failed the sufficiency check
-                self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
-                                             self.namespaces["PROV-K"]["unreliabilityReason"],
-                                             Literal("Insufficient evidence for determining the Change of Cancer Status"
-                                                     " (CCS) and the Gene-Cancer Interaction (GCI).",
-                                                     datatype=XSD.string)))
-                self._insertSufficiencyCondition(gcs_row.name, gcs_row["CCSNotInformativeLikelihood"],
-                                                 "ccsCriteria")
-                self._insertSufficiencyCondition(gcs_row.name, gcs_row["PTNotInformativeLikelihood"],
-                                                 "gciCriteria")
-            else:
-                self.logger.info(f"Nanopub {gcs_row.name} is uncertain due to insufficient evidence for CCS")
-                # CCS failed the sufficiency check
-                self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
-                                             self.namespaces["PROV-K"]["unreliabilityReason"],
-                                             Literal("Insufficient evidence for determining the the Change of Cancer "
-                                                     "Status (CCS)", datatype=XSD.string)))
-                self._insertSufficiencyCondition(gcs_row.name, gcs_row["CCSNotInformativeLikelihood"],
-                                                 "ccsCriteria")
-        elif gcs_row["PTNotInformativeLikelihood"] > 0.7:
-            self.logger.info(f"Nanopub {gcs_row.name} is uncertain due to insufficient evidence for GCI")
-            # CGI failed the sufficiency check
-            # Add insufficient evidence fact
-            self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
-                                         RDF.type, self.namespaces["PROV-K"]["InsufficientEvidence"]))
-            self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
-                                         self.namespaces["PROV-K"]["unreliabilityReason"],
-                                         Literal("Insufficient evidence for determining the Gene-Cancer Interaction"
-                                                 " (GCI).", datatype=XSD.string)))
-            self._insertSufficiencyCondition(gcs_row.name, gcs_row["PTNotInformativeLikelihood"],
-                                             "gciCriteria")
-        elif abs(gcs_row["EGRActiveLikelihood"]-gcs_row["EGRPassiveLikelihood"]) <= 0.4:
-            self.logger.info(f"Nanopub {gcs_row.name} is uncertain due to contrasting evidence for active (oncogene,"
-                                f" or tumor supressor gene) or passive (biomarker) role.")
-            # Active and Passive gene role failed the consistency check
-            # Add inconsistency evidence fact
-            self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
-                                         RDF.type, self.namespaces["PROV-K"]["ContrastingEvidence"]))
-            self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
-                                         self.namespaces["PROV-K"]["unreliabilityReason"],
-                                         Literal("Contrasting evidence for determining an active (oncogene, or tumor "
-                                                 "supressor gene) or passive (biomarker) role.", datatype=XSD.string)))
-            self._insertConsistencyCondition(gcs_row.name,
-                                             abs(gcs_row["EGRActiveLikelihood"]-gcs_row["EGRPassiveLikelihood"]))
-        elif gcs_row["EGRPassiveLikelihood"] > gcs_row["EGRActiveLikelihood"]:
-            raise ValueError(f"GCS {gcs_row.name} deemed as \"UNRELIABLE\" but should be \"BIOMARKER\"")
-        else:
-            self.logger.info(f"Nanopub {gcs_row.name} is uncertain due to contrasting evidence for oncogene or tumor"
-                             f" suppressor gene.")
-            if abs(gcs_row["AGTOncogeneLikelihood"]-gcs_row["AGTTSGLikelihood"]) <= 0.4:
-                # oncogene and tumor supressor gene failed the consistency check
-                # Add inconsistency evidence fact
-                self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
-                                             RDF.type, self.namespaces["PROV-K"]["ContrastingEvidence"]))
-                self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
-                                             self.namespaces["PROV-K"]["unreliabilityReason"],
-                                             Literal("Contrasting evidence for determining oncogene or tumor suppressor"
-                                                     " gene's role.", datatype=XSD.string)))
-                self._insertConsistencyCondition(gcs_row.name,
-                                                 abs(gcs_row["AGTOncogeneLikelihood"] - gcs_row["AGTTSGLikelihood"]))
-            else:
-                raise ValueError(f"GCS {gcs_row.name} deemed as \"UNRELIABLE\" but should be either \"ONCOGENE\" or"
-                                 f" \"TSG\"")
+    # Add Truth Value (assigned by CoreNanopub.classify_data)
+    if gcs_row["truthValue"] != "ReliableFact":
+        self.logger.debug(f"Nanopub {gcs_row.name} is an UNCERTAIN fact: {gcs_row['unreliabilityReason']}")
+        # Add unreliable fact (insufficient or contrasting evidence)
+        self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
+                                     RDF.type, self.namespaces["PROV-K"][gcs_row["truthValue"]]))
+        # Add unreliability reason
+        self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
+                                     self.namespaces["PROV-K"]["unreliabilityReason"],
+                                     Literal(gcs_row["unreliabilityReason"], datatype=XSD.string)))
+        # Add the failed sufficiency checks
+        for sufficiency_class, sufficiency_score in sufficiency_criteria.items():
+            if gcs_row[sufficiency_class]:
+                self._insertSufficiencyCondition(gcs_row.name, gcs_row[sufficiency_score], sufficiency_class)
+        # Add the failed consistency check
+        if gcs_row["geneClassCriteria"]:
+            self._insertConsistencyCondition(gcs_row.name, gcs_row["consistencyScore"])
     else:
-        self.logger.info(f"Nanopub {gcs_row.name} is a RELIABLE fact")
+        self.logger.debug(f"Nanopub {gcs_row.name} is a RELIABLE fact")
         # Add reliable fact
         self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
                                      RDF.type, self.namespaces["PROV-K"]["ReliableFact"]))
         # Add assigned certainty degree
         self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
                                      self.namespaces["PROV-K"]["assignedCertaintyDegree"],
-                                     Literal(gcs_row[assigned_certainty_degree[gcs_row["hasType"]]],
-                                             datatype=XSD.float)))
+                                     Literal(gcs_row["certaintyDegree"], datatype=XSD.float)))
         # Add assigned certainty support
         self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_row.name}"],
                                      self.namespaces["PROV-K"]["assignedCertaintyDegreeSupport"],
-                                     Literal(gcs_row[assigned_certainty_degree_support[gcs_row["hasType"]]],
-                                             datatype=XSD.integer)))
+                                     Literal(gcs_row["certaintySupport"], datatype=XSD.integer)))
 
 
-def _insertEvidence(self, gcs_sentence_row):
+def _insertEvidence(self, gcs_uri, sentence, sentence_class, gcs_class):
     """
     Insert conflicting and supporting sentence for the considered GCS.
 
     :param self: self object.
-    :param gcs_sentence_row (panda.Series): series representing a row containing information and GCS and a sentence.
+    :param gcs_uri: (str) URI of the considered GCS.
+    :param sentence: (str) URI of the sentence.
+    :param sentence_class: (str) class of the sentence (not a string if the sentence is not informative).
+    :param gcs_class: (str) class of the GCS.
     """
-    if isinstance(gcs_sentence_row["sentenceClass"], str):
+    if isinstance(sentence_class, str):
         # sentence is informative
-        if gcs_sentence_row["sentenceClass"] == gcs_sentence_row["gcsClass"]:
+        if sentence_class == gcs_class:
             # add supporting sentence
             self.knowledgeprov_graph.add((self.assertion_graph.identifier,
                                           self.namespaces["PROV-K"]["supportedBy"],
-                                          URIRef(gcs_sentence_row["sentence"])))
+                                          URIRef(sentence)))
         else:
             # add conflicting sentence
             self.knowledgeprov_graph.add((self.assertion_graph.identifier,
                                          self.namespaces["PROV-K"]["conflictingWith"],
-                                         URIRef(gcs_sentence_row["sentence"])))
+                                         URIRef(sentence)))
     else:
         # sentence is not informative, do not insert it
-        sentence_id = _extractSentenceID(gcs_sentence_row["sentence"])
-        gcs_id = _extractGCSID(gcs_sentence_row["gcs"])
-        self.logger.warning(f"Sentence {sentence_id} is not informative for GCS {gcs_id} -- discarded")
+        sentence_id = _extractSentenceID(sentence)
+        gcs_id = _extractGCSID(gcs_uri)
+        self.logger.debug(f"Sentence {sentence_id} is not informative for GCS {gcs_id} -- discarded")
+        self.progress.count(discarded_sentences=1)
 
 
 def _insertSufficiencyCondition(self, gcs_id, sufficiency_score, sufficiency_class):
@@ -273,7 +405,7 @@ def _insertSufficiencyCondition(self, gcs_id, sufficiency_score, sufficiency_cla
     # Add threshold
     self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_id}#{sufficiency_class}"],
                                  self.namespaces["PROV-K"]["conditionThreshold"],
-                                 Literal(0.7, datatype=XSD.float)))
+                                 Literal(SUFFICIENCY_THRESHOLD, datatype=XSD.float)))
     # Add score
     self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_id}#{sufficiency_class}"],
                                  self.namespaces["PROV-K"]["conditionScore"],
@@ -302,7 +434,7 @@ def _insertConsistencyCondition(self, gcs_id, consistency_score):
     # Add threshold
     self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_id}#geneClassCriteria"],
                                  self.namespaces["PROV-K"]["consistencyThreshold"],
-                                 Literal(0.4, datatype=XSD.float)))
+                                 Literal(CONSISTENCY_THRESHOLD, datatype=XSD.float)))
     # Add score
     self.knowledgeprov_graph.add((self.namespaces["corekp"][f"{gcs_id}#geneClassCriteria"],
                                  self.namespaces["PROV-K"]["consistencyScore"],
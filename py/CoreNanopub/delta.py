@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+
+def fingerprint_facts(gcs_df, gcs_sentence_df):
+    """
+    Compute a fingerprint of each GCS fact and of the sentences supporting it or conflicting with it.
+
+    :param gcs_df: (pandas.DataFrame) GCS facts indexed by GCS id (with the gcs_uri column).
+    :param gcs_sentence_df: (pandas.DataFrame) sentences of the GCS facts.
+    :return: (pandas.DataFrame) fact and evidence fingerprints, indexed by GCS id.
+    """
+    fact_hash = pd.util.hash_pandas_object(gcs_df[sorted(gcs_df.columns)], index=False).to_numpy()
+    sentence_hash = pd.util.hash_pandas_object(gcs_sentence_df[sorted(gcs_sentence_df.columns)],
+                                               index=False).to_numpy()
+    # the hashes of the sentences are summed (modulo 2^64), hence the order of the sentences does not matter
+    positions = pd.Index(gcs_df["gcs_uri"]).get_indexer(gcs_sentence_df["gcs"])
+    found = positions >= 0
+    evidence_hash = np.zeros(len(gcs_df.index), dtype=np.uint64)
+    np.add.at(evidence_hash, positions[found], sentence_hash[found])
+    return pd.DataFrame({"fact": fact_hash, "evidence": evidence_hash}, index=gcs_df.index)
+
+
+def compute_delta(previous, current):
+    """
+    Compare the fingerprints of two releases of the GCS facts.
+
+    :param previous: (pandas.DataFrame) fingerprints of the previous release (see fingerprint_facts).
+    :param current: (pandas.DataFrame) fingerprints of the current release (see fingerprint_facts).
+    :return: (list(str), list(str), list(str)) ids of the added, removed and changed GCS facts.
+    """
+    added = current.index[~current.index.isin(previous.index)].to_list()
+    removed = previous.index[~previous.index.isin(current.index)].to_list()
+    common = current.index[current.index.isin(previous.index)]
+    differs = (current.loc[common].to_numpy() != previous.loc[common].to_numpy()).any(axis=1)
+    changed = common[differs].to_list()
+    return added, removed, changed
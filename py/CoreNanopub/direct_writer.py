@@ -0,0 +1,212 @@
+from xml.sax.saxutils import escape, quoteattr
+
+from rdflib.namespace import DCTERMS, RDF, RDFS, XSD
+
+from extended_nanopub.namespaces import NP
+from .utils import CONSISTENCY_THRESHOLD, SUFFICIENCY_THRESHOLD, sufficiency_criteria
+
+# placeholder of the sub namespace of the nanopub in the pre-rendered fragments
+SUB = "\ue000"
+# placeholder of the nanopub URI in the pre-rendered fragments
+THIS = "\ue001"
+
+# characters not allowed in TriG IRIs
+_IRI_ESCAPES = {code: f"\\u{code:04X}" for code in list(range(0x21)) + [ord(c) for c in '<>"{}|^`\\']}
+_LITERAL_ESCAPES = {ord("\\"): "\\\\", ord('"'): '\\"', ord("\n"): "\\n", ord("\r"): "\\r", ord("\t"): "\\t"}
+
+AUTHORS = ["0000-0002-0676-682X", "0000-0003-0362-5893", "0000-0003-4970-4554", "0000-0001-5015-5498",
+           "00009-0009-2515-4771"]
+LICENSE = "http://opendatacommons.org/licenses/odbl/1.0/"
+DATASET = "https://doi.org/10.5281/zenodo.7577127"
+
+
+def literal(value, datatype=None, lang=None):
+    """
+    Create a literal term with the same lexical form rdflib assigns to the value.
+
+    :param value: (object) value of the literal.
+    :param datatype: (str) datatype URI.
+    :param lang: (str) language tag.
+    :return: (tuple(str, str, str)) lexical form, datatype and language of the literal.
+    """
+    if hasattr(value, "isoformat"):
+        lexical = value.isoformat()
+    elif isinstance(value, float) or type(value).__name__.startswith("float"):
+        lexical = repr(float(value))
+    elif type(value).__name__.startswith(("int", "uint")):
+        lexical = str(int(value))
+    else:
+        lexical = str(value)
+    return lexical, None if datatype is None else str(datatype), lang
+
+
+class DirectNanopubWriter:
+    """
+    Render CORE nanopubs straight into TriG and TriX text, without building rdflib graphs.
+
+    Every CORE nanopub has the same shape: the head and provenance graphs are constant (up to the nanopub URI) and
+    are rendered once, the other graphs are rendered from the GCS row, its truth value and its sentences. The
+    produced graphs are the same as the ones built by CoreNanopub._createNanopub (see the verify option of the
+    serialization), even though the text differs from the rdflib serializers (e.g., no prefixes in TriG).
+    """
+
+    def __init__(self, namespaces):
+        """
+        Initialisation function.
+
+        :param namespaces: (dict) URI of each namespace defined in the property files.
+        """
+        self.ns = dict(namespaces)
+        self.renderers = {"trig": (self._trig_graph, "", ""),
+                          "trix": (self._trix_graph, '<?xml version="1.0" encoding="utf-8"?>\n'
+                                                     '<TriX xmlns="http://www.w3.org/2004/03/trix/trix-1/">\n',
+                                   "</TriX>\n")}
+        ceonto, prov, eco, wi = self.ns["ceonto"], self.ns["prov"], self.ns["ECO"], self.ns["wi"]
+        head = [(THIS, str(RDF.type), str(NP.Nanopublication)),
+                (THIS, str(NP.hasAssertion), SUB + "assertion"),
+                (THIS, str(NP.hasProvenance), SUB + "provenance"),
+                (THIS, str(NP.hasPublicationInfo), SUB + "pubinfo"),
+                (THIS, str(NP.hasKnowledgeProv), SUB + "knowledgeprov")]
+        provenance = [(SUB + "assertion", prov + "wasGeneratedBy", eco + "0000203"),
+                      (SUB + "assertion", prov + "wasDerivedFrom", "https://gda.dei.unipd.it/"),
+                      (SUB + "assertion", wi + "evidence", ceonto + "gcsEvidence"),
+                      (ceonto + "gcsEvidence", str(RDF.type), eco + "0000212"),
+                      (ceonto + "gcsEvidence", str(RDFS.label), literal("CORE Gene Cancer Status (GCS)", lang="en")),
+                      (ceonto + "gcsEvidence", str(RDFS.comment),
+                       literal("Gene expression-cancer association harvested from collecting the scientific"
+                               " literature from different sources.", lang="en"))]
+        pubinfo = [(THIS, str(DCTERMS.creator), self.ns["orcid"] + AUTHORS[0])] + \
+                  [(THIS, self.ns["pav"] + "authoredBy", self.ns["orcid"] + author) for author in AUTHORS] + \
+                  [(THIS, str(DCTERMS.rights), LICENSE),
+                   (THIS, str(DCTERMS.subject), self.ns["SIO"] + "001123")]
+        reliable_pubinfo = [(THIS, self.ns["prv"] + "usedData", DATASET),
+                            (DATASET, self.ns["pav"] + "version", literal("v1.1", XSD.string))]
+        # constant fragments, rendered once per format
+        self.fragments = {}
+        for ser_format, (render_graph, _, _) in self.renderers.items():
+            self.fragments[ser_format] = {
+                "head": render_graph(SUB + "head", head),
+                "provenance": render_graph(SUB + "provenance", provenance),
+                "pubinfo": self._render_triples(ser_format, pubinfo),
+                "reliable_pubinfo": self._render_triples(ser_format, reliable_pubinfo)}
+
+    def render(self, ser_format, gcs_id, gcs_row, evidence, created, supersedes=None):
+        """
+        Render the nanopub of a GCS fact.
+
+        :param ser_format: (str) serialization format (trig or trix).
+        :param gcs_id: (str) ID of the GCS.
+        :param gcs_row: (pandas.Series) row with GCS information and truth value (see CoreNanopub.classify_data).
+        :param evidence: (list(tuple(str, str, str))) sentence URI, sentence class and GCS class of each sentence.
+        :param created: (datetime.datetime) creation time of the nanopub.
+        :param supersedes: (str) URI of the nanopub superseded by this one, if any.
+        :return: (str) serialized nanopub.
+        """
+        render_graph, header, footer = self.renderers[ser_format]
+        fragments = self.fragments[ser_format]
+        this = self.ns["corenp"] + gcs_id
+        sub = this + "#"
+        gcs_uri = gcs_row["gcs_uri"]
+        ceonto = self.ns["ceonto"]
+        assertion = [(gcs_uri, str(RDF.type), ceonto + "GCS"),
+                     (gcs_uri, ceonto + "involves", gcs_row["involves"]),
+                     (gcs_uri, ceonto + "expressedBy", gcs_row["expressedBy"]),
+                     (gcs_uri, ceonto + "hasType", literal(gcs_row["hasType"], XSD.string))]
+        pubinfo = [(THIS, str(DCTERMS.created), literal(created, XSD.dateTime))]
+        if supersedes is not None:
+            pubinfo.append((THIS, self.ns["npx"] + "supersedes", supersedes))
+        pubinfo_text = self._render_triples(ser_format, pubinfo) + fragments["pubinfo"]
+        if gcs_row["hasType"] != "UNCERTAIN":
+            pubinfo_text += fragments["reliable_pubinfo"]
+        text = header + \
+            render_graph(SUB + "assertion", assertion) + \
+            fragments["head"] + \
+            self._wrap_graph(ser_format, SUB + "pubinfo", pubinfo_text) + \
+            fragments["provenance"] + \
+            render_graph(SUB + "knowledgeprov", self._knowledge_prov(gcs_id, gcs_row, evidence)) + \
+            footer
+        if ser_format == "trig":
+            return text.replace(THIS, _escape_iri(this)).replace(SUB, _escape_iri(sub))
+        return text.replace(THIS, escape(this)).replace(SUB, escape(sub))
+
+    def _knowledge_prov(self, gcs_id, gcs_row, evidence):
+        """
+        Triples of the knowledge provenance graph (see _populateKnowledgeProvGraph).
+        """
+        provk, corekp = self.ns["PROV-K"], self.ns["corekp"]
+        truth_value = corekp + gcs_id
+        triples = []
+        for sentence, sentence_class, gcs_class in evidence:
+            if isinstance(sentence_class, str):
+                relation = "supportedBy" if sentence_class == gcs_class else "conflictingWith"
+                triples.append((SUB + "assertion", provk + relation, sentence))
+        triples.append((SUB + "assertion", provk + "hasTruthValue", truth_value))
+        if gcs_row["truthValue"] != "ReliableFact":
+            triples.append((truth_value, str(RDF.type), provk + gcs_row["truthValue"]))
+            triples.append((truth_value, provk + "unreliabilityReason",
+                            literal(gcs_row["unreliabilityReason"], XSD.string)))
+            for sufficiency_class, sufficiency_score in sufficiency_criteria.items():
+                if gcs_row[sufficiency_class]:
+                    condition = corekp + f"{gcs_id}#{sufficiency_class}"
+                    triples += [(condition, str(RDF.type), provk + sufficiency_class),
+                                (truth_value, provk + "unmetCondition", condition),
+                                (condition, provk + "conditionThreshold", literal(SUFFICIENCY_THRESHOLD, XSD.float)),
+                                (condition, provk + "conditionScore",
+                                 literal(gcs_row[sufficiency_score], XSD.float)),
+                                (condition, provk + "conditionCriteria", self.ns["ceonto"] + sufficiency_class)]
+            if gcs_row["geneClassCriteria"]:
+                condition = corekp + f"{gcs_id}#geneClassCriteria"
+                triples += [(condition, str(RDF.type), provk + "ConsistencyScore"),
+                            (truth_value, provk + "unmetCondition", condition),
+                            (condition, provk + "consistencyThreshold", literal(CONSISTENCY_THRESHOLD, XSD.float)),
+                            (condition, provk + "consistencyScore", literal(gcs_row["consistencyScore"], XSD.float)),
+                            (condition, provk + "conditionCriteria", self.ns["ceonto"] + "geneClassCriteria")]
+        else:
+            triples += [(truth_value, str(RDF.type), provk + "ReliableFact"),
+                        (truth_value, provk + "assignedCertaintyDegree",
+                         literal(gcs_row["certaintyDegree"], XSD.float)),
+                        (truth_value, provk + "assignedCertaintyDegreeSupport",
+                         literal(gcs_row["certaintySupport"], XSD.integer))]
+        return triples
+
+    def _render_triples(self, ser_format, triples):
+        if ser_format == "trig":
+            return "".join(f"    {_trig_term(s)} {_trig_term(p)} {_trig_term(o)} .\n" for s, p, o in triples)
+        return "".join(f"    <triple>\n      {_trix_term(s)}\n      {_trix_term(p)}\n      {_trix_term(o)}\n"
+                       f"    </triple>\n" for s, p, o in triples)
+
+    def _wrap_graph(self, ser_format, name, triples_text):
+        if ser_format == "trig":
+            return f"{_trig_term(name)} {{\n{triples_text}}}\n\n"
+        return f"  <graph>\n    <uri>{escape(name)}</uri>\n{triples_text}  </graph>\n"
+
+    def _trig_graph(self, name, triples):
+        return self._wrap_graph("trig", name, self._render_triples("trig", triples))
+
+    def _trix_graph(self, name, triples):
+        return self._wrap_graph("trix", name, self._render_triples("trix", triples))
+
+
+def _escape_iri(iri):
+    return iri.translate(_IRI_ESCAPES)
+
+
+def _trig_term(term):
+    if isinstance(term, tuple):
+        lexical, datatype, lang = term
+        text = '"' + lexical.translate(_LITERAL_ESCAPES) + '"'
+        if lang:
+            return f"{text}@{lang}"
+        return f"{text}^^<{_escape_iri(datatype)}>" if datatype else text
+    return f"<{_escape_iri(term)}>"
+
+
+def _trix_term(term):
+    if isinstance(term, tuple):
+        lexical, datatype, lang = term
+        if datatype:
+            return f"<typedLiteral datatype={quoteattr(datatype)}>{escape(lexical)}</typedLiteral>"
+        if lang:
+            return f"<plainLiteral xml:lang={quoteattr(lang)}>{escape(lexical)}</plainLiteral>"
+        return f"<plainLiteral>{escape(lexical)}</plainLiteral>"
+    return f"<uri>{escape(term)}</uri>"
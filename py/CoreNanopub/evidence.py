@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+
+class EvidenceIndex:
+    """
+    Sentences supporting or conflicting with the GCS facts, grouped by GCS (CSR layout).
+
+    The sentences of each GCS are stored contiguously, in the order of the gcs_sentence table, and located through
+    the offsets of the GCS, hence the sentences of a GCS are retrieved in O(k) instead of scanning the whole table.
+    """
+
+    def __init__(self, gcs_sentence_df):
+        """
+        Initialisation function.
+
+        :param gcs_sentence_df: (pandas.DataFrame) sentences of the GCS facts (gcs, sentence, sentenceClass and
+            gcsClass columns).
+        """
+        codes, gcs_uris = pd.factorize(gcs_sentence_df["gcs"])
+        # stable sort: sentences of the same GCS keep their order, sentences without GCS (-1) come first
+        order = np.argsort(codes, kind="stable")
+        order = order[np.count_nonzero(codes < 0):]
+        counts = np.bincount(codes[codes >= 0], minlength=len(gcs_uris))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).tolist()
+        self.ranges = {gcs_uri: (offsets[i], offsets[i + 1]) for i, gcs_uri in enumerate(gcs_uris)}
+        self.sentence = gcs_sentence_df["sentence"].to_numpy(dtype=object)[order]
+        self.sentence_class = gcs_sentence_df["sentenceClass"].to_numpy(dtype=object)[order]
+        self.gcs_class = gcs_sentence_df["gcsClass"].to_numpy(dtype=object)[order]
+
+    def __len__(self):
+        return len(self.sentence)
+
+    def sentences_of(self, gcs_uri):
+        """
+        Get the sentences of a GCS.
+
+        :param gcs_uri: (str) URI of the considered GCS.
+        :return: (iterator(tuple(str, str, str))) sentence URI, sentence class and GCS class of each sentence.
+        """
+        start, end = self.ranges.get(gcs_uri, (0, 0))
+        return zip(self.sentence[start:end], self.sentence_class[start:end], self.gcs_class[start:end])
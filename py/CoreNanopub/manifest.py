@@ -0,0 +1,83 @@
+import os
+
+import pandas as pd
+
+from .delta import fingerprint_facts
+
+# fingerprints of the input of the nanopubs, and of their serialized files
+INPUT_COLUMNS = ["fact", "evidence", "output"]
+MANIFEST_COLUMNS = INPUT_COLUMNS + ["files"]
+
+
+def fingerprint_nanopubs(gcs_df, gcs_sentence_df, settings, supersedes=None):
+    """
+    Compute the fingerprint of the input of each nanopub: its GCS fact (truth value included), its sentences and
+    the settings affecting its serialization.
+
+    :param gcs_df: (pandas.DataFrame) GCS facts indexed by GCS id (with the gcs_uri column).
+    :param gcs_sentence_df: (pandas.DataFrame) sentences of the GCS facts.
+    :param settings: (str) serialization settings shared by all the nanopubs (e.g., creation time and engine).
+    :param supersedes: (dict) URI of the nanopub superseded by the nanopub of each GCS id, if any.
+    :return: (pandas.DataFrame) fact, evidence and output fingerprints, indexed by GCS id.
+    """
+    supersedes = supersedes or {}
+    fingerprints = fingerprint_facts(gcs_df, gcs_sentence_df)
+    output = pd.Series([f"{settings}|{supersedes.get(gcs_id, '')}" for gcs_id in gcs_df.index], dtype=object)
+    fingerprints["output"] = pd.util.hash_pandas_object(output, index=False).to_numpy()
+    return fingerprints
+
+
+def fingerprint_files(directories, ids):
+    """
+    Compute the fingerprint of the serialized files of each nanopub: the size and modification time of its file in
+    each format, hence a file modified or removed after the serialization changes the fingerprint.
+
+    :param directories: (dict) serialization directory of each format (ending with /).
+    :param ids: (pandas.Index) GCS ids (i.e., names of the files).
+    :return: (numpy.ndarray) fingerprint of the files of each nanopub.
+    """
+    stats = []
+    for gcs_id in ids:
+        file_stats = []
+        for ser_format, directory in sorted(directories.items()):
+            try:
+                stat = os.stat(f"{directory}{gcs_id}.{ser_format}")
+                file_stats.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+            except FileNotFoundError:
+                file_stats.append("missing")
+        stats.append("|".join(file_stats))
+    return pd.util.hash_pandas_object(pd.Series(stats, dtype=object), index=False).to_numpy()
+
+
+def read_manifest(path):
+    """
+    Read the fingerprints of the nanopubs serialized by the previous runs.
+
+    :param path: (str) path to the manifest.
+    :return: (pandas.DataFrame) fingerprints indexed by GCS id (empty if the manifest does not exist).
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=MANIFEST_COLUMNS, index=pd.Index([], name="id", dtype=str), dtype="uint64")
+    manifest = pd.read_csv(path, index_col="id", dtype={"id": str, **{column: "uint64" for column in MANIFEST_COLUMNS}})
+    if "files" not in manifest.columns:
+        # manifest written before the files were fingerprinted: their nanopubs are serialized again
+        manifest["files"] = pd.Series(0, index=manifest.index, dtype="uint64")
+    return manifest
+
+
+def write_manifest(path, previous, current):
+    """
+    Store the fingerprints of the serialized nanopubs, keeping the ones of the previous runs not serialized by the
+    current one.
+
+    :param path: (str) path to the manifest.
+    :param previous: (pandas.DataFrame) fingerprints of the previous runs (see read_manifest).
+    :param current: (pandas.DataFrame) fingerprints of the nanopubs of the current run (see fingerprint_nanopubs),
+        with the fingerprints of their files (see fingerprint_files).
+    """
+    manifest = pd.concat([previous.loc[~previous.index.isin(current.index)], current[MANIFEST_COLUMNS]])
+    manifest.index.name = "id"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # the manifest is replaced at once, hence an interrupted run leaves the previous one intact
+    manifest.to_csv(path + ".tmp")
+    os.replace(path + ".tmp", path)
@@ -1,5 +1,24 @@
 import re
 
+import numpy as np
+import pandas as pd
+
+# a likelihood of being not informative above this threshold fails the sufficiency check
+SUFFICIENCY_THRESHOLD = 0.7
+# a difference between the likelihoods of two gene roles below this threshold fails the consistency check
+CONSISTENCY_THRESHOLD = 0.4
+
+# likelihood (score) checked by each sufficiency criterion
+sufficiency_criteria = {"ccsCriteria": "CCSNotInformativeLikelihood",
+                        "gciCriteria": "PTNotInformativeLikelihood"}
+
+assigned_certainty_degree = {"ONCOGENE": "AGTOncogeneLikelihood",
+                             "BIOMARKER": "EGRPassiveLikelihood",
+                             "TSG": "AGTTSGLikelihood"}
+assigned_certainty_degree_support = {"ONCOGENE": "AGTOncogeneSupport",
+                                     "BIOMARKER": "EGRPassiveSupport",
+                                     "TSG": "AGTTSGSupport"}
+
 
 def _extractGCSID(gcs_uri):
     """
@@ -31,8 +50,72 @@ def process_gcs(gcs_df):
     :return (list(str)) list of GCS id with insufficient evidence.
     """
 
-    invalid_gcs = gcs_df.loc[(gcs_df["CCSNotInformativeLikelihood"] > 0.7) |
-                             (gcs_df["PTNotInformativeLikelihood"] > 0.7)]
+    invalid_gcs = gcs_df.loc[(gcs_df["CCSNotInformativeLikelihood"] > SUFFICIENCY_THRESHOLD) |
+                             (gcs_df["PTNotInformativeLikelihood"] > SUFFICIENCY_THRESHOLD)]
 
     return invalid_gcs.index.to_list()
 
+
+
+def classify_truth_values(gcs_df):
+    """
+    Assign the truth value of every GCS fact at once.
+
+    UNCERTAIN facts are InsufficientEvidence if the CCS or the GCI fails the sufficiency check, otherwise
+    ContrastingEvidence if the active and passive roles, or the oncogene and TSG roles, fail the consistency check.
+    The other facts are ReliableFact, with the certainty degree and support of their type.
+
+    :param gcs_df: (pandas.DataFrame) GCS facts indexed by GCS id.
+    :return: (pandas.DataFrame, pandas.Series) truth values (truthValue, unreliabilityReason, the unmet criteria
+        ccsCriteria, gciCriteria and geneClassCriteria, consistencyScore, certaintyDegree and certaintySupport),
+        and the description of the UNCERTAIN facts whose likelihoods are inconsistent with their type.
+    """
+    uncertain = (gcs_df["hasType"] == "UNCERTAIN").to_numpy()
+    ccs = (gcs_df["CCSNotInformativeLikelihood"] > SUFFICIENCY_THRESHOLD).to_numpy()
+    gci = (gcs_df["PTNotInformativeLikelihood"] > SUFFICIENCY_THRESHOLD).to_numpy()
+    active_passive = np.abs(gcs_df["EGRActiveLikelihood"].to_numpy(dtype=float) -
+                            gcs_df["EGRPassiveLikelihood"].to_numpy(dtype=float))
+    oncogene_tsg = np.abs(gcs_df["AGTOncogeneLikelihood"].to_numpy(dtype=float) -
+                          gcs_df["AGTTSGLikelihood"].to_numpy(dtype=float))
+    passive = (gcs_df["EGRPassiveLikelihood"] > gcs_df["EGRActiveLikelihood"]).to_numpy()
+
+    # checks in order of precedence, each one applies only to the facts passing the previous ones
+    insufficient = uncertain & (ccs | gci)
+    contrasting_role = uncertain & ~insufficient & (active_passive <= CONSISTENCY_THRESHOLD)
+    biomarker = uncertain & ~insufficient & ~contrasting_role & passive
+    contrasting_gene = uncertain & ~insufficient & ~contrasting_role & ~biomarker & \
+        (oncogene_tsg <= CONSISTENCY_THRESHOLD)
+    active = uncertain & ~insufficient & ~contrasting_role & ~biomarker & ~contrasting_gene
+
+    truth_values = pd.DataFrame(index=gcs_df.index)
+    truth_values["truthValue"] = np.where(~uncertain, "ReliableFact",
+                                          np.where(insufficient, "InsufficientEvidence", "ContrastingEvidence"))
+    truth_values["unreliabilityReason"] = np.select(
+        [insufficient & ccs & gci, insufficient & ccs, insufficient & gci, contrasting_role, contrasting_gene],
+        ["Insufficient evidence for determining the Change of Cancer Status (CCS) and the Gene-Cancer Interaction"
+         " (GCI).",
+         "Insufficient evidence for determining the the Change of Cancer Status (CCS)",
+         "Insufficient evidence for determining the Gene-Cancer Interaction (GCI).",
+         "Contrasting evidence for determining an active (oncogene, or tumor supressor gene) or passive (biomarker)"
+         " role.",
+         "Contrasting evidence for determining oncogene or tumor suppressor gene's role."],
+        default=None)
+    truth_values["ccsCriteria"] = insufficient & ccs
+    truth_values["gciCriteria"] = insufficient & gci
+    truth_values["geneClassCriteria"] = contrasting_role | contrasting_gene
+    truth_values["consistencyScore"] = np.select([contrasting_role, contrasting_gene],
+                                                 [active_passive, oncogene_tsg], default=np.nan)
+    # certainty degree and support of the type of reliable facts
+    has_type = gcs_df["hasType"].to_numpy()
+    truth_values["certaintyDegree"] = np.select(
+        [has_type == gene_type for gene_type in assigned_certainty_degree],
+        [gcs_df[column].to_numpy() for column in assigned_certainty_degree.values()], default=np.nan)
+    truth_values["certaintySupport"] = np.select(
+        [has_type == gene_type for gene_type in assigned_certainty_degree_support],
+        [gcs_df[column].to_numpy() for column in assigned_certainty_degree_support.values()], default=0)
+
+    inconsistent = pd.Series(np.select([biomarker, active],
+                                       ["deemed as \"UNRELIABLE\" but should be \"BIOMARKER\"",
+                                        "deemed as \"UNRELIABLE\" but should be either \"ONCOGENE\" or \"TSG\""],
+                                       default=None), index=gcs_df.index)
+    return truth_values, inconsistent.loc[biomarker | active]
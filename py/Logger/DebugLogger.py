@@ -33,7 +33,8 @@ class DebugLogger:
             '%(asctime)s - [%(module)s:%(lineno)d]- %(levelname)s - %(message)s')
 
         self.logger = logging.getLogger()
-        self.logger.setLevel(logging.INFO)
+        # DEBUG enables per-item messages, INFO only logs periodic progress summaries
+        self.logger.setLevel(config.get('LOGS', 'level', fallback='INFO'))
 
         lhandler = logging.StreamHandler()
         lhandler.setFormatter(formatter)
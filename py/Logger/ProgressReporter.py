@@ -0,0 +1,78 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
+
+class ProgressReporter:
+    """
+    Periodically log the progress of a loop: processed items, throughput, ETA and running counters
+    (e.g., uncertain and reliable facts), instead of logging every item.
+    """
+
+    def __init__(self, logger, description, total=None, unit="items", interval=30.0):
+        """
+        Initialisation function.
+
+        :param logger: (logging.Logger) logger.
+        :param description: (str) description of the loop.
+        :param total: (int) number of items to process, if known.
+        :param unit: (str) name of the processed items.
+        :param interval: (float) seconds between two summaries.
+        """
+        self.logger = logger
+        self.description = description
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.done = 0
+        self.counters = Counter()
+        self.start_time = time.monotonic()
+        self.last_report = self.start_time
+
+    def update(self, n=1, **counters):
+        """
+        Mark n items as processed.
+
+        :param n: (int) number of processed items.
+        :param counters: (int) increments of the running counters.
+        """
+        self.done += n
+        self.counters.update(counters)
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.logger.info(self.summary(now))
+
+    def count(self, **counters):
+        """
+        Increment the running counters without marking items as processed.
+
+        :param counters: (int) increments of the running counters.
+        """
+        self.counters.update(counters)
+
+    def summary(self, now=None):
+        """
+        Describe the progress so far.
+
+        :return: (str) progress summary.
+        """
+        elapsed = (now or time.monotonic()) - self.start_time
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        message = f"{self.description}: {self.done}"
+        if self.total:
+            message += f"/{self.total} {self.unit} ({100 * self.done / self.total:.1f}%)"
+        else:
+            message += f" {self.unit}"
+        message += f" - {rate:.1f} {self.unit}/s - elapsed {timedelta(seconds=round(elapsed))}"
+        if self.total and rate > 0:
+            message += f" - ETA {timedelta(seconds=round((self.total - self.done) / rate))}"
+        if self.counters:
+            message += " - " + ", ".join(f"{name}: {value}" for name, value in sorted(self.counters.items()))
+        return message
+
+    def close(self):
+        """
+        Log the final summary.
+        """
+        self.logger.info(self.summary() + " (completed)")
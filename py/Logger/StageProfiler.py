@@ -0,0 +1,149 @@
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+_DISABLED = nullcontext()
+
+
+class StageProfiler:
+    """
+    Opt-in instrumentation of the stages of a pipeline (e.g., reading the data, populating each graph, serializing
+    each format): cumulative wall time, number of calls and, when tracing the memory, allocated memory of each stage.
+    Every Nth item (e.g., nanopub) can also be profiled on its own with cProfile and a tracemalloc snapshot.
+
+    When disabled, stage returns a shared no-op context manager, hence the instrumented code is left almost as fast.
+    """
+
+    def __init__(self, logger, enabled=False, memory=False, snapshot_every=0, snapshot_dir=None):
+        """
+        Initialisation function.
+
+        :param logger: (logging.Logger) logger.
+        :param enabled: (bool) whether to record the stages.
+        :param memory: (bool) whether to trace the memory allocated by each stage (tracemalloc, slow).
+        :param snapshot_every: (int) profile every Nth item (see item), 0 not to profile any item.
+        :param snapshot_dir: (str) directory of the cProfile (.prof) and tracemalloc (.tracemalloc) snapshots.
+        """
+        self.logger = logger
+        self.enabled = enabled
+        self.memory = enabled and memory
+        self.snapshot_every = snapshot_every if enabled else 0
+        self.snapshot_dir = snapshot_dir
+        self.items = 0
+        self.reset()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.snapshot_every > 0:
+            os.makedirs(snapshot_dir, exist_ok=True)
+
+    def reset(self):
+        """
+        Forget the recorded stages (e.g., in a worker process, whose stages are merged by the parent process).
+        """
+        self.start_time = time.perf_counter()
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.allocated = defaultdict(int)
+        self.peak = defaultdict(int)
+
+    def stage(self, name):
+        """
+        Record a stage.
+
+        :param name: (str) name of the stage.
+        :return: (context manager) context measuring the stage.
+        """
+        if not self.enabled:
+            return _DISABLED
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name):
+        if self.memory:
+            allocated_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+            self.calls[name] += 1
+            if self.memory:
+                allocated_after, peak = tracemalloc.get_traced_memory()
+                self.allocated[name] += allocated_after - allocated_before
+                self.peak[name] = max(self.peak[name], peak - allocated_before)
+
+    def item(self, name):
+        """
+        Profile an item (e.g., the creation of a nanopub) if it is the Nth one since the last profiled item.
+
+        :param name: (str) name of the item, used to name its snapshots.
+        :return: (context manager) context profiling the item.
+        """
+        if self.snapshot_every <= 0:
+            return _DISABLED
+        self.items += 1
+        if self.items % self.snapshot_every != 0:
+            return _DISABLED
+        return self._snapshot(name)
+
+    @contextmanager
+    def _snapshot(self, name):
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            path = os.path.join(self.snapshot_dir, name)
+            profile.dump_stats(path + ".prof")
+            if tracemalloc.is_tracing():
+                tracemalloc.take_snapshot().dump(path + ".tracemalloc")
+            self.logger.debug(f"Profile of {name} stored at {path}.prof")
+
+    def stats(self):
+        """
+        :return: (dict) seconds, calls, allocated bytes and peak bytes of each recorded stage.
+        """
+        return {name: {"seconds": self.seconds[name], "calls": self.calls[name], "allocated": self.allocated[name],
+                       "peak": self.peak[name]} for name in self.seconds}
+
+    def merge(self, stats):
+        """
+        Add the stages recorded by another profiler (e.g., in a worker process).
+
+        :param stats: (dict) recorded stages (see stats).
+        """
+        for name, stage in stats.items():
+            self.seconds[name] += stage["seconds"]
+            self.calls[name] += stage["calls"]
+            self.allocated[name] += stage["allocated"]
+            self.peak[name] = max(self.peak[name], stage["peak"])
+
+    def report(self, path=None):
+        """
+        Log a summary of the recorded stages, slowest first, and store it as JSON.
+
+        :param path: (str) path to the JSON report, None to only log the summary.
+        """
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - self.start_time
+        stages = sorted(self.stats().items(), key=lambda stage: stage[1]["seconds"], reverse=True)
+        lines = [f"Profiled stages (elapsed {elapsed:.1f} s):"]
+        for name, stage in stages:
+            line = f"  {name}: {stage['seconds']:.3f} s in {stage['calls']} calls " \
+                   f"({1000 * stage['seconds'] / stage['calls']:.3f} ms/call, {100 * stage['seconds'] / elapsed:.1f}%)"
+            if self.memory:
+                line += f" - allocated {stage['allocated'] / 2 ** 20:.1f} MB, peak {stage['peak'] / 2 ** 20:.1f} MB"
+            lines.append(line)
+        self.logger.info("\n".join(lines))
+        if path is not None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w") as report_file:
+                json.dump({"elapsed": elapsed, "memory": self.memory, "stages": dict(stages)}, report_file, indent=2)
+            self.logger.info(f"Profiling report stored at {path}")
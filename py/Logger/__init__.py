@@ -1 +1,3 @@
 from .DebugLogger import DebugLogger
+from .ProgressReporter import ProgressReporter
+from .StageProfiler import StageProfiler
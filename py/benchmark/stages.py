@@ -0,0 +1,121 @@
+import glob
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from rdflib import ConjunctiveGraph
+
+from CoreNanopub.CoreNanopub import CoreNanopub
+from benchmark.synthetic_corekb import generate_corekb, write_tables, write_ttl
+from Logger import DebugLogger
+from extended_nanopub.sign_utils import verify_signature, verify_trusty
+from extended_nanopub.utils import extract_enp_metadata
+from prepare_dataset.extract_coreKB_facts_lightRDF import extract_facts_single_pass
+
+# creation time of the benchmark nanopubs, fixed to produce the same files in every run
+CREATED = "2023-01-27T00:00:00"
+
+
+def run_stage(stage, *args):
+    """
+    Run a stage of the benchmark in a new process, hence its peak memory is measured on its own.
+
+    :param stage: (str) stage (see STAGES).
+    :param args: arguments of the stage.
+    :return: (dict) wall time, number of processed items, throughput and peak RSS of the stage.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(_measure, stage, *args).result()
+
+
+def _measure(stage, *args):
+    DebugLogger()
+    start = time.perf_counter()
+    items = STAGES[stage](*args)
+    seconds = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux
+    return {"seconds": round(seconds, 3), "items": items, "items_per_second": round(items / seconds, 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+
+def generate(workdir, n_gcs, sentences_per_gcs, distribution, uncertain_ratio, seed):
+    """
+    Generate a synthetic CORE-KB dump (workdir/data.ttl) and its gcs and gcs_sentence tables (workdir/gcs.csv and
+    workdir/gcs_sentence.csv), see synthetic_corekb.generate_corekb.
+
+    :return: (int) number of generated GCS facts.
+    """
+    gcs, sentences = generate_corekb(n_gcs, sentences_per_gcs, distribution, uncertain_ratio, seed=seed)
+    write_tables(gcs, sentences, workdir + "gcs.csv", workdir + "gcs_sentence.csv")
+    write_ttl(gcs, sentences, workdir + "data.ttl")
+    return len(gcs.index)
+
+
+def extract(ttl_path):
+    """
+    Extract the GCS facts and sentences of a dump (single pass extraction).
+
+    :param ttl_path: (str) path to the dump.
+    :return: (int) number of extracted GCS facts.
+    """
+    gcs, _ = extract_facts_single_pass(ttl_path, DebugLogger().logger)
+    return len(gcs.index)
+
+
+def serialize(workdir, output, engine, formats, workers, private_key=None, public_key=None):
+    """
+    Serialize (and sign) the nanopubs of the GCS facts in workdir/gcs.csv and workdir/gcs_sentence.csv.
+
+    :param workdir: (str) directory of the benchmark (ending with /).
+    :param output: (str) directory of the nanopubs, relative to workdir.
+    :param engine: (str) serialization engine (rdflib or direct).
+    :param formats: (list(str)) serialization formats.
+    :param workers: (int) number of worker processes.
+    :param private_key: (str) path to the RSA private key signing the nanopubs, None not to sign them.
+    :param public_key: (str) path to the RSA public key of the signed nanopubs.
+    :return: (int) number of serialized nanopubs.
+    """
+    nanopub = CoreNanopub()
+    nanopub.datadir = workdir
+    nanopub.config["PATHS.DATASET"]["gcs"] = "gcs.csv"
+    nanopub.config["PATHS.DATASET"]["gcs_sentence"] = "gcs_sentence.csv"
+    for ser_format in formats:
+        nanopub.config["PATHS.SERIALIZATION"][ser_format] = f"{output}/{ser_format}/"
+        os.makedirs(workdir + f"{output}/{ser_format}/", exist_ok=True)
+    nanopub.config["PATHS.SERIALIZATION"]["manifest"] = f"{output}/manifest.csv"
+    nanopub.config["PATHS.SERIALIZATION"]["trusty_uris"] = f"{output}/trusty_uris.csv"
+    nanopub.config["PATHS.SERIALIZATION"]["profiling"] = f"{output}/profiling/"
+    nanopub.config["SERIALIZATION"]["formats"] = ",".join(formats)
+    nanopub.config["SERIALIZATION"]["engine"] = engine
+    nanopub.config["SERIALIZATION"]["output"] = "files"
+    nanopub.config["SERIALIZATION"]["created"] = CREATED
+    nanopub.config["SERIALIZATION"]["skip_unchanged"] = "false"
+    if private_key is not None:
+        nanopub.config["SIGNING"]["private_key"] = private_key
+        nanopub.config["SIGNING"]["public_key"] = public_key
+    nanopub.create_nanopub_graphs(workers=workers, sign=private_key is not None)
+    return nanopub.progress.done
+
+
+def verify(directory, ser_format, limit):
+    """
+    Verify the signature and the trusty URI of signed nanopubs.
+
+    :param directory: (str) directory of the signed nanopubs.
+    :param ser_format: (str) serialization format of the nanopubs.
+    :param limit: (int) maximum number of verified nanopubs.
+    :return: (int) number of verified nanopubs.
+    """
+    paths = sorted(glob.glob(os.path.join(directory, f"*.{ser_format}")))[:limit]
+    for path in paths:
+        rdf = ConjunctiveGraph()
+        rdf.parse(path, format=ser_format)
+        metadata = extract_enp_metadata(rdf)
+        verify_signature(rdf, metadata.namespace)
+        verify_trusty(rdf, str(metadata.np_uri), metadata.namespace)
+    return len(paths)
+
+
+STAGES = {"generate": generate, "extract": extract, "serialize": serialize, "sign": serialize, "verify": verify}
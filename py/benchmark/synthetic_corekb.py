@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+from CoreNanopub.utils import CONSISTENCY_THRESHOLD, SUFFICIENCY_THRESHOLD, assigned_certainty_degree_support
+from prepare_dataset.extract_coreKB_facts_lightRDF import classify_sentence
+
+GCS_NAMESPACE = "http://gda.dei.unipd.it/cecore/resource/GCS#"
+SENTENCE_NAMESPACE = "http://gda.dei.unipd.it/cecore/resource/Sentence#"
+DISEASE_NAMESPACE = "http://linkedlifedata.com/resource/umls/id/"
+GENE_NAMESPACE = "https://www.ncbi.nlm.nih.gov/gene/"
+
+GENE_TYPES = ["ONCOGENE", "TSG", "BIOMARKER"]
+LIKELIHOOD_COLUMNS = ["CCSNotInformativeLikelihood", "PTNotInformativeLikelihood", "EGRActiveLikelihood",
+                      "EGRPassiveLikelihood", "AGTOncogeneLikelihood", "AGTTSGLikelihood"]
+# labels of the sentences (see prepare_dataset.extract_coreKB_facts_lightRDF.classify_sentence)
+SENTENCE_LABELS = {"PTLabel": ["NOTINF", "OBSERVATION", "CAUSALITY"],
+                   "CCSLabel": ["NOTINF", "PROGRESSION", "REGRESSION"],
+                   "CGELabel": ["UP", "DOWN"]}
+SENTENCE_DISTRIBUTIONS = ["poisson", "uniform", "fixed"]
+
+
+def generate_corekb(n_gcs, sentences_per_gcs=4.0, distribution="poisson", uncertain_ratio=0.25,
+                    insufficient_ratio=0.05, seed=0):
+    """
+    Generate synthetic GCS facts and sentences with the same structure as CORE-KB.
+
+    Reliable facts have a gene type (ONCOGENE, TSG or BIOMARKER), UNCERTAIN facts have likelihoods contrasting
+    either the active and passive roles or the oncogene and TSG roles (as classify_truth_values expects). A share of
+    the facts has insufficient evidence and is dropped by CoreNanopub.process_data, as in the real dump.
+
+    :param n_gcs: (int) number of GCS facts.
+    :param sentences_per_gcs: (float) mean number of sentences of a GCS fact.
+    :param distribution: (str) distribution of the number of sentences of a GCS fact (poisson, uniform between 0
+        and twice the mean, or fixed).
+    :param uncertain_ratio: (float) share of UNCERTAIN facts.
+    :param insufficient_ratio: (float) share of facts with insufficient evidence.
+    :param seed: (int) seed of the random generator.
+    :return: (pandas.DataFrame, pandas.DataFrame) gcs table (as read by CoreNanopub) and sentences, with the gcs
+        URI, the PT, CCS and CGE labels and the class of each sentence.
+    """
+    if distribution not in SENTENCE_DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {distribution} (expected one of {SENTENCE_DISTRIBUTIONS})")
+    rng = np.random.default_rng(seed)
+    uncertain = rng.random(n_gcs) < uncertain_ratio
+    has_type = np.where(uncertain, "UNCERTAIN", rng.choice(GENE_TYPES, n_gcs))
+
+    likelihoods = {column: rng.random(n_gcs) for column in LIKELIHOOD_COLUMNS}
+    # sufficient evidence, unless the fact is one of the insufficient ones
+    for column in ["CCSNotInformativeLikelihood", "PTNotInformativeLikelihood"]:
+        likelihoods[column] *= SUFFICIENCY_THRESHOLD
+    insufficient = rng.random(n_gcs) < insufficient_ratio
+    likelihoods["CCSNotInformativeLikelihood"][insufficient] = \
+        rng.uniform(SUFFICIENCY_THRESHOLD, 1, insufficient.sum()) + 1e-4
+    # UNCERTAIN facts: contrasting active and passive roles, or contrasting oncogene and TSG roles
+    active, passive = likelihoods["EGRActiveLikelihood"], likelihoods["EGRPassiveLikelihood"]
+    oncogene, tsg = likelihoods["AGTOncogeneLikelihood"], likelihoods["AGTTSGLikelihood"]
+    role = uncertain & (rng.random(n_gcs) < 0.5)
+    gene = uncertain & ~role
+    passive[role] = np.clip(active[role] + rng.uniform(-CONSISTENCY_THRESHOLD, CONSISTENCY_THRESHOLD,
+                                                         role.sum()) * 0.99, 0, 1)
+    active[gene] = rng.uniform(0.5, 1, gene.sum())
+    passive[gene] = (active[gene] - CONSISTENCY_THRESHOLD - 0.01) * rng.random(gene.sum())
+    tsg[gene] = np.clip(oncogene[gene] + rng.uniform(-CONSISTENCY_THRESHOLD, CONSISTENCY_THRESHOLD,
+                                                     gene.sum()) * 0.99, 0, 1)
+
+    if distribution == "poisson":
+        n_sentences = rng.poisson(sentences_per_gcs, n_gcs)
+    elif distribution == "uniform":
+        n_sentences = rng.integers(0, int(2 * sentences_per_gcs) + 1, n_gcs)
+    else:
+        n_sentences = np.full(n_gcs, int(sentences_per_gcs))
+
+    gcs_uris = GCS_NAMESPACE + pd.RangeIndex(n_gcs).astype(str)
+    gcs = pd.DataFrame({"id": gcs_uris,
+                        "involves": DISEASE_NAMESPACE + "C" + pd.Index(
+                            rng.integers(0, max(1, n_gcs // 20), n_gcs)).astype(str),
+                        "hasType": has_type,
+                        "expressedBy": GENE_NAMESPACE + pd.Index(
+                            rng.integers(0, max(1, n_gcs // 10), n_gcs)).astype(str)})
+    for column in LIKELIHOOD_COLUMNS:
+        gcs[column] = np.round(likelihoods[column], 4)
+
+    sentence_gcs = np.repeat(np.arange(n_gcs), n_sentences)
+    n_total = len(sentence_gcs)
+    sentences = pd.DataFrame({"gcs": gcs_uris[sentence_gcs],
+                              "sentence": SENTENCE_NAMESPACE + "S" + pd.RangeIndex(n_total).astype(str)})
+    for label, values in SENTENCE_LABELS.items():
+        sentences[label] = rng.choice(values, n_total)
+    sentences["sentenceClass"] = [classify_sentence(pt, ccs, cge) for pt, ccs, cge in
+                                  zip(sentences["PTLabel"], sentences["CCSLabel"], sentences["CGELabel"])]
+    sentences["gcsClass"] = has_type[sentence_gcs]
+
+    # support of each gene type: number of sentences of the GCS fact with that class
+    for gene_type, column in assigned_certainty_degree_support.items():
+        gcs[column] = np.bincount(sentence_gcs[(sentences["sentenceClass"] == gene_type).to_numpy()],
+                                  minlength=n_gcs)
+    return gcs, sentences
+
+
+def write_tables(gcs, sentences, gcs_path, gcs_sentence_path):
+    """
+    Store the synthetic facts as the gcs and gcs_sentence csv files read by CoreNanopub.
+
+    :param gcs: (pandas.DataFrame) gcs table (see generate_corekb).
+    :param sentences: (pandas.DataFrame) sentences (see generate_corekb).
+    :param gcs_path: (str) path to the gcs csv file.
+    :param gcs_sentence_path: (str) path to the gcs_sentence csv file.
+    """
+    gcs.to_csv(gcs_path, index=False)
+    sentences[["gcs", "sentence", "sentenceClass", "gcsClass"]].to_csv(gcs_sentence_path, index=False)
+
+
+def write_ttl(gcs, sentences, ttl_path, chunk_size=10000):
+    """
+    Store the synthetic facts as a Turtle dump with the predicates of the CORE ontology (see
+    prepare_dataset.extract_coreKB_facts_lightRDF).
+
+    :param gcs: (pandas.DataFrame) gcs table (see generate_corekb).
+    :param sentences: (pandas.DataFrame) sentences (see generate_corekb).
+    :param ttl_path: (str) path to the Turtle file.
+    :param chunk_size: (int) number of GCS facts written at a time.
+    """
+    grouped = sentences.groupby("gcs", sort=False)["sentence"].agg(list).to_dict()
+    with open(ttl_path, "w", encoding="utf-8") as ttl_file:
+        ttl_file.write("@prefix ceonto: <http://gda.dei.unipd.it/cecore/ontology/> .\n"
+                       "@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .\n\n")
+        for start in range(0, len(gcs.index), chunk_size):
+            lines = []
+            for row in gcs.iloc[start:start + chunk_size].itertuples(index=False):
+                lines.append(f"<{row.id}> a ceonto:GCS ;\n"
+                             f"    ceonto:involves <{row.involves}> ;\n"
+                             f"    ceonto:hasType \"{row.hasType}\" ;\n"
+                             f"    ceonto:expressedBy <{row.expressedBy}> ;\n")
+                for column in LIKELIHOOD_COLUMNS:
+                    lines.append(f"    ceonto:{column} \"{getattr(row, column)}\"^^xsd:double ;\n")
+                supported_by = grouped.get(row.id)
+                if supported_by:
+                    lines.append("    ceonto:supportedBy " + ", ".join(f"<{s}>" for s in supported_by) + " ;\n")
+                lines.append("    .\n")
+            ttl_file.write("".join(lines))
+        for start in range(0, len(sentences.index), chunk_size):
+            ttl_file.write("".join(f"<{row.sentence}> ceonto:PTLabel \"{row.PTLabel}\" ;\n"
+                                   f"    ceonto:CCSLabel \"{row.CCSLabel}\" ;\n"
+                                   f"    ceonto:CGELabel \"{row.CGELabel}\" .\n"
+                                   for row in sentences.iloc[start:start + chunk_size].itertuples(index=False)))
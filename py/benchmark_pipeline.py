@@ -0,0 +1,76 @@
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from Logger import DebugLogger
+from benchmark.stages import run_stage
+from benchmark.synthetic_corekb import SENTENCE_DISTRIBUTIONS
+from extended_nanopub.profile import generate_keyfiles
+
+parser = argparse.ArgumentParser(description="Benchmark the pipeline (extraction, serialization, signing and "
+                                             "verification) on a synthetic CORE-KB.")
+parser.add_argument("--gcs", type=int, default=10000, help="number of synthetic GCS facts")
+parser.add_argument("--sentences-per-gcs", type=float, default=4.0, help="mean number of sentences of a GCS fact")
+parser.add_argument("--distribution", choices=SENTENCE_DISTRIBUTIONS, default="poisson",
+                    help="distribution of the number of sentences of a GCS fact")
+parser.add_argument("--uncertain-ratio", type=float, default=0.25, help="share of UNCERTAIN GCS facts")
+parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic CORE-KB")
+parser.add_argument("--workdir", default="../data/benchmark/",
+                    help="directory of the synthetic CORE-KB, the nanopublications and the report")
+parser.add_argument("--engine", choices=["rdflib", "direct"], default="rdflib",
+                    help="serialization engine of the unsigned nanopublications")
+parser.add_argument("--formats", default="trix,trig", help="serialization formats (comma separated)")
+parser.add_argument("--workers", type=int, default=1,
+                    help="number of processes serializing the nanopublications in parallel")
+parser.add_argument("--verify-limit", type=int, default=1000, help="maximum number of verified nanopublications")
+parser.add_argument("--report", default=None, help="path to the JSON report (default: <workdir>/report.json)")
+
+
+def main():
+    args = parser.parse_args()
+
+    workdir = os.path.join(args.workdir, "")
+    os.makedirs(workdir, exist_ok=True)
+    formats = args.formats.split(",")
+    report_path = args.report or workdir + "report.json"
+
+    # Logger
+    Logger = DebugLogger("benchmark")
+
+    Logger.logger.info(f'-----\nPIPELINE BENCHMARK (run: {datetime.now()})\n-----')
+
+    key_dir = Path(workdir) / "keys"
+    if not (key_dir / "id_rsa").exists():
+        generate_keyfiles(key_dir)
+
+    # each stage runs in its own process, hence its peak RSS does not include the previous stages
+    stages = {}
+    stages["generate"] = run_stage("generate", workdir, args.gcs, args.sentences_per_gcs, args.distribution,
+                                   args.uncertain_ratio, args.seed)
+    stages["extract"] = run_stage("extract", workdir + "data.ttl")
+    stages["serialize"] = run_stage("serialize", workdir, "nanopubs", args.engine, formats, args.workers)
+    # signing requires the rdflib engine
+    stages["sign"] = run_stage("sign", workdir, "signed", "rdflib", formats, args.workers,
+                               str(key_dir / "id_rsa"), str(key_dir / "id_rsa.pub"))
+    stages["verify"] = run_stage("verify", workdir + f"signed/{formats[-1]}/", formats[-1], args.verify_limit)
+    for stage, measures in stages.items():
+        Logger.logger.info(f"{stage}: {measures['items']} items in {measures['seconds']} s "
+                           f"({measures['items_per_second']} items/s), peak RSS {measures['peak_rss_mb']} MB")
+
+    report = {"run": datetime.now().isoformat(timespec="seconds"),
+              "parameters": vars(args),
+              "dataset_bytes": {name: os.path.getsize(workdir + name)
+                                for name in ["data.ttl", "gcs.csv", "gcs_sentence.csv"]},
+              "stages": stages,
+              "peak_rss_mb": max(measures["peak_rss_mb"] for measures in stages.values())}
+    with open(report_path, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+
+    Logger.logger.info(f'-----\nPIPELINE BENCHMARK COMPLETED at {datetime.now()} (report: {report_path})\n-----')
+
+
+# the stages run in spawned processes, which import this module
+if __name__ == "__main__":
+    main()
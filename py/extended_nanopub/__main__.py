@@ -13,7 +13,7 @@ from extended_nanopub._version import __version__
 from extended_nanopub.definitions import DEFAULT_PROFILE_PATH, USER_CONFIG_DIR
 from extended_nanopub.profile import Profile, ProfileError, generate_keyfiles
 from extended_nanopub.templates.nanopub_introduction import NanopubIntroduction
-from extended_nanopub.utils import MalformedNanopubError
+from extended_nanopub.validation import nanopub_files, validate_file, validate_files
 
 cli = typer.Typer(help="Nanopub Command Line Interface")
 
@@ -102,15 +102,42 @@ def publish(
 
 
 
-@cli.command(help='Check if a signed Nanopublication is valid')
-def check(filepath: Path):
-    config = NanopubConf(profile=load_profile())
-    np = ExtendedNanopub(conf=config, rdf=filepath)
-    try:
-        np.is_valid
-        print(f"\033[1m✅ Valid extended_nanopub\033[0m {np.source_uri}")
-    except MalformedNanopubError as e:
-        print(f"\033[1m❌ Invalid extended_nanopub\033[0m: {e}")
+@cli.command(help='Check if a Nanopublication, or all the Nanopublications in a directory, are valid')
+def check(
+    path: Path,
+    workers: int = typer.Option(
+        os.cpu_count() or 1, "--workers", "-w",
+        help="Number of processes validating the nanopublications of a directory.",
+    ),
+    signature: bool = typer.Option(
+        False, "--signature/--no-signature",
+        help="Also verify the signature and the trusty URI of the signed nanopublications.",
+    ),
+    show: int = typer.Option(20, help="Maximum number of invalid nanopublications listed for a directory."),
+):
+    if not path.is_dir():
+        result = validate_file(path, check_signature=signature)
+        if result.valid:
+            print(f"\033[1m✅ Valid extended_nanopub\033[0m {result.np_uri}")
+        else:
+            print(f"\033[1m❌ Invalid extended_nanopub\033[0m: {result.error}")
+            raise typer.Exit(code=1)
+        return
+
+    paths = nanopub_files(path)
+    print(f" 🔍 Checking {len(paths)} nanopublications in \033[1m{path}\033[0m with {workers} processes")
+    failures = []
+    for result in validate_files(paths, workers=workers, check_signature=signature):
+        if not result.valid:
+            failures.append(result)
+    for result in failures[:show]:
+        print(f"\033[1m❌ {result.path}\033[0m: {result.error}")
+    if len(failures) > show:
+        print(f" ... and {len(failures) - show} more")
+    print(f"\033[1m✅ {len(paths) - len(failures)} valid\033[0m, \033[1m❌ {len(failures)} invalid\033[0m "
+          f"extended_nanopubs")
+    if failures:
+        raise typer.Exit(code=1)
 
 
 @cli.command(help='Interactive CLI to create a extended_nanopub user profile. '
@@ -0,0 +1,56 @@
+"""
+This module holds the reader of nanopublication bundles: directories of shard files, each one holding many serialized
+(optionally compressed) nanopublications as separate blocks, with an index of the shard, offset and length of every
+block. The bundles are written by CoreNanopub.bundle.NanopubBundleWriter.
+"""
+import csv
+import gzip
+import json
+import os
+from typing import Dict, List, Tuple
+
+# metadata (format, number of shards, compression) and index of a bundle, marking a bundle directory
+BUNDLE_META = "bundle.json"
+BUNDLE_INDEX = "index.csv"
+BUNDLE_FILES = (BUNDLE_META, BUNDLE_INDEX)
+
+
+def shard_name(ser_format: str, shard: int, compression: str) -> str:
+    """Name of a shard file"""
+    return f"nanopubs-{shard:04d}.{ser_format}" + (".gz" if compression == "gzip" else "")
+
+
+class NanopubBundle:
+    """Read single nanopublications from a bundle, with one seek each
+
+    Args:
+        directory: directory of the bundle
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, BUNDLE_META)) as meta_file:
+            self.meta = json.load(meta_file)
+        # shard, offset and length of the block of each nanopublication
+        self.index: Dict[str, Tuple[int, int, int]] = {}
+        with open(os.path.join(directory, BUNDLE_INDEX), newline="") as index_file:
+            for row in csv.DictReader(index_file):
+                self.index[row["id"]] = (int(row["shard"]), int(row["offset"]), int(row["length"]))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def ids(self) -> List[str]:
+        """IDs of the nanopublications in the bundle"""
+        return list(self.index)
+
+    def read(self, gcs_id: str) -> str:
+        """Serialized nanopublication of an ID (the ID of its GCS fact, or its name)"""
+        shard, offset, length = self.index[gcs_id]
+        path = os.path.join(self.directory, shard_name(self.meta["format"], shard, self.meta["compression"]))
+        with open(path, "rb") as shard_file:
+            shard_file.seek(offset)
+            block = shard_file.read(length)
+        if self.meta["compression"] == "gzip":
+            block = gzip.decompress(block)
+        return block.decode("utf-8")
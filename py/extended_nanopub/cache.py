@@ -0,0 +1,160 @@
+"""
+This module holds an on-disk cache of the nanopublications fetched by trusty URI. Trusty URIs are content-addressed,
+hence a cached nanopublication never changes and is never fetched again.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from rdflib import ConjunctiveGraph
+
+from extended_nanopub.definitions import NANOPUB_CACHE_DIR, NANOPUB_CACHE_SIZE
+from extended_nanopub.sign_utils import verify_trusty
+from extended_nanopub.utils import MalformedNanopubError, extract_enp_metadata, log
+
+# trusty artefact of an RDF nanopublication: RA followed by the 43 characters of its hash
+TRUSTY_ARTEFACT = re.compile(r"(RA[A-Za-z0-9_\-]{43})$")
+
+
+def trusty_artefact(uri: str) -> Optional[str]:
+    """Trusty artefact at the end of a nanopublication URI, None if the URI is not a trusty URI"""
+    match = TRUSTY_ARTEFACT.search(str(uri))
+    return match.group(1) if match else None
+
+
+class NanopubCache:
+    """On-disk cache of nanopublications keyed by their trusty artefact
+
+    Each nanopublication is stored as N-Quads in its own file, after its trusty URI has been verified once. When the
+    files exceed the maximum size, the least recently used ones are evicted (the modification time of a file is
+    updated at every hit). A cache can be shared by threads (e.g., by fetch_many).
+
+    Args:
+        directory: directory of the cached nanopublications
+        max_size: maximum size of the cached nanopublications in bytes
+    """
+
+    def __init__(self, directory: Union[str, Path] = NANOPUB_CACHE_DIR, max_size: int = NANOPUB_CACHE_SIZE):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        # size of each cached nanopublication from the least to the most recently used, and their total size, read
+        # from the directory at the first insertion
+        self._entries: Optional[Dict[str, int]] = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _path(self, artefact: str) -> Path:
+        return self.directory / f"{artefact}.nq"
+
+    def load(self, source_uri: str, g: ConjunctiveGraph) -> bool:
+        """Parse the cached nanopublication of a trusty URI into a graph
+
+        The entry is parsed into a temporary graph first, hence the graph is left empty on a miss. An entry that
+        cannot be parsed (e.g., truncated or corrupted on disk) is removed and counts as a miss.
+
+        Returns:
+            True on a cache hit, False if the nanopublication is not cached
+        """
+        artefact = trusty_artefact(source_uri)
+        if artefact is None:
+            return False
+        path = self._path(artefact)
+        cached = ConjunctiveGraph()
+        try:
+            cached.parse(str(path), format="nquads")
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            log.warning(f"Cached nanopub {source_uri} removed, cannot be parsed: {e}")
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                if self._entries is not None and artefact in self._entries:
+                    self._size -= self._entries.pop(artefact)
+            return False
+        g.addN((s, p, o, g.get_context(c.identifier)) for s, p, o, c in cached.quads((None, None, None, None)))
+        with self._lock:
+            if self._entries is not None and artefact in self._entries:
+                self._entries.move_to_end(artefact)
+        return True
+
+    def put(self, source_uri: str, g: ConjunctiveGraph) -> bool:
+        """Cache a fetched nanopublication, if its trusty URI is valid
+
+        Returns:
+            True if the nanopublication has been cached
+        """
+        artefact = trusty_artefact(source_uri)
+        if artefact is None:
+            return False
+        try:
+            verify_trusty(g, artefact, extract_enp_metadata(g).namespace)
+        except MalformedNanopubError as e:
+            log.warning(f"Nanopub {source_uri} not cached: {e}")
+            return False
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(artefact)
+        # written to a temporary file and renamed, hence other processes never read a partial entry
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        g.serialize(str(tmp_path), format="nquads")
+        os.replace(tmp_path, path)
+        size = path.stat().st_size
+        with self._lock:
+            entries = self._load_entries()
+            if artefact in entries:
+                self._size -= entries.pop(artefact)
+            entries[artefact] = size
+            self._size += size
+            self._evict()
+        return True
+
+    def _load_entries(self) -> Dict[str, int]:
+        if self._entries is None:
+            # ordered by last use once, then kept in order by load and put
+            stats = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".nq"):
+                        stat = entry.stat()
+                        stats.append((stat.st_mtime, entry.name[:-3], stat.st_size))
+            self._entries = OrderedDict((artefact, size) for _, artefact, size in sorted(stats))
+            self._size = sum(self._entries.values())
+        return self._entries
+
+    def _evict(self) -> None:
+        """Remove the least recently used nanopublications until the cache fits its maximum size"""
+        while self._size > self.max_size and self._entries:
+            artefact, entry_size = self._entries.popitem(last=False)
+            try:
+                self._path(artefact).unlink()
+            except FileNotFoundError:
+                pass
+            self._size -= entry_size
+
+    def clear(self) -> None:
+        """Remove all the cached nanopublications"""
+        with self._lock:
+            for artefact in list(self._load_entries()) if self.directory.exists() else []:
+                try:
+                    self._path(artefact).unlink()
+                except FileNotFoundError:
+                    pass
+            self._entries = OrderedDict()
+            self._size = 0
+
+
+_default_cache: Optional[NanopubCache] = None
+
+
+def default_cache() -> NanopubCache:
+    """Cache shared by the nanopublications of the process (NANOPUB_CACHE_DIR, at most NANOPUB_CACHE_SIZE bytes)"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = NanopubCache()
+    return _default_cache
@@ -3,7 +3,7 @@
 
 import random
 import warnings
-from typing import List, Tuple, Union
+from typing import Iterable, Iterator, List, Tuple, Union
 
 import rdflib
 import requests
@@ -17,6 +17,7 @@ from .definitions import (
     NANOPUB_TEST_SERVER,
 )
 from .extended_nanopub import ExtendedNanopub
+from .fetch import fetch_many
 from .nanopub_conf import NanopubConf
 from .utils import log
 
@@ -216,6 +217,21 @@ class NanopubClient:
         return [result["np"] for result in results]
 
 
+    def fetch_many(self, uris: Iterable[str], concurrency: int = 8, **kwargs) -> Iterator[ExtendedNanopub]:
+        """Fetch many published nanopublications concurrently
+
+        Args:
+            uris (iterable of str): URIs of the nanopublications
+            concurrency (int): number of concurrent requests
+            kwargs: other arguments of extended_nanopub.fetch.fetch_many (e.g., per_host, retries, parse_workers)
+
+        Returns:
+            Iterator of the nanopublications, in the order they are retrieved
+        """
+        conf = NanopubConf(use_test_server=self.use_test_server)
+        yield from fetch_many(uris, concurrency=concurrency, conf=conf, **kwargs)
+
+
     @staticmethod
     def _query_grlc(params: dict, endpoint: str, grlc_url: str) -> requests.Response:
         """Query a specific extended_nanopub server grlc endpoint."""
@@ -7,6 +7,9 @@ TESTS_FILEPATH = ROOT_FILEPATH / "tests"
 TEST_RESOURCES_FILEPATH = TESTS_FILEPATH / "resources"
 USER_CONFIG_DIR = Path.home() / ".extended_nanopub"
 DEFAULT_PROFILE_PATH = USER_CONFIG_DIR / "profile.yml"
+# nanopubs fetched by trusty URI (see extended_nanopub.cache)
+NANOPUB_CACHE_DIR = USER_CONFIG_DIR / "cache"
+NANOPUB_CACHE_SIZE = 256 * 2 ** 20
 
 NANOPUB_TEST_SERVER = 'http://test-server.nanopubs.lod.labs.vu.nl/'
 # List of servers: https://monitor.petapico.org/.csv
@@ -6,19 +6,26 @@ import re
 from copy import deepcopy
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterable, Optional, Tuple, Union
 
 import rdflib
 import requests
 from rdflib import BNode, ConjunctiveGraph, Graph, URIRef
+from rdflib.term import Node
 from rdflib.namespace import DC, DCTERMS, FOAF, PROV, RDF, XSD
 
+from extended_nanopub.cache import default_cache
 from extended_nanopub.definitions import MAX_TRIPLES_PER_NANOPUB, NANOPUB_FETCH_FORMAT, NANOPUB_TEST_SERVER
 from extended_nanopub.namespaces import HYCL, NP, NPX, NTEMPLATE, ORCID, PAV
 from extended_nanopub.nanopub_conf import NanopubConf
 from extended_nanopub.profile import ProfileError
 from extended_nanopub.sign_utils import add_signature, publish_graph, verify_signature, verify_trusty
+from extended_nanopub.store import new_graph
 from extended_nanopub.utils import MalformedNanopubError, NanopubMetadata, extract_enp_metadata, log
+from extended_nanopub.validation import validate_nanopub
+
+# conf shared (read-only) by the nanopublications wrapped with from_graph and from_quads
+DEFAULT_CONF = NanopubConf()
 
 
 class ExtendedNanopub:
@@ -52,6 +59,10 @@ class ExtendedNanopub:
         self._concept_uri: Optional[str] = None
         self._conf = deepcopy(conf)
         self._metadata = NanopubMetadata()
+        # graph (and its number of triples) from which the cached metadata was extracted
+        self._metadata_graph = None
+        self._metadata_len = -1
+        self._cached_metadata = self._metadata
         self._published = False
         if self._conf.use_test_server:
             self._conf.use_server = NANOPUB_TEST_SERVER
@@ -61,28 +72,32 @@ class ExtendedNanopub:
         # Get the extended_nanopub RDF depending on how it is provided:
         # source URI, rdflib graph, or file
         if source_uri:
-            # If source URI provided we retrieve the extended_nanopub from the servers
-            r = requests.get(source_uri + "." + NANOPUB_FETCH_FORMAT)
-            if not r.ok and self._conf.use_test_server:
-                nanopub_id = source_uri.rsplit("/", 1)[-1]
-                uri_test = NANOPUB_TEST_SERVER + nanopub_id
-                r = requests.get(uri_test + "." + NANOPUB_FETCH_FORMAT)
-            r.raise_for_status()
-            self._rdf = self._preformat_graph(ConjunctiveGraph())
-            self._rdf.parse(data=r.text, format=NANOPUB_FETCH_FORMAT)
-
-            self._metadata = extract_enp_metadata(self._rdf)
+            # If source URI provided we retrieve the extended_nanopub from the cache or the servers
+            self._rdf = self._preformat_graph(new_graph(self._conf.compact_store))
+            cache = default_cache() if self._conf.use_cache else None
+            if cache is None or not cache.load(source_uri, self._rdf):
+                r = requests.get(source_uri + "." + NANOPUB_FETCH_FORMAT)
+                if not r.ok and self._conf.use_test_server:
+                    nanopub_id = source_uri.rsplit("/", 1)[-1]
+                    uri_test = NANOPUB_TEST_SERVER + nanopub_id
+                    r = requests.get(uri_test + "." + NANOPUB_FETCH_FORMAT)
+                r.raise_for_status()
+                self._rdf.parse(data=r.text, format=NANOPUB_FETCH_FORMAT)
+                if cache is not None:
+                    cache.put(source_uri, self._rdf)
+
+            self._metadata = self._extract_metadata(self._rdf)
         else:
             # if provided as rdflib graph, or file
             if isinstance(rdf, ConjunctiveGraph):
                 self._rdf = self._preformat_graph(rdf)
-                self._metadata = extract_enp_metadata(self._rdf)
+                self._metadata = self._extract_metadata(self._rdf)
             elif isinstance(rdf, Path):
-                self._rdf = self._preformat_graph(ConjunctiveGraph())
+                self._rdf = self._preformat_graph(new_graph(self._conf.compact_store))
                 self._rdf.parse(rdf)
-                self._metadata = extract_enp_metadata(self._rdf)
+                self._metadata = self._extract_metadata(self._rdf)
             else:
-                self._rdf = self._preformat_graph(ConjunctiveGraph())
+                self._rdf = self._preformat_graph(new_graph(self._conf.compact_store))
 
         # Instantiate the different graph from the provided RDF (trig/nquads)
         self._head = Graph(self._rdf.store, self._metadata.head)
@@ -153,6 +168,78 @@ class ExtendedNanopub:
         self._handle_derived_from(derived_from=self._conf.derived_from)
 
 
+    @classmethod
+    def from_graph(
+        cls,
+        rdf: ConjunctiveGraph,
+        conf: NanopubConf = DEFAULT_CONF,
+        metadata: Optional[NanopubMetadata] = None,
+    ) -> "ExtendedNanopub":
+        """Wrap a complete nanopublication graph (Head graph included) without the setup of the constructor
+
+        The graph and its store are adopted as they are (no prefixes are bound, no triples are added or copied) and
+        the conf is shared instead of copied, hence it must not be modified. The metadata (and the Head, assertion,
+        provenance, pubinfo and knowledgeprov graphs) are extracted at the first access, unless they are provided
+        by the caller; use is_valid to validate the nanopublication.
+        """
+        np = cls.__new__(cls)
+        np._profile = conf.profile
+        np._source_uri = None
+        np._introduces_concept = None
+        np._concept_uri = None
+        if conf.use_test_server and conf.use_server != NANOPUB_TEST_SERVER \
+                or conf.use_server == NANOPUB_TEST_SERVER and not conf.use_test_server:
+            # the server settings are normalised on a copy, as in the constructor
+            conf = deepcopy(conf)
+            conf.use_server = NANOPUB_TEST_SERVER
+            conf.use_test_server = True
+        np._conf = conf
+        np._published = False
+        np._rdf = rdf
+        np._metadata_graph = None
+        np._metadata_len = -1
+        np._cached_metadata = None
+        np._metadata = None
+        if metadata is not None:
+            np._set_metadata(metadata)
+        return np
+
+
+    @classmethod
+    def from_quads(
+        cls,
+        quads: Iterable[Tuple[Node, Node, Node, Node]],
+        conf: NanopubConf = DEFAULT_CONF,
+        metadata: Optional[NanopubMetadata] = None,
+    ) -> "ExtendedNanopub":
+        """Build a nanopublication from its quads (subject, predicate, object, graph URI or Graph), see from_graph"""
+        rdf = new_graph(conf.compact_store)
+        contexts = {}
+        for s, p, o, c in quads:
+            if isinstance(c, Graph):
+                c = c.identifier
+            if c not in contexts:
+                contexts[c] = Graph(rdf.store, c)
+            contexts[c].add((s, p, o))
+        return cls.from_graph(rdf, conf, metadata)
+
+
+    def _set_metadata(self, metadata: NanopubMetadata) -> None:
+        """Set the metadata and the graphs of the nanopublication"""
+        self._metadata = metadata
+        self._head = Graph(self._rdf.store, metadata.head)
+        self._assertion = Graph(self._rdf.store, metadata.assertion)
+        self._provenance = Graph(self._rdf.store, metadata.provenance)
+        self._pubinfo = Graph(self._rdf.store, metadata.pubinfo)
+        self._knowledgeprov = Graph(self._rdf.store, metadata.knowledgeprov)
+
+
+    def _ensure_metadata(self) -> None:
+        """Extract the metadata of a nanopublication wrapped by from_graph, at the first access"""
+        if self._metadata is None:
+            self._set_metadata(self._extract_metadata(self._rdf))
+
+
     def _preformat_graph(self, g: ConjunctiveGraph) -> ConjunctiveGraph:
         """Add a few default namespaces"""
         g.bind("np", NP)
@@ -170,18 +257,33 @@ class ExtendedNanopub:
         return g
 
 
+    def _extract_metadata(self, g: ConjunctiveGraph) -> NanopubMetadata:
+        """Extract the metadata of a graph, reusing the ones extracted last if the graph was not mutated since then
+
+        The methods of this class mutating the graph (sign, update and update_from_signed) invalidate the metadata
+        themselves. Other mutations are only detected by a change of the number of triples of the graph: call
+        invalidate_metadata after modifying the Head or pubinfo graphs from outside.
+        """
+        if g is not self._metadata_graph or len(g) != self._metadata_len:
+            self._cached_metadata = extract_enp_metadata(g)
+            self._metadata_graph = g
+            self._metadata_len = len(g)
+        return self._cached_metadata
+
+
+    def invalidate_metadata(self) -> None:
+        """Extract the metadata again at the next lookup"""
+        self._metadata_graph = None
+
+
     def update_from_signed(self, signed_g: ConjunctiveGraph) -> None:
         """Update the pub RDF to the signed one"""
-        self._metadata = extract_enp_metadata(signed_g)
+        self._rdf = signed_g
+        self.invalidate_metadata()
+        self._set_metadata(self._extract_metadata(signed_g))
         if self._metadata.trusty:
             self._source_uri = str(self._metadata.np_uri)
         # self._source_uri = self.get_source_uri_from_graph
-        self._rdf = signed_g
-        self._head = Graph(self._rdf.store, self._metadata.head)
-        self._assertion = Graph(self._rdf.store, self._metadata.assertion)
-        self._provenance = Graph(self._rdf.store, self._metadata.provenance)
-        self._pubinfo = Graph(self._rdf.store, self._metadata.pubinfo)
-        self._knowledgeprov = Graph(self._rdf.store, self._metadata.knowledgeprov)
 
 
     def sign(self) -> None:
@@ -190,6 +292,7 @@ class ExtendedNanopub:
             raise MalformedNanopubError(f"Nanopublication contains {len(self.rdf)} triples, which is more than the {MAX_TRIPLES_PER_NANOPUB} authorized")
         if not self._conf.profile:
             raise ProfileError("Profile not available, cannot sign the extended_nanopub")
+        self._ensure_metadata()
         if self._metadata.signature:
             raise MalformedNanopubError(f"The extended_nanopub have already been signed: {self.source_uri}")
 
@@ -220,6 +323,7 @@ class ExtendedNanopub:
 
     def update(self, publish=True) -> None:
         """Re-publish an updated Nanopub object"""
+        self._ensure_metadata()
         self._pubinfo.add((
             URIRef(self.source_uri),
             NPX.supersedes,
@@ -230,7 +334,9 @@ class ExtendedNanopub:
             None,
             None,
         ))
-        self._metadata = extract_enp_metadata(self._rdf)
+        # the supersedes triple replaces the signature one, hence the number of triples may not change
+        self.invalidate_metadata()
+        self._metadata = self._extract_metadata(self._rdf)
         print(self._metadata)
         if publish:
             self.publish()
@@ -245,53 +351,21 @@ class ExtendedNanopub:
 
     @property
     def has_valid_signature(self) -> bool:
+        self._ensure_metadata()
         verify_signature(self._rdf, self._metadata.namespace)
         return True
 
     @property
     def has_valid_trusty(self) -> bool:
+        self._ensure_metadata()
         verify_trusty(self._rdf, self.source_uri, self._metadata.namespace)
         return True
 
     @property
     def is_valid(self) -> bool:
-        """Check if a nanopublication is valid"""
-        np_meta = extract_enp_metadata(self._rdf)
-        np_uri = np_meta.np_uri
-
-        # Check if any of the graph is empty
-        if len(self._head) < 1:
-            raise MalformedNanopubError("The Head graph is empty")
-        if len(self._assertion) < 1:
-            raise MalformedNanopubError("The assertion graph is empty")
-        if len(self._provenance) < 1:
-            raise MalformedNanopubError("The provenance graph is empty")
-        if len(self._pubinfo) < 1:
-            raise MalformedNanopubError("The pubinfo graph is empty")
-
-        # Check exactly 4 graphs
-        graph_count = 0
-        for c in self._rdf.contexts():
-            if len(list(self._rdf.quads((None, None, None, c)))) > 0:
-                graph_count += 1
-        if graph_count != 4:
-            raise MalformedNanopubError(f"\033[1mToo many graphs found\033[0m in the provided RDF: {graph_count}. A Nanopub should have only 4 graphs (Head, assertion, provenance, pubinfo)")
-
-        found_prov = False
-        for s, p, o in self._provenance:
-            if str(s) == str(np_meta.assertion):
-                found_prov = True
-                break
-        if not found_prov:
-            raise MalformedNanopubError(f"The provenance graph should contain at least one triple with the assertion graph URI as subject: \033[1m{np_meta.assertion}\033[0m")
-
-        found_pubinfo = False
-        for s, p, o in self._pubinfo:
-            if str(s) == str(np_uri) or str(s) == str(np_meta.namespace):
-                found_pubinfo = True
-                break
-        if not found_pubinfo:
-            raise MalformedNanopubError(f"The pubinfo graph should contain at least one triple that has the extended_nanopub URI as subject: \033[1m{np_uri}\033[0m")
+        """Check if a nanopublication is valid (see validation.validate_nanopub)"""
+        self._ensure_metadata()
+        validate_nanopub(self._rdf, self._extract_metadata(self._rdf))
 
         # TODO: add more checks for trusty and signature
         # if self._metadata.signature:
@@ -306,26 +380,32 @@ class ExtendedNanopub:
 
     @property
     def head(self):
+        self._ensure_metadata()
         return self._head
 
     @property
     def assertion(self):
+        self._ensure_metadata()
         return self._assertion
 
     @property
     def provenance(self):
+        self._ensure_metadata()
         return self._provenance
 
     @property
     def pubinfo(self):
+        self._ensure_metadata()
         return self._pubinfo
 
     @property
     def knowledgeprov(self):
+        self._ensure_metadata()
         return self._knowledgeprov
 
     @property
     def metadata(self):
+        self._ensure_metadata()
         return self._metadata
 
     @property
@@ -374,10 +454,12 @@ class ExtendedNanopub:
 
     @property
     def namespace(self):
+        self._ensure_metadata()
         return self._metadata.namespace
 
     @property
     def introduces_concept(self):
+        self._ensure_metadata()
         concepts_introduced = list()
         for s, p, o in self._pubinfo.triples((None, NPX.introduces, None)):
             concepts_introduced.append(o)
@@ -405,7 +487,7 @@ class ExtendedNanopub:
 
     @property
     def signed_with_public_key(self) -> Optional[str]:
-        np_sig = extract_enp_metadata(self._rdf)
+        np_sig = self._extract_metadata(self._rdf)
         if np_sig.public_key:
             return np_sig.public_key
         return None
@@ -0,0 +1,164 @@
+"""
+This module holds the concurrent retrieval of many published nanopublications: the nanopublications are fetched by
+a pool of threads sharing a pooled HTTP session (with a limit of connections per host and retries), and optionally
+parsed by a pool of worker processes.
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+from rdflib import ConjunctiveGraph
+from rdflib.term import Node
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from extended_nanopub.cache import NanopubCache, default_cache
+from extended_nanopub.definitions import NANOPUB_FETCH_FORMAT, NANOPUB_TEST_SERVER
+from extended_nanopub.extended_nanopub import DEFAULT_CONF, ExtendedNanopub
+from extended_nanopub.nanopub_conf import NanopubConf
+from extended_nanopub.store import new_graph
+from extended_nanopub.utils import log
+
+# HTTP statuses of the transient errors retried by the session
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def make_session(per_host: int = 4, retries: int = 3, backoff_factor: float = 0.5) -> requests.Session:
+    """HTTP session keeping at most per_host connections open to each host (the other requests wait for one of them)
+
+    Args:
+        per_host: maximum number of concurrent connections to a host
+        retries: number of retries of a request failing with a connection error or a transient HTTP status
+        backoff_factor: the nth retry is delayed by backoff_factor * 2 ** (n - 1) seconds
+    """
+    retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUSES,
+                  allowed_methods=["GET"], raise_on_status=False)
+    adapter = HTTPAdapter(pool_maxsize=per_host, pool_block=True, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _download(session: requests.Session, source_uri: str, use_test_server: bool, timeout: Optional[float]) -> str:
+    """Text of a published nanopublication, from the test server if it is not found on its server"""
+    r = session.get(source_uri + "." + NANOPUB_FETCH_FORMAT, timeout=timeout)
+    if not r.ok and use_test_server:
+        nanopub_id = source_uri.rsplit("/", 1)[-1]
+        r = session.get(NANOPUB_TEST_SERVER + nanopub_id + "." + NANOPUB_FETCH_FORMAT, timeout=timeout)
+    r.raise_for_status()
+    return r.text
+
+
+def _parse(text: str) -> Tuple[List[Tuple[Node, Node, Node, Node]], List[Tuple[str, Node]]]:
+    """Quads (with graph URIs) and prefixes of a nanopublication, parsed in a worker process"""
+    g = ConjunctiveGraph()
+    g.parse(data=text, format=NANOPUB_FETCH_FORMAT)
+    return [(s, p, o, c.identifier) for s, p, o, c in g.quads((None, None, None, None))], list(g.namespaces())
+
+
+def _load(session: requests.Session, source_uri: str, conf: NanopubConf, timeout: Optional[float],
+          cache: Optional[NanopubCache], parse: bool) -> Tuple[Optional[ConjunctiveGraph], Optional[str]]:
+    """Graph of a nanopublication, from the cache or the servers, in a thread of the pool
+
+    Returns:
+        the graph and None on a cache hit, otherwise the graph (None if not parsed) and the fetched text
+    """
+    g = new_graph(conf.compact_store)
+    if cache is not None and cache.load(source_uri, g):
+        return g, None
+    text = _download(session, source_uri, conf.use_test_server, timeout)
+    if not parse:
+        return None, text
+    g.parse(data=text, format=NANOPUB_FETCH_FORMAT)
+    return g, text
+
+
+def fetch_many(
+    uris: Iterable[str],
+    concurrency: int = 8,
+    per_host: int = 4,
+    retries: int = 3,
+    parse_workers: int = 0,
+    conf: NanopubConf = DEFAULT_CONF,
+    timeout: Optional[float] = 30,
+    skip_errors: bool = False,
+    session: Optional[requests.Session] = None,
+) -> Iterator[ExtendedNanopub]:
+    """Fetch many published nanopublications concurrently, as ExtendedNanopub(source_uri=uri) does for one of them
+
+    The nanopublications are yielded as they are retrieved (not in the order of the URIs), wrapped with
+    ExtendedNanopub.from_graph (their source_uri is set to their URI). As in the constructor, they are looked up in
+    the cache first (if conf.use_cache), fetched from the test server if they are not found on their server (if
+    conf.use_test_server), and cached once fetched.
+
+    Args:
+        uris: URIs of the nanopublications
+        concurrency: number of threads fetching the nanopublications
+        per_host: maximum number of concurrent connections to a host
+        retries: number of retries of a request failing with a connection error or a transient HTTP status
+        parse_workers: number of worker processes parsing the fetched nanopublications, 0 to parse them in the
+            fetching threads
+        conf: conf of the nanopublications, shared instead of copied
+        timeout: timeout of each request in seconds, None to wait forever
+        skip_errors: whether to log and skip the nanopublications that cannot be fetched or parsed, instead of
+            raising
+        session: HTTP session, by default make_session(per_host, retries)
+
+    Raises:
+        requests.RequestException: if a nanopublication cannot be fetched (unless skip_errors)
+        Exception: the error of the rdflib parser if a fetched nanopublication cannot be parsed (unless skip_errors)
+    """
+    if session is None:
+        session = make_session(per_host, retries)
+    cache = default_cache() if conf.use_cache else None
+    parser = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 0 else None
+    uris = iter(uris)
+    # URI and, when the nanopub is parsed by a worker process, fetched text of the pending futures
+    pending: Dict[Future, Tuple[str, Optional[str]]] = {}
+    # at most two nanopubs per thread are in flight, hence the URIs can be a long (or lazy) iterable
+    window = 2 * concurrency
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as fetcher:
+            while True:
+                for uri in uris:
+                    pending[fetcher.submit(_load, session, uri, conf, timeout, cache, parser is None)] = (uri, None)
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    uri, text = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except requests.RequestException as e:
+                        if not skip_errors:
+                            raise
+                        log.warning(f"Nanopub {uri} not fetched: {e}")
+                        continue
+                    except Exception as e:
+                        # the fetched text is not a nanopublication in NANOPUB_FETCH_FORMAT (e.g., BadSyntax)
+                        if not skip_errors:
+                            raise
+                        log.warning(f"Nanopub {uri} not parsed: {e}")
+                        continue
+                    if text is None:
+                        g, text = result
+                        if g is None:
+                            # fetched, parsed by a worker process
+                            pending[parser.submit(_parse, text)] = (uri, text)
+                            continue
+                        np = ExtendedNanopub.from_graph(g, conf)
+                    else:
+                        quads, namespaces = result
+                        np = ExtendedNanopub.from_quads(quads, conf)
+                        for prefix, namespace in namespaces:
+                            np.rdf.bind(prefix, namespace)
+                    if text is not None and cache is not None:
+                        cache.put(uri, np.rdf)
+                    np.source_uri = uri
+                    yield np
+    finally:
+        if parser is not None:
+            parser.shutdown(cancel_futures=True)
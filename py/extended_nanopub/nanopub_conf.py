@@ -20,6 +20,8 @@ class NanopubConf:
         assertion_attributed_to: Optional str
         publication_attributed_to: Optional str
         derived_from: Optional str
+        use_cache: reuse the nanopubs fetched by trusty URI, cached on disk (see extended_nanopub.cache)
+        compact_store: keep the RDF in a CompactStore, lighter than the default store (see extended_nanopub.store)
     """
 
     profile: Optional[Profile] = None
@@ -38,5 +40,9 @@ class NanopubConf:
 
     derived_from: Optional[str] = None
 
+    use_cache: bool = True
+
+    compact_store: bool = False
+
 
     dict = asdict
@@ -1,9 +1,11 @@
 from base64 import decodebytes, encodebytes
+from typing import Optional
 
 import requests
 from Crypto.Hash import SHA256
 from Crypto.PublicKey import RSA
 from Crypto.Signature import PKCS1_v1_5
+from Crypto.Signature.pkcs1_15 import PKCS115_SigScheme
 from rdflib import BNode, ConjunctiveGraph, Literal, Namespace, URIRef
 
 from extended_nanopub.definitions import NANOPUB_SERVER_LIST, NP_PURL, NP_TEMP_PREFIX
@@ -14,8 +16,18 @@ from extended_nanopub.trustyuri.rdf.RdfPreprocessor import transform
 from extended_nanopub.utils import MalformedNanopubError, extract_enp_metadata, log
 
 
-def add_signature(g: ConjunctiveGraph, profile: Profile, dummy_namespace: Namespace, pubinfo_uri: URIRef) -> ConjunctiveGraph:
-    """Implementation in python of the process to sign a extended_nanopub with a RSA private key"""
+def load_signer(profile: Profile) -> PKCS115_SigScheme:
+    """Import the RSA private key of a profile, to sign many nanopubs without importing it every time"""
+    private_key = RSA.importKey(decodebytes(profile.private_key.encode()))
+    return PKCS1_v1_5.new(private_key)
+
+
+def add_signature(g: ConjunctiveGraph, profile: Profile, dummy_namespace: Namespace, pubinfo_uri: URIRef,
+                  signer: Optional[PKCS115_SigScheme] = None) -> ConjunctiveGraph:
+    """Implementation in python of the process to sign a extended_nanopub with a RSA private key
+
+    The private key of the profile is imported unless a signer created with load_signer is provided.
+    """
     g.add((
         dummy_namespace["sig"],
         NPX["hasPublicKey"],
@@ -45,8 +57,8 @@ def add_signature(g: ConjunctiveGraph, profile: Profile, dummy_namespace: Namesp
     # print(f"NORMED RDF STARTS\n{normed_rdf}\nNORMED RDF ENDS")
 
     # Sign the normalized RDF with the private RSA key
-    private_key = RSA.importKey(decodebytes(profile.private_key.encode()))
-    signer = PKCS1_v1_5.new(private_key)
+    if signer is None:
+        signer = load_signer(profile)
     signature_b = signer.sign(SHA256.new(normed_rdf.encode()))
     signature = encodebytes(signature_b).decode().replace("\n", "")
     log.debug(f"Nanopub signature: {signature}")
@@ -79,10 +91,12 @@ def replace_trusty_in_graph(trusty_artefact: str, dummy_ns: str, graph: Conjunct
         # prefix is used in the dummy extended_nanopub URI
         np_uri = NP_PURL + trusty_artefact
     else:
-        np_uri = dummy_ns + trusty_artefact
+        # Same base as the trusty URIs of the nanopub (see RdfUtils.get_trustyuri), e.g. http://example.org/np/ for
+        # both http://example.org/np/ and http://example.org/np/abc#
+        np_uri = "/".join(str(dummy_ns).split('/')[:-1]) + '/' + trusty_artefact
 
-    graph.bind("this", Namespace(np_uri))
-    graph.bind("sub", Namespace(np_uri + "#"))
+    graph.bind("this", Namespace(np_uri), replace=True)
+    graph.bind("sub", Namespace(np_uri + "#"), replace=True)
     graph.bind("", None, replace=True)
 
     # Iterate quads in the graph, and replace by the transformed value
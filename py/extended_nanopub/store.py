@@ -0,0 +1,220 @@
+"""
+This module holds a compact in-memory rdflib store for small nanopublication graphs, which are mostly built once
+(append-only) and then looked up, hashed, signed and serialized.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rdflib import ConjunctiveGraph, Graph, URIRef
+from rdflib.plugin import register
+from rdflib.store import Store
+from rdflib.term import Node
+from rdflib.util import _coalesce
+
+Triple = Tuple[Node, Node, Node]
+
+# lookups of a context by subject, predicate or object answered by a scan before the context is indexed
+SCANS_BEFORE_INDEX = 2
+
+# URIs interned by the stores (predicates, classes and namespaces are shared by many nanopublications). The terms
+# cannot be weakly referenced, hence the table is emptied when it is full
+MAX_INTERNED_URIS = 2 ** 16
+_interned: Dict[URIRef, URIRef] = {}
+
+
+def intern_term(term: Node) -> Node:
+    """Shared instance of a URI (the other terms are returned as they are)"""
+    if type(term) is not URIRef:
+        return term
+    interned = _interned.get(term)
+    if interned is None:
+        if len(_interned) >= MAX_INTERNED_URIS:
+            _interned.clear()
+        interned = _interned[term] = term
+    return interned
+
+
+class CompactStore(Store):
+    """Context-aware in-memory store keeping the triples of each context in a single insertion-ordered table
+
+    The default Memory store indexes every triple by subject, predicate and object, and records the contexts of each
+    triple in two more tables. Here each context only holds its table of triples, whose URIs are interned: the
+    triples with a given subject, predicate or object are found by a scan of the context, which is indexed only when
+    such lookups repeat (e.g., in the serializers) and whose index is then extended by the later additions. The
+    lookups of fully bound triples and the iteration over all the triples (e.g., in extract_enp_metadata,
+    validate_nanopub and the trusty URIs) never build an index. The triples of a context are iterated in their
+    insertion order.
+
+    Formulae (quoted graphs) and store events are not supported.
+    """
+
+    context_aware = True
+    formula_aware = False
+    graph_aware = True
+    transaction_aware = False
+
+    def __init__(self, configuration: Optional[str] = None, identifier: Optional[Node] = None):
+        super().__init__(configuration)
+        self.identifier = identifier
+        # triples of each context identifier (the values are unused) and context of each identifier
+        self._triples: Dict[Node, Dict[Triple, None]] = {}
+        self._graphs: Dict[Node, Graph] = {}
+        # number of distinct triples, and number of extra contexts of the triples found in several contexts
+        self._size = 0
+        self._shared: Dict[Triple, int] = {}
+        # triples of a context by subject (0), predicate (1) or object (2), keyed by (context identifier, position)
+        self._indexes: Dict[Tuple[Node, int], Dict[Node, List[Triple]]] = {}
+        # number of scans of a context by subject, predicate or object, keyed as the indexes
+        self._scans: Dict[Tuple[Node, int], int] = {}
+        self._namespace: Dict[str, URIRef] = {}
+        self._prefix: Dict[URIRef, str] = {}
+
+    def add(self, triple: Triple, context: Graph, quoted: bool = False) -> None:
+        cid = context.identifier
+        triples = self._triples.get(cid)
+        if triples is None:
+            triples = self._triples[cid] = {}
+            self._graphs.setdefault(cid, context)
+        elif triple in triples:
+            return
+        s, p, o = triple
+        triple = (intern_term(s), intern_term(p), intern_term(o))
+        triples[triple] = None
+        if len(self._triples) > 1 and any(triple in other for other in self._triples.values() if other is not triples):
+            self._shared[triple] = self._shared.get(triple, 0) + 1
+        else:
+            self._size += 1
+        if self._indexes:
+            for position in range(3):
+                index = self._indexes.get((cid, position))
+                if index is not None:
+                    index.setdefault(triple[position], []).append(triple)
+
+    def addN(self, quads: Iterable[Tuple[Node, Node, Node, Graph]]) -> None:
+        for s, p, o, c in quads:
+            self.add((s, p, o), c)
+
+    def remove(self, triple_pattern: Tuple[Optional[Node], Optional[Node], Optional[Node]],
+               context: Optional[Graph] = None) -> None:
+        cids = list(self._triples) if context is None else [context.identifier]
+        for cid in cids:
+            triples = self._triples.get(cid)
+            if triples is None:
+                continue
+            matched = self._match(cid, triples, triple_pattern)
+            if not matched:
+                continue
+            for triple in matched:
+                del triples[triple]
+                shared = self._shared.get(triple)
+                if shared is None:
+                    self._size -= 1
+                elif shared == 1:
+                    del self._shared[triple]
+                else:
+                    self._shared[triple] = shared - 1
+            for position in range(3):
+                self._indexes.pop((cid, position), None)
+            if not triples:
+                # the context itself is kept, as by the Memory store
+                del self._triples[cid]
+
+    def triples(self, triple_pattern: Tuple[Optional[Node], Optional[Node], Optional[Node]],
+                context: Optional[Graph] = None) -> Iterator[Tuple[Triple, Iterable[Graph]]]:
+        if context is not None:
+            cid = context.identifier
+            triples = self._triples.get(cid)
+            if triples:
+                graphs = (self._graphs[cid],)
+                for triple in self._match(cid, triples, triple_pattern):
+                    yield triple, graphs
+            return
+        # union of the contexts: the triples found in several contexts are yielded once
+        seen = set()
+        for cid, triples in list(self._triples.items()):
+            graphs = (self._graphs[cid],)
+            for triple in self._match(cid, triples, triple_pattern):
+                if triple not in self._shared:
+                    yield triple, graphs
+                elif triple not in seen:
+                    seen.add(triple)
+                    yield triple, self._contexts_of(triple)
+
+    def _match(self, cid: Node, triples: Dict[Triple, None],
+               triple_pattern: Tuple[Optional[Node], Optional[Node], Optional[Node]]) -> Iterable[Triple]:
+        """Triples of a context matching a pattern (a new sequence, hence the context can be modified meanwhile)"""
+        s, p, o = triple_pattern
+        if s is not None and p is not None and o is not None:
+            triple = (s, p, o)
+            return (triple,) if triple in triples else ()
+        if s is None and p is None and o is None:
+            return list(triples)
+        position, term = (0, s) if s is not None else (2, o) if o is not None else (1, p)
+        return [triple for triple in self._candidates(cid, triples, position, term)
+                if (s is None or triple[0] == s) and (p is None or triple[1] == p) and (o is None or triple[2] == o)]
+
+    def _candidates(self, cid: Node, triples: Dict[Triple, None], position: int, term: Node) -> Iterable[Triple]:
+        """Triples of a context that may have a term at a position: all of them, or the ones found by the index"""
+        key = (cid, position)
+        index = self._indexes.get(key)
+        if index is None:
+            scans = self._scans.get(key, 0)
+            if scans < SCANS_BEFORE_INDEX:
+                self._scans[key] = scans + 1
+                return triples
+            index = self._indexes[key] = {}
+            for triple in triples:
+                index.setdefault(triple[position], []).append(triple)
+        return index.get(term, ())
+
+    def _contexts_of(self, triple: Triple) -> List[Graph]:
+        return [self._graphs[cid] for cid, triples in self._triples.items() if triple in triples]
+
+    def contexts(self, triple: Optional[Triple] = None) -> Iterator[Graph]:
+        if triple is None or triple == (None, None, None):
+            return iter(list(self._graphs.values()))
+        return iter(self._contexts_of(tuple(triple)))
+
+    def __len__(self, context: Optional[Graph] = None) -> int:
+        if context is None:
+            return self._size
+        return len(self._triples.get(context.identifier, ()))
+
+    def add_graph(self, graph: Graph) -> None:
+        self._graphs.setdefault(graph.identifier, graph)
+
+    def remove_graph(self, graph: Graph) -> None:
+        self.remove((None, None, None), graph)
+        self._graphs.pop(graph.identifier, None)
+
+    def bind(self, prefix: str, namespace: URIRef, override: bool = True) -> None:
+        # same as the Memory store
+        bound_namespace = self._namespace.get(prefix)
+        bound_prefix = _coalesce(self._prefix.get(namespace), self._prefix.get(bound_namespace))
+        if override:
+            if bound_prefix is not None:
+                del self._namespace[bound_prefix]
+            if bound_namespace is not None:
+                del self._prefix[bound_namespace]
+            self._prefix[namespace] = prefix
+            self._namespace[prefix] = namespace
+        else:
+            self._prefix[_coalesce(bound_namespace, namespace)] = _coalesce(bound_prefix, default=prefix)
+            self._namespace[_coalesce(bound_prefix, prefix)] = _coalesce(bound_namespace, default=namespace)
+
+    def namespace(self, prefix: str) -> Optional[URIRef]:
+        return self._namespace.get(prefix)
+
+    def prefix(self, namespace: URIRef) -> Optional[str]:
+        return self._prefix.get(namespace)
+
+    def namespaces(self) -> Iterator[Tuple[str, URIRef]]:
+        return iter(list(self._namespace.items()))
+
+
+# usable as ConjunctiveGraph(store="Compact")
+register("Compact", Store, "extended_nanopub.store", "CompactStore")
+
+
+def new_graph(compact: bool = False, identifier: Optional[Node] = None) -> ConjunctiveGraph:
+    """Empty conjunctive graph, backed by a CompactStore if compact, otherwise by the default Memory store"""
+    return ConjunctiveGraph(store=CompactStore() if compact else "default", identifier=identifier)
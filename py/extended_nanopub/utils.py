@@ -1,11 +1,13 @@
 import logging
 import re
 from dataclasses import asdict, dataclass
+from itertools import product
 from typing import Optional
 
-from rdflib import ConjunctiveGraph, Namespace, URIRef
+from rdflib import RDF, ConjunctiveGraph, Graph, Namespace, URIRef
 
 from extended_nanopub.definitions import DUMMY_NAMESPACE, DUMMY_URI
+from extended_nanopub.namespaces import NP, NPX
 
 log = logging.getLogger()
 
@@ -25,6 +27,8 @@ class NanopubMetadata:
     assertion: URIRef = DUMMY_NAMESPACE["assertion"]
     provenance: URIRef = DUMMY_NAMESPACE["provenance"]
     pubinfo: URIRef = DUMMY_NAMESPACE["pubinfo"]
+    # None for a plain nanopublication, whose head links no knowledge provenance graph
+    knowledgeprov: Optional[URIRef] = DUMMY_NAMESPACE["knowledgeprov"]
 
     sig_uri: URIRef = DUMMY_NAMESPACE["sig"]
     signature: Optional[str] = None
@@ -37,54 +41,39 @@ class NanopubMetadata:
 
 
 def extract_enp_metadata(g: ConjunctiveGraph) -> NanopubMetadata:
-    """Extract an extended extended_nanopub URI, namespace and head/assertion/prov/pubinfo contexts from a Graph"""
-    get_np_query = """prefix np: <http://www.nanopub.org/nschema#>
-
-SELECT DISTINCT ?np ?head ?assertion ?provenance ?pubinfo ?knowledgeprov ?sigUri ?signature ?pubkey ?algo
-WHERE {
-    GRAPH ?head {
-        ?np a np:Nanopublication ;
-            np:hasAssertion ?assertion ;
-            np:hasProvenance ?provenance ;
-            np:hasPublicationInfo ?pubinfo;
-             np:hasKnowledgeProv ?knowledgeprov.
-    }
-    GRAPH ?pubinfo {
-        OPTIONAL {
-            ?sigUri npx:hasSignatureTarget ?np ;
-                npx:hasPublicKey ?pubkey ;
-                npx:hasAlgorithm ?algo ;
-                npx:hasSignature ?signature .
-        }
-    }
-}
-"""
-    qres = g.query(get_np_query)
-    if len(qres) < 1:
+    """Extract an extended extended_nanopub URI, namespace and head/assertion/prov/pubinfo contexts from a Graph
+
+    The Head graph and the signature in the pubinfo graph are looked up with triple patterns instead of a SPARQL
+    query, which would be parsed and evaluated for every nanopub (and required the npx prefix to be bound).
+    """
+    rows = []
+    for np_uri, _, _, head in g.quads((None, RDF.type, NP.Nanopublication, None)):
+        for assertion, provenance, pubinfo, knowledgeprov in product(
+                head.objects(np_uri, NP.hasAssertion), head.objects(np_uri, NP.hasProvenance),
+                head.objects(np_uri, NP.hasPublicationInfo),
+                list(head.objects(np_uri, NP.hasKnowledgeProv)) or [None]):
+            # the signature is optional: a nanopub without one is found with empty signature fields
+            signatures = list(_extract_signatures(Graph(g.store, pubinfo), np_uri)) or [(None, None, None, None)]
+            for signature in signatures:
+                row = (np_uri, head.identifier, assertion, provenance, pubinfo, knowledgeprov) + signature
+                if row not in rows:
+                    rows.append(row)
+    if len(rows) < 1:
         raise MalformedNanopubError(
             "\033[1mNo nanopublication\033[0m has been found in the provided RDF. "
             "It should contain a np:Nanopublication object in a Head graph, pointing to 3 graphs: assertion, provenance and pubinfo"
         )
-    if len(qres) > 1:
+    if len(rows) > 1:
         np_found: list = []
-        for row in qres:
-            np_found.append(row.np)
+        for row in rows:
+            np_found.append(row[0])
         raise MalformedNanopubError(
             f"\033[1mMultiple nanopublications\033[0m are defined in this graph: {', '.join(np_found)}. "
             "The Nanopub object can only handles 1 nanopublication at a time"
         )
     np_meta = NanopubMetadata()
-    for row in qres:
-        np_meta.head = row.head
-        np_meta.assertion = row.assertion
-        np_meta.provenance = row.provenance
-        np_meta.pubinfo = row.pubinfo
-        np_meta.knowledgeprov = row.knowledgeprov
-        np_meta.np_uri = row.np
-        np_meta.sig_uri = row.sigUri
-        np_meta.signature = row.signature
-        np_meta.public_key = row.pubkey
-        np_meta.algorithm = row.algo
+    (np_meta.np_uri, np_meta.head, np_meta.assertion, np_meta.provenance, np_meta.pubinfo, np_meta.knowledgeprov,
+     np_meta.sig_uri, np_meta.public_key, np_meta.algorithm, np_meta.signature) = rows[0]
 
     # Check if the extended_nanopub URI has a trusty artefact:
     separator_char = '/'
@@ -102,3 +91,10 @@ WHERE {
             np_meta.namespace = Namespace(np_meta.np_uri + '#')
 
     return np_meta
+
+
+def _extract_signatures(pubinfo: Graph, np_uri: URIRef):
+    """Signatures of a nanopub in its pubinfo graph: signature URI, public key, algorithm and signature"""
+    for sig_uri in pubinfo.subjects(NPX.hasSignatureTarget, np_uri):
+        yield from product([sig_uri], pubinfo.objects(sig_uri, NPX.hasPublicKey),
+                           pubinfo.objects(sig_uri, NPX.hasAlgorithm), pubinfo.objects(sig_uri, NPX.hasSignature))
@@ -0,0 +1,181 @@
+"""
+This module holds the structural validation of nanopublications, computed in a single pass over their quads, and
+its parallel application to the nanopublications stored in a directory.
+"""
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Optional, Union
+
+from rdflib import ConjunctiveGraph
+
+from extended_nanopub.bundle import BUNDLE_FILES, NanopubBundle
+from extended_nanopub.sign_utils import verify_signature, verify_trusty
+from extended_nanopub.utils import MalformedNanopubError, NanopubMetadata, extract_enp_metadata
+
+
+# rdflib format of the nanopublication files by extension (the other files of a directory are not validated)
+NANOPUB_FORMATS = {".trig": "trig", ".trix": "trix", ".nq": "nquads", ".nquads": "nquads"}
+
+class BundleEntry(NamedTuple):
+    """Nanopublication stored in a bundle directory"""
+
+    directory: str
+    gcs_id: str
+
+    def __str__(self) -> str:
+        return f"{self.directory}#{self.gcs_id}"
+
+
+class ValidationResult(NamedTuple):
+    """Outcome of the validation of a nanopublication file"""
+
+    path: str
+    np_uri: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def valid(self) -> bool:
+        return self.error is None
+
+
+def validate_nanopub(g: ConjunctiveGraph, np_meta: Optional[NanopubMetadata] = None) -> NanopubMetadata:
+    """Check the structure of a nanopublication, going through its quads once
+
+    The Head, assertion, provenance and pubinfo graphs must not be empty and must be the only non-empty graphs,
+    together with the knowledge provenance graph of extended nanopublications. The provenance graph must describe
+    the assertion and the pubinfo graph must describe the nanopublication.
+
+    :param g: nanopublication
+    :param np_meta: metadata of the nanopublication, extracted from the graph if not provided
+    :return: metadata of the nanopublication
+    :raises MalformedNanopubError: if the nanopublication is not valid
+    """
+    if np_meta is None:
+        np_meta = extract_enp_metadata(g)
+    assertion = str(np_meta.assertion)
+    provenance = str(np_meta.provenance)
+    pubinfo = str(np_meta.pubinfo)
+    pubinfo_subjects = {str(np_meta.np_uri), str(np_meta.namespace)}
+
+    sizes = Counter()
+    found_prov = False
+    found_pubinfo = False
+    for s, _, _, c in g.quads((None, None, None, None)):
+        context = str(c.identifier)
+        sizes[context] += 1
+        if not found_prov and context == provenance and str(s) == assertion:
+            found_prov = True
+        elif not found_pubinfo and context == pubinfo and str(s) in pubinfo_subjects:
+            found_pubinfo = True
+
+    # Check if any of the graph is empty
+    for name, graph in [("Head", np_meta.head), ("assertion", np_meta.assertion),
+                        ("provenance", np_meta.provenance), ("pubinfo", np_meta.pubinfo)]:
+        if sizes[str(graph)] < 1:
+            raise MalformedNanopubError(f"The {name} graph is empty")
+
+    # Check exactly 4 graphs, plus the knowledge provenance graph (if not empty)
+    expected_count = 5 if np_meta.knowledgeprov is not None and sizes[str(np_meta.knowledgeprov)] > 0 else 4
+    if len(sizes) != expected_count:
+        raise MalformedNanopubError(
+            f"\033[1mToo many graphs found\033[0m in the provided RDF: {len(sizes)}. A Nanopub should have only 4 "
+            f"graphs (Head, assertion, provenance, pubinfo), and a knowledge provenance graph if extended")
+
+    if not found_prov:
+        raise MalformedNanopubError(f"The provenance graph should contain at least one triple with the assertion graph URI as subject: \033[1m{np_meta.assertion}\033[0m")
+    if not found_pubinfo:
+        raise MalformedNanopubError(f"The pubinfo graph should contain at least one triple that has the extended_nanopub URI as subject: \033[1m{np_meta.np_uri}\033[0m")
+    return np_meta
+
+
+def _validate(name: str, parse: Callable[[ConjunctiveGraph], None], check_signature: bool) -> ValidationResult:
+    """Parse a nanopublication into a graph and validate it, catching any error"""
+    np_uri = None
+    try:
+        g = ConjunctiveGraph()
+        parse(g)
+        np_meta = validate_nanopub(g)
+        np_uri = str(np_meta.np_uri)
+        if check_signature and np_meta.signature:
+            verify_signature(g, np_meta.namespace)
+            verify_trusty(g, np_uri, np_meta.namespace)
+    except Exception as e:
+        return ValidationResult(name, np_uri, f"{type(e).__name__}: {e}")
+    return ValidationResult(name, np_uri)
+
+
+def validate_file(path: Union[str, Path], check_signature: bool = False) -> ValidationResult:
+    """Parse and validate a nanopublication file (the format is given by its extension, TriG if unknown)
+
+    :param path: path to the nanopublication
+    :param check_signature: whether to also verify the signature and the trusty URI of signed nanopublications
+    :return: outcome of the validation (parsing errors included)
+    """
+    path = str(path)
+    ser_format = NANOPUB_FORMATS.get(os.path.splitext(path)[1].lower(), "trig")
+    return _validate(path, lambda g: g.parse(path, format=ser_format), check_signature)
+
+
+@lru_cache(maxsize=8)
+def _open_bundle(directory: str) -> NanopubBundle:
+    """Bundle of a directory, whose index is read once per process"""
+    return NanopubBundle(directory)
+
+
+def validate_bundle_entry(entry: BundleEntry, check_signature: bool = False) -> ValidationResult:
+    """Read a nanopublication from its bundle and validate it
+
+    :param entry: bundle directory and GCS id of the nanopublication
+    :param check_signature: whether to also verify the signature and the trusty URI of signed nanopublications
+    :return: outcome of the validation (reading and parsing errors included)
+    """
+    def parse(g: ConjunctiveGraph) -> None:
+        bundle = _open_bundle(entry.directory)
+        g.parse(data=bundle.read(entry.gcs_id), format=NANOPUB_FORMATS.get("." + bundle.meta["format"], "trig"))
+
+    return _validate(str(entry), parse, check_signature)
+
+
+def validate_nanopub_source(source: Union[str, BundleEntry], check_signature: bool = False) -> ValidationResult:
+    """Validate a nanopublication file or bundle entry"""
+    if isinstance(source, BundleEntry):
+        return validate_bundle_entry(source, check_signature)
+    return validate_file(source, check_signature)
+
+
+def nanopub_files(directory: Union[str, Path]) -> List[Union[str, BundleEntry]]:
+    """Nanopublications of a directory and its subdirectories, sorted by path
+
+    The files with a nanopublication extension (e.g., .trig or .trix) are listed, except in the bundle directories
+    (with a bundle.json and an index.csv file), whose nanopublications are listed entry by entry instead.
+    """
+    sources = []
+    for root, _, files in os.walk(directory):
+        if all(name in files for name in BUNDLE_FILES):
+            sources.extend(BundleEntry(root, gcs_id) for gcs_id in _open_bundle(root).ids())
+        else:
+            sources.extend(os.path.join(root, name) for name in files
+                           if os.path.splitext(name)[1].lower() in NANOPUB_FORMATS)
+    return sorted(sources, key=str)
+
+
+def validate_files(sources: List[Union[str, BundleEntry]], workers: int = 1, check_signature: bool = False,
+                   chunksize: int = 64) -> Iterator[ValidationResult]:
+    """Validate many nanopublication files or bundle entries with a pool of worker processes
+
+    :param sources: paths to the nanopublications, or bundle entries (as listed by nanopub_files)
+    :param workers: number of worker processes (1 validates the nanopublications in the current process)
+    :param check_signature: whether to also verify the signature and the trusty URI of signed nanopublications
+    :param chunksize: number of nanopublications sent to a worker at a time
+    :return: outcome of the validation of each nanopublication, in the order of the sources
+    """
+    if workers <= 1:
+        for source in sources:
+            yield validate_nanopub_source(source, check_signature)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(validate_nanopub_source, sources, [check_signature] * len(sources),
+                                chunksize=chunksize)
@@ -0,0 +1,102 @@
+import json
+import os
+from collections import defaultdict
+
+import pandas as pd
+
+
+class ChunkedCSVWriter:
+    """
+    Append the gcs and gcs_sentence rows to their CSV files every chunk_size GCS facts and keep a checkpoint
+    of the last GCS fact stored, so that an interrupted extraction can be resumed.
+
+    The checkpoint stores the size of both files after each chunk: when resuming, any row written after the last
+    checkpoint is dropped before appending new rows.
+    """
+
+    def __init__(self, gcs_path, gcs_sentence_path, checkpoint_path, gcs_columns, gcs_sentence_columns,
+                 chunk_size=1000, resume=False):
+        """
+        Initialisation function.
+
+        :param gcs_path: (str) path to the gcs CSV file.
+        :param gcs_sentence_path: (str) path to the gcs_sentence CSV file.
+        :param checkpoint_path: (str) path to the checkpoint file.
+        :param gcs_columns: (list(str)) columns of the gcs table.
+        :param gcs_sentence_columns: (list(str)) columns of the gcs_sentence table.
+        :param chunk_size: (int) number of GCS facts written at once.
+        :param resume: (bool) whether to resume from the checkpoint (if any) or to start from scratch.
+        """
+        self.gcs_path = gcs_path
+        self.gcs_sentence_path = gcs_sentence_path
+        self.checkpoint_path = checkpoint_path
+        self.gcs_columns = gcs_columns
+        self.gcs_sentence_columns = gcs_sentence_columns
+        self.chunk_size = chunk_size
+
+        self.checkpoint = None
+        if resume and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as checkpoint_file:
+                self.checkpoint = json.load(checkpoint_file)
+            # drop the rows written after the checkpoint
+            for path, offset in [(gcs_path, self.checkpoint["gcs_offset"]),
+                                 (gcs_sentence_path, self.checkpoint["gcs_sentence_offset"])]:
+                with open(path, "r+b") as csv_file:
+                    csv_file.truncate(offset)
+        else:
+            pd.DataFrame(columns=gcs_columns).to_csv(gcs_path, index=False)
+            pd.DataFrame(columns=gcs_sentence_columns).to_csv(gcs_sentence_path, index=False)
+            if os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+        self.gcs_count = self.checkpoint["gcs_count"] if self.checkpoint else 0
+        self._reset_chunk()
+
+    @property
+    def last_gcs(self):
+        """
+        URI of the last GCS fact stored before resuming, None if starting from scratch.
+        """
+        return self.checkpoint["gcs_uri"] if self.checkpoint else None
+
+    def _reset_chunk(self):
+        self.gcs_dict = defaultdict(list)
+        self.gcs_sentence_dict = defaultdict(list)
+        self.chunk_gcs = 0
+
+    def end_gcs(self, gcs_uri):
+        """
+        Mark the rows of a GCS fact as complete, writing the chunk once it reaches chunk_size GCS facts.
+
+        :param gcs_uri: (str) URI of the completed GCS fact.
+        """
+        self.gcs_count += 1
+        self.chunk_gcs += 1
+        self.chunk_last_gcs = gcs_uri
+        if self.chunk_gcs >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Append the current chunk to the CSV files and update the checkpoint.
+        """
+        if self.chunk_gcs == 0:
+            return
+        pd.DataFrame(self.gcs_dict, columns=self.gcs_columns).to_csv(
+            self.gcs_path, mode="a", header=False, index=False)
+        pd.DataFrame(self.gcs_sentence_dict, columns=self.gcs_sentence_columns).to_csv(
+            self.gcs_sentence_path, mode="a", header=False, index=False)
+        self.checkpoint = {"gcs_uri": self.chunk_last_gcs,
+                           "gcs_count": self.gcs_count,
+                           "gcs_offset": os.path.getsize(self.gcs_path),
+                           "gcs_sentence_offset": os.path.getsize(self.gcs_sentence_path)}
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as checkpoint_file:
+            json.dump(self.checkpoint, checkpoint_file)
+        os.replace(tmp_path, self.checkpoint_path)
+        self._reset_chunk()
+
+    def close(self):
+        """
+        Write the last chunk.
+        """
+        self.flush()
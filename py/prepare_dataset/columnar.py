@@ -0,0 +1,58 @@
+import pandas as pd
+
+GCS_NAMESPACE = "http://gda.dei.unipd.it/cecore/resource/GCS#"
+
+LIKELIHOOD_COLUMNS = ["CCSNotInformativeLikelihood", "PTNotInformativeLikelihood", "EGRActiveLikelihood",
+                      "EGRPassiveLikelihood", "AGTOncogeneLikelihood", "AGTTSGLikelihood"]
+CATEGORICAL_COLUMNS = ["hasType", "sentenceClass", "gcsClass"]
+
+
+def typed_gcs(gcs):
+    """
+    Convert the gcs table in the typed layout read by CoreNanopub.
+
+    The GCS id is precomputed from the GCS URI (stored in gcs_uri), likelihoods are stored as floats
+    and gene classes as categories.
+
+    :param gcs: (pandas.DataFrame) gcs table as extracted from the dump.
+    :return: (pandas.DataFrame) typed gcs table.
+    """
+    typed = pd.DataFrame({"id": gcs["id"].str.replace(GCS_NAMESPACE, "", regex=False),
+                          "gcs_uri": gcs["id"]})
+    for column in gcs.columns.drop("id"):
+        typed[column] = _typed_column(gcs[column])
+    return typed
+
+
+def typed_gcs_sentence(gcs_sentence):
+    """
+    Convert the gcs_sentence table in the typed layout read by CoreNanopub.
+
+    :param gcs_sentence: (pandas.DataFrame) gcs_sentence table as extracted from the dump.
+    :return: (pandas.DataFrame) typed gcs_sentence table.
+    """
+    return pd.DataFrame({column: _typed_column(gcs_sentence[column]) for column in gcs_sentence.columns})
+
+
+def to_parquet(df, path):
+    """
+    Store a typed table in a Parquet file.
+
+    :param df: (pandas.DataFrame) typed table.
+    :param path: (str) path to the output file.
+    """
+    df.to_parquet(path, engine="pyarrow", index=False)
+
+
+def _typed_column(column):
+    """
+    Cast a column to its type in the columnar layout.
+
+    :param column: (pandas.Series) column of the gcs or gcs_sentence table.
+    :return: (pandas.Series) typed column.
+    """
+    if column.name in LIKELIHOOD_COLUMNS:
+        return column.astype("float64")
+    if column.name in CATEGORICAL_COLUMNS:
+        return column.astype("category")
+    return column
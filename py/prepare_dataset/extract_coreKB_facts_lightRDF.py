@@ -2,59 +2,191 @@ import re
 
 import rdflib
 from collections import defaultdict
+from functools import lru_cache
 import pandas as pd
 import lightrdf
 from lightrdf.python_module.parse import literal, iri
 
+from Logger import ProgressReporter
+
 CEONTO = "<http://gda.dei.unipd.it/cecore/ontology/"
 SIO = "<http://semanticscience.org/resource/SIO_"
 RDF = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#"
 
+# GCS properties stored in the gcs table (column name, predicate, whether the object is an IRI)
+GCS_PROPERTIES = [("involves", CEONTO + "involves>", True),
+                  ("hasType", CEONTO + "hasType>", False),
+                  ("expressedBy", CEONTO + "expressedBy>", True),
+                  ("CCSNotInformativeLikelihood", CEONTO + "CCSNotInformativeLikelihood>", False),
+                  ("PTNotInformativeLikelihood", CEONTO + "PTNotInformativeLikelihood>", False),
+                  ("EGRActiveLikelihood", CEONTO + "EGRActiveLikelihood>", False),
+                  ("EGRPassiveLikelihood", CEONTO + "EGRPassiveLikelihood>", False),
+                  ("AGTOncogeneLikelihood", CEONTO + "AGTOncogeneLikelihood>", False),
+                  ("AGTTSGLikelihood", CEONTO + "AGTTSGLikelihood>", False)]
+# Sentence labels used to classify the sentences
+SENTENCE_LABELS = [CEONTO + "PTLabel>", CEONTO + "CCSLabel>", CEONTO + "CGELabel>"]
+
+
+def extract_facts_chunked(dump, writer, logger, sentence_classes=None):
+    """
+    Extract GCS facts and their sentences, appending them to the output files in chunks.
+
+    If the writer was resumed from a checkpoint, the GCS facts up to the last stored one are skipped.
 
-def extract_facts(dump, logger):
+    :param dump: (lightrdf.RDFDocument) dump document.
+    :param writer: (ChunkedCSVWriter) writer of the gcs and gcs_sentence CSV files.
+    :param logger: (logging.Logger) logger.
+    :param sentence_classes: (dict) gene class of each sentence (see build_sentence_classes), optional.
+    """
     logger.info(f"...Iterating over the facts")
-    # convert output to DataFrame
-    gcs_dict = defaultdict(list)
-    gcs_sentence_dict = defaultdict(list)
+    progress = ProgressReporter(logger, "Extracted GCS facts", unit="GCS")
     count = 1
+    skip = writer.gcs_count
     for triple in dump.search_triples(None, RDF+'type>', CEONTO+'GCS>'):
-        gcs_id = re.sub("http://gda.dei.unipd.it/cecore/resource/GCS#", "", triple[0])
-        logger.info(f"...Considering GCS {gcs_id} ({count}/231099)")
-        logger.info(f"GCS URI: {triple[0]}")
+        if count <= skip:
+            if count == skip and triple[0] != writer.last_gcs:
+                raise ValueError(f"GCS {count} is {triple[0]} but the checkpoint refers to {writer.last_gcs}: "
+                                 f"the dump changed since the interrupted run")
+            count += 1
+            continue
+        gcs_type = extract_gcs(dump, writer.gcs_dict, writer.gcs_sentence_dict, logger, triple[0], count,
+                               sentence_classes)
+        writer.end_gcs(triple[0])
+        progress.update(uncertain=int(gcs_type == "UNCERTAIN"), reliable=int(gcs_type != "UNCERTAIN"))
         count += 1
-        # store gcs URI
-        gcs_dict['id'].append(iri(triple[0]))
-        # store additional information associated w/ GCS
-        logger.info(f"Extracting GCS information...")
-        # involved disease
-        involves_triple = list(dump.search_triples(triple[0], CEONTO+"involves>", None))[0]
-        # gene class
-        hasType_triple = list(dump.search_triples(triple[0], CEONTO + "hasType>", None))[0]
-        # gene expression
-        expressedBy_triple = list(dump.search_triples(triple[0], CEONTO + "expressedBy>", None))[0]
-        # Probabilities
-        CCSnotInf_triple = list(dump.search_triples(triple[0], CEONTO+"CCSNotInformativeLikelihood>", None))[0]
-        PTnotInf_triple = list(dump.search_triples(triple[0], CEONTO+"PTNotInformativeLikelihood>", None))[0]
-        EGRActive_triple = list(dump.search_triples(triple[0], CEONTO+"EGRActiveLikelihood>", None))[0]
-        EGRPassive_triple = list(dump.search_triples(triple[0], CEONTO+"EGRPassiveLikelihood>", None))[0]
-        AGTOncog_triple = list(dump.search_triples(triple[0], CEONTO+"AGTOncogeneLikelihood>", None))[0]
-        AGTTSG_triple = list(dump.search_triples(triple[0], CEONTO+"AGTTSGLikelihood>", None))[0]
-        # Store GCS information in dictionary
-        gcs_dict['involves'].append(iri(involves_triple[2]))
-        gcs_dict['hasType'].append(literal(hasType_triple[2])[0])
-        gcs_dict['expressedBy'].append(iri(expressedBy_triple[2]))
-        gcs_dict['CCSNotInformativeLikelihood'].append(literal(CCSnotInf_triple[2])[0])
-        gcs_dict['PTNotInformativeLikelihood'].append(literal(PTnotInf_triple[2])[0])
-        gcs_dict['EGRActiveLikelihood'].append(literal(EGRActive_triple[2])[0])
-        gcs_dict['EGRPassiveLikelihood'].append(literal(EGRPassive_triple[2])[0])
-        gcs_dict['AGTOncogeneLikelihood'].append(literal(AGTOncog_triple[2])[0])
-        gcs_dict['AGTTSGLikelihood'].append(literal(AGTTSG_triple[2])[0])
-        # Extract related sentences
-        extract_gcs_sentence(dump, gcs_sentence_dict, logger, str(triple[0]))
-        logger.info(f"+++ GCS {gcs_id} COMPLETED +++")
-    gcs = pd.DataFrame(gcs_dict)
-    gcs_sentence = pd.DataFrame(gcs_sentence_dict)
-    return gcs, gcs_sentence
+    writer.close()
+    progress.close()
+
+
+def extract_gcs(dump, gcs_dict, gcs_sentence_dict, logger, gcs_uri, count, sentence_classes=None):
+    gcs_id = re.sub("http://gda.dei.unipd.it/cecore/resource/GCS#", "", gcs_uri)
+    logger.debug(f"...Considering GCS {gcs_id} (#{count})")
+    logger.debug(f"GCS URI: {gcs_uri}")
+    # store gcs URI
+    gcs_dict['id'].append(iri(gcs_uri))
+    # store additional information associated w/ GCS
+    logger.debug(f"Extracting GCS information...")
+    # involved disease
+    involves_triple = list(dump.search_triples(gcs_uri, CEONTO+"involves>", None))[0]
+    # gene class
+    hasType_triple = list(dump.search_triples(gcs_uri, CEONTO + "hasType>", None))[0]
+    # gene expression
+    expressedBy_triple = list(dump.search_triples(gcs_uri, CEONTO + "expressedBy>", None))[0]
+    # Probabilities
+    CCSnotInf_triple = list(dump.search_triples(gcs_uri, CEONTO+"CCSNotInformativeLikelihood>", None))[0]
+    PTnotInf_triple = list(dump.search_triples(gcs_uri, CEONTO+"PTNotInformativeLikelihood>", None))[0]
+    EGRActive_triple = list(dump.search_triples(gcs_uri, CEONTO+"EGRActiveLikelihood>", None))[0]
+    EGRPassive_triple = list(dump.search_triples(gcs_uri, CEONTO+"EGRPassiveLikelihood>", None))[0]
+    AGTOncog_triple = list(dump.search_triples(gcs_uri, CEONTO+"AGTOncogeneLikelihood>", None))[0]
+    AGTTSG_triple = list(dump.search_triples(gcs_uri, CEONTO+"AGTTSGLikelihood>", None))[0]
+    # Store GCS information in dictionary
+    gcs_dict['involves'].append(iri(involves_triple[2]))
+    gcs_dict['hasType'].append(literal(hasType_triple[2])[0])
+    gcs_dict['expressedBy'].append(iri(expressedBy_triple[2]))
+    gcs_dict['CCSNotInformativeLikelihood'].append(literal(CCSnotInf_triple[2])[0])
+    gcs_dict['PTNotInformativeLikelihood'].append(literal(PTnotInf_triple[2])[0])
+    gcs_dict['EGRActiveLikelihood'].append(literal(EGRActive_triple[2])[0])
+    gcs_dict['EGRPassiveLikelihood'].append(literal(EGRPassive_triple[2])[0])
+    gcs_dict['AGTOncogeneLikelihood'].append(literal(AGTOncog_triple[2])[0])
+    gcs_dict['AGTTSGLikelihood'].append(literal(AGTTSG_triple[2])[0])
+    # Extract related sentences
+    extract_gcs_sentence(dump, gcs_sentence_dict, logger, str(gcs_uri), sentence_classes)
+    logger.debug(f"+++ GCS {gcs_id} COMPLETED +++")
+    return gcs_dict['hasType'][-1]
+
+
+def extract_facts_single_pass(dump_path, logger):
+    """
+    Extract GCS facts and their sentences reading the dump only once.
+
+    Triples are grouped by subject while the dump is parsed, hence the output is the same as the search mode
+    (extract_facts_chunked: GCS facts and sentences follow the order in which they appear in the dump) without
+    searching the dump for every GCS and sentence.
+
+    :param dump_path: (str) path to the dump file.
+    :param logger: (logging.Logger) logger.
+    :return: (pandas.DataFrame, pandas.DataFrame) gcs and gcs_sentence tables.
+    """
+    logger.info(f"...Parsing the dump {dump_path}")
+    groups = SubjectGroups()
+    progress = ProgressReporter(logger, "Parsed triples", unit="triples")
+    for s, p, o in lightrdf.Parser().parse(dump_path, base_iri=None):
+        groups.add(s, p, o)
+        progress.update()
+    progress.close()
+    logger.info(f"...Found {len(groups.gcs_uris)} GCS facts")
+    return groups.to_tables()
+
+
+class SubjectGroups:
+    """
+    Triples of the dump relevant to the gcs and gcs_sentence tables, grouped by subject.
+    """
+    GCS_PREDICATES = {predicate for _, predicate, _ in GCS_PROPERTIES}
+
+    def __init__(self):
+        """
+        Initialisation function.
+        """
+        self.gcs_uris = []
+        self.gcs_info = defaultdict(dict)
+        self.gcs_sentences = defaultdict(list)
+        self.sentence_labels = defaultdict(dict)
+
+    def add(self, s, p, o):
+        """
+        Group a triple (as returned by lightRDF) under its subject.
+        """
+        if p == RDF + 'type>':
+            if o == CEONTO + 'GCS>':
+                self.gcs_uris.append(s)
+        elif p == CEONTO + 'supportedBy>':
+            self.gcs_sentences[s].append(o)
+        elif p in self.GCS_PREDICATES:
+            # keep the first value, as the search based extraction does
+            self.gcs_info[s].setdefault(p, o)
+        elif p in SENTENCE_LABELS:
+            self.sentence_labels[s].setdefault(p, literal(o)[0])
+
+    def merge(self, other):
+        """
+        Append the groups of triples that follow, in the dump, the ones already grouped.
+
+        :param other: (SubjectGroups) groups of the following part of the dump.
+        """
+        self.gcs_uris.extend(other.gcs_uris)
+        for gcs_uri, info in other.gcs_info.items():
+            for p, o in info.items():
+                self.gcs_info[gcs_uri].setdefault(p, o)
+        for gcs_uri, sentences in other.gcs_sentences.items():
+            self.gcs_sentences[gcs_uri].extend(sentences)
+        for sentence_uri, labels in other.sentence_labels.items():
+            for p, label in labels.items():
+                self.sentence_labels[sentence_uri].setdefault(p, label)
+
+    def to_tables(self):
+        """
+        Build the gcs and gcs_sentence tables.
+
+        :return: (pandas.DataFrame, pandas.DataFrame) gcs and gcs_sentence tables.
+        """
+        # convert output to DataFrame
+        gcs_dict = defaultdict(list)
+        gcs_sentence_dict = defaultdict(list)
+        for gcs_uri in self.gcs_uris:
+            gcs_dict['id'].append(iri(gcs_uri))
+            for column, predicate, is_iri in GCS_PROPERTIES:
+                value = self.gcs_info[gcs_uri][predicate]
+                gcs_dict[column].append(iri(value) if is_iri else literal(value)[0])
+            for sentence_uri in self.gcs_sentences[gcs_uri]:
+                labels = self.sentence_labels[sentence_uri]
+                gcs_sentence_dict['gcs'].append(iri(gcs_uri))
+                gcs_sentence_dict['sentence'].append(iri(sentence_uri))
+                gcs_sentence_dict['sentenceClass'].append(
+                    classify_sentence(*[labels[label] for label in SENTENCE_LABELS]))
+        gcs = pd.DataFrame(gcs_dict)
+        gcs_sentence = pd.DataFrame(gcs_sentence_dict)
+        return gcs, gcs_sentence
 
 
 def extract_gene_class(dump, sentence_uri):
@@ -62,6 +194,48 @@ def extract_gene_class(dump, sentence_uri):
     PTLabel = literal(list(dump.search_triples(sentence_uri, CEONTO + 'PTLabel>', None))[0][2])[0]
     CCSLabel = literal(list(dump.search_triples(sentence_uri, CEONTO + 'CCSLabel>', None))[0][2])[0]
     CGELabel = literal(list(dump.search_triples(sentence_uri, CEONTO + 'CGELabel>', None))[0][2])[0]
+    return classify_sentence(PTLabel, CCSLabel, CGELabel)
+
+
+def build_sentence_classes(dump_path, logger, index=None):
+    """
+    Classify every sentence of the dump, reading the dump only once, or looking up the labels in its index.
+
+    Sentences missing any of the PT, CCS and CGE labels are left out of the index.
+
+    :param dump_path: (str) path to the dump file.
+    :param logger: (logging.Logger) logger.
+    :param index: (TripleIndex) index of the dump (see triple_index), None to parse the dump.
+    :return: (dict) gene class (or None) of each sentence, keyed by the sentence URI as returned by lightRDF.
+    """
+    if index is not None:
+        logger.info(f"...Looking up the sentence labels in the index of {dump_path}")
+        triples = (triple for label in SENTENCE_LABELS for triple in index.search_triples(None, label, None))
+    else:
+        logger.info(f"...Indexing the sentence labels of {dump_path}")
+        triples = lightrdf.Parser().parse(dump_path, base_iri=None)
+    sentence_labels = defaultdict(dict)
+    for s, p, o in triples:
+        if p in SENTENCE_LABELS:
+            sentence_labels[s].setdefault(p, literal(o)[0])
+    sentence_classes = {}
+    for sentence_uri, labels in sentence_labels.items():
+        if len(labels) == len(SENTENCE_LABELS):
+            sentence_classes[sentence_uri] = classify_sentence(*[labels[label] for label in SENTENCE_LABELS])
+    logger.info(f"...Indexed {len(sentence_classes)} sentences")
+    return sentence_classes
+
+
+@lru_cache(maxsize=None)
+def classify_sentence(PTLabel, CCSLabel, CGELabel):
+    """
+    Decide the gene class supported by a sentence given its PT, CCS and CGE labels.
+
+    :param PTLabel: (str) PT label of the sentence.
+    :param CCSLabel: (str) CCS label of the sentence.
+    :param CGELabel: (str) CGE label of the sentence.
+    :return: (str) "BIOMARKER", "ONCOGENE" or "TSG", None if the sentence is not informative.
+    """
     if PTLabel != 'NOTINF':
         # update EGR
         if PTLabel == 'OBSERVATION':
@@ -81,22 +255,25 @@ def extract_gene_class(dump, sentence_uri):
     return None
 
 
-def extract_gcs_sentence(dump, gcs_sentence_dict, logger, gcs_uri):
-    logger.info(f".....Extracting related sentences")
+def extract_gcs_sentence(dump, gcs_sentence_dict, logger, gcs_uri, sentence_classes=None):
+    logger.debug(f".....Extracting related sentences")
     # convert query output to DataFrame
     triples = list(dump.search_triples(gcs_uri, CEONTO + 'supportedBy>', None))
     num_triples = len(triples)
-    logger.info(f"Found {num_triples} related sentences")
+    logger.debug(f"Found {num_triples} related sentences")
     count = 1
     for triple in triples:
-        logger.info(f"Considering sentence # {count} of {num_triples}")
+        logger.debug(f"Considering sentence # {count} of {num_triples}")
         count += 1
         # store gcs URI
         gcs_sentence_dict['gcs'].append(iri(gcs_uri))
         # store sentence associated w/ GCS
         gcs_sentence_dict['sentence'].append(iri(triple[2]))
-        logger.info(f"Extracting gene class for sentence {triple[2]}...")
-        gcs_sentence_dict['sentenceClass'].append(extract_gene_class(dump, triple[2]))
+        logger.debug(f"Extracting gene class for sentence {triple[2]}...")
+        if sentence_classes is not None and triple[2] in sentence_classes:
+            gcs_sentence_dict['sentenceClass'].append(sentence_classes[triple[2]])
+        else:
+            gcs_sentence_dict['sentenceClass'].append(extract_gene_class(dump, triple[2]))
 
     return None
 
@@ -0,0 +1,96 @@
+import io
+import os
+from multiprocessing import Pool
+
+import lightrdf
+
+from Logger import ProgressReporter
+from prepare_dataset.extract_coreKB_facts_lightRDF import SubjectGroups
+
+
+def convert_to_ntriples(dump_path, nt_path, logger):
+    """
+    Convert the dump in N-Triples, i.e., one statement per line, so that it can be split in shards.
+
+    The conversion is skipped if the N-Triples file is newer than the dump.
+
+    :param dump_path: (str) path to the dump file.
+    :param nt_path: (str) path to the N-Triples file.
+    :param logger: (logging.Logger) logger.
+    """
+    if os.path.exists(nt_path) and os.path.getmtime(nt_path) >= os.path.getmtime(dump_path):
+        logger.info(f"...Using the N-Triples dump {nt_path}")
+        return
+    logger.info(f"...Converting the dump {dump_path} in N-Triples")
+    tmp_path = nt_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as nt_file:
+        for s, p, o in lightrdf.Parser().parse(dump_path, base_iri=None):
+            nt_file.write(f"{s} {p} {o} .\n")
+    os.replace(tmp_path, nt_path)
+
+
+def split_ntriples(nt_path, shard_size):
+    """
+    Split an N-Triples file in shards of about shard_size bytes ending at statement boundaries.
+
+    :param nt_path: (str) path to the N-Triples file.
+    :param shard_size: (int) size of each shard in bytes.
+    :return: (list(tuple(int, int))) start and end offset of each shard.
+    """
+    file_size = os.path.getsize(nt_path)
+    offsets = [0]
+    with open(nt_path, "rb") as nt_file:
+        while offsets[-1] < file_size:
+            nt_file.seek(min(offsets[-1] + shard_size, file_size))
+            # move to the end of the current statement
+            nt_file.readline()
+            offsets.append(min(nt_file.tell(), file_size))
+    return [(nt_path, start, end) for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def extract_shard(shard):
+    """
+    Group the triples of a shard of the N-Triples dump.
+
+    :param shard: (tuple(str, int, int)) path to the N-Triples file, start and end offset of the shard.
+    :return: (SubjectGroups) triples of the shard grouped by subject.
+    """
+    nt_path, start, end = shard
+    with open(nt_path, "rb") as nt_file:
+        nt_file.seek(start)
+        data = io.BytesIO(nt_file.read(end - start))
+    groups = SubjectGroups()
+    for s, p, o in lightrdf.Parser().parse(data, format="nt"):
+        groups.add(s, p, o)
+    return groups
+
+
+def extract_facts_parallel(dump_path, nt_path, logger, workers=None, shard_size=64 * 1024 * 1024):
+    """
+    Extract GCS facts and their sentences splitting the dump in shards processed by a pool of workers.
+
+    Shards are merged in the order they appear in the dump, hence the output is the same as
+    extract_facts_single_pass.
+
+    :param dump_path: (str) path to the dump file.
+    :param nt_path: (str) path to the N-Triples version of the dump (created if missing).
+    :param logger: (logging.Logger) logger.
+    :param workers: (int) number of worker processes, all the available cores if None.
+    :param shard_size: (int) size of each shard in bytes.
+    :return: (pandas.DataFrame, pandas.DataFrame) gcs and gcs_sentence tables.
+    """
+    if not dump_path.endswith(".nt"):
+        convert_to_ntriples(dump_path, nt_path, logger)
+    else:
+        nt_path = dump_path
+    shards = split_ntriples(nt_path, shard_size)
+    logger.info(f"...Extracting {len(shards)} shards with {workers or os.cpu_count()} workers")
+    groups = SubjectGroups()
+    progress = ProgressReporter(logger, "Extracted shards", total=len(shards), unit="shards")
+    with Pool(workers) as pool:
+        for shard_groups in pool.imap(extract_shard, shards):
+            groups.merge(shard_groups)
+            progress.update()
+    progress.close()
+    logger.info(f"...Found {len(groups.gcs_uris)} GCS facts")
+    return groups.to_tables()
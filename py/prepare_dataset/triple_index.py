@@ -0,0 +1,243 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from array import array
+from functools import lru_cache
+
+import lightrdf
+import numpy as np
+
+INDEX_VERSION = 1
+
+
+class TripleIndex:
+    """
+    Compact on-disk index of the triples of a dump, memory-mapped when opened.
+
+    Terms are dictionary-encoded (ids follow the sorted order of the terms) and triples are stored in two
+    permutations: sorted by subject (SPO) and by predicate and object (POS). Both permutations keep the dump
+    order among triples sharing the same key, hence search_triples returns triples in the same order as
+    lightrdf.RDFDocument and the index can replace the dump document in the search extraction.
+    """
+
+    SPO = ["spo_s", "spo_p", "spo_o"]
+    POS = ["pos_p", "pos_o", "pos_s", "pos_position"]
+
+    def __init__(self, index_dir):
+        """
+        Open (memory-map) an index.
+
+        :param index_dir: (str) directory containing the index.
+        """
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, "meta.json")) as meta_file:
+            self.meta = json.load(meta_file)
+        self.terms = np.load(os.path.join(index_dir, "terms.npy"), mmap_mode="r")
+        self.term_offsets = np.load(os.path.join(index_dir, "term_offsets.npy"), mmap_mode="r")
+        for column in self.SPO + self.POS:
+            setattr(self, column, np.load(os.path.join(index_dir, f"{column}.npy"), mmap_mode="r"))
+        self.term = lru_cache(maxsize=1 << 16)(self._decode)
+
+    def __len__(self):
+        return len(self.spo_s)
+
+    @classmethod
+    def load_or_build(cls, dump_path, index_dir, logger, verify_hash=False):
+        """
+        Open the index of a dump, (re)building it if missing or if the dump changed since it was built.
+
+        The dump is considered unchanged if its size and mtime match the ones recorded in the index. When only
+        the mtime differs (or verify_hash is set), the SHA-256 of the dump is compared as well.
+
+        :param dump_path: (str) path to the dump file.
+        :param index_dir: (str) directory containing the index.
+        :param logger: (logging.Logger) logger.
+        :param verify_hash: (bool) whether to always compare the hash of the dump.
+        :return: (TripleIndex) index of the dump.
+        """
+        meta_path = os.path.join(index_dir, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+            stat = os.stat(dump_path)
+            if meta.get("version") == INDEX_VERSION and meta["size"] == stat.st_size:
+                if meta["mtime"] == stat.st_mtime and not verify_hash:
+                    logger.info(f"...Using the index {index_dir}")
+                    return cls(index_dir)
+                if _file_hash(dump_path) == meta["sha256"]:
+                    logger.info(f"...Using the index {index_dir} (dump content unchanged)")
+                    meta["mtime"] = stat.st_mtime
+                    _write_meta(index_dir, meta)
+                    return cls(index_dir)
+            logger.info(f"...The dump {dump_path} changed, rebuilding the index {index_dir}")
+        cls.build(dump_path, index_dir, logger)
+        return cls(index_dir)
+
+    @classmethod
+    def build(cls, dump_path, index_dir, logger):
+        """
+        Build the index of a dump, reading the dump once.
+
+        :param dump_path: (str) path to the dump file.
+        :param index_dir: (str) directory where the index is stored (replaced if existing).
+        :param logger: (logging.Logger) logger.
+        """
+        logger.info(f"...Indexing the dump {dump_path} in {index_dir}")
+        stat = os.stat(dump_path)
+        term_ids = {}
+        triples = array("Q")
+        for triple in lightrdf.Parser().parse(dump_path, base_iri=None):
+            for term in triple:
+                triples.append(term_ids.setdefault(term, len(term_ids)))
+        logger.info(f"...Parsed {len(triples) // 3} triples with {len(term_ids)} distinct terms")
+
+        # ids follow the sorted order of the (UTF-8 encoded) terms, so that terms can be searched by bisection
+        encoded_terms = [term.encode("utf-8") for term in term_ids]
+        del term_ids
+        order = sorted(range(len(encoded_terms)), key=encoded_terms.__getitem__)
+        id_dtype = np.uint32 if len(encoded_terms) < 2 ** 32 and len(triples) // 3 < 2 ** 32 else np.uint64
+        remap = np.empty(len(encoded_terms), dtype=id_dtype)
+        remap[np.asarray(order, dtype=np.int64)] = np.arange(len(encoded_terms), dtype=id_dtype)
+        sorted_terms = [encoded_terms[i] for i in order]
+        del encoded_terms, order
+        term_offsets = np.zeros(len(sorted_terms) + 1, dtype=np.uint64)
+        np.cumsum([len(term) for term in sorted_terms], out=term_offsets[1:])
+        terms = np.frombuffer(b"".join(sorted_terms), dtype=np.uint8)
+        del sorted_terms
+
+        spo = remap[np.frombuffer(triples, dtype=np.uint64).reshape(-1, 3)]
+        del triples, remap
+        position = np.arange(len(spo), dtype=id_dtype)
+        # stable sorts keep the dump order among triples with the same key
+        spo_order = np.argsort(spo[:, 0], kind="stable")
+        pos_order = np.lexsort((spo[:, 2], spo[:, 1]))
+
+        tmp_dir = index_dir.rstrip("/") + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        np.save(os.path.join(tmp_dir, "terms.npy"), terms)
+        np.save(os.path.join(tmp_dir, "term_offsets.npy"), term_offsets)
+        for column, values in zip(cls.SPO, [spo[spo_order, 0], spo[spo_order, 1], spo[spo_order, 2]]):
+            np.save(os.path.join(tmp_dir, f"{column}.npy"), values)
+        for column, values in zip(cls.POS, [spo[pos_order, 1], spo[pos_order, 2], spo[pos_order, 0],
+                                            position[pos_order]]):
+            np.save(os.path.join(tmp_dir, f"{column}.npy"), values)
+        _write_meta(tmp_dir, {"version": INDEX_VERSION, "source": os.path.abspath(dump_path),
+                              "size": stat.st_size, "mtime": stat.st_mtime, "sha256": _file_hash(dump_path),
+                              "triples": len(spo), "terms": len(term_offsets) - 1})
+        shutil.rmtree(index_dir, ignore_errors=True)
+        os.replace(tmp_dir, index_dir)
+        logger.info(f"...Index stored in {index_dir}")
+
+    def _decode(self, term_id):
+        return self.terms[self.term_offsets[term_id]:self.term_offsets[term_id + 1]].tobytes().decode("utf-8")
+
+    def term_id(self, term):
+        """
+        Get the id of a term.
+
+        :param term: (str) term as returned by lightRDF (e.g., <http://...>), plain IRIs are accepted as well.
+        :return: (int) id of the term, None if the term is not in the dump.
+        """
+        if not term.startswith(("<", '"', "_:")):
+            term = f"<{term}>"
+        encoded = term.encode("utf-8")
+        n_terms = len(self.term_offsets) - 1
+        # bisection over the sorted terms (bisect only takes a key from Python 3.10)
+        term_id, hi = 0, n_terms
+        while term_id < hi:
+            mid = (term_id + hi) // 2
+            if self._encoded(mid) < encoded:
+                term_id = mid + 1
+            else:
+                hi = mid
+        if term_id < n_terms and self._encoded(term_id) == encoded:
+            return term_id
+        return None
+
+    def _encoded(self, term_id):
+        return self.terms[self.term_offsets[term_id]:self.term_offsets[term_id + 1]].tobytes()
+
+    def search_triples(self, s, p, o):
+        """
+        Search the triples matching a pattern, in dump order (same interface as lightrdf.RDFDocument).
+
+        :param s: (str) subject, None matches any subject.
+        :param p: (str) predicate, None matches any predicate.
+        :param o: (str) object, None matches any object.
+        :return: (generator(tuple(str, str, str))) matching triples.
+        """
+        pattern = [None if term is None else self.term_id(term) for term in (s, p, o)]
+        if any(term is not None and term_id is None for term, term_id in zip((s, p, o), pattern)):
+            # a bound term is not in the dump
+            return
+        s_id, p_id, o_id = pattern
+        if s_id is not None:
+            lo, hi = _equal_range(self.spo_s, s_id)
+            rows = zip(self.spo_p[lo:hi].tolist(), self.spo_o[lo:hi].tolist())
+            for row_p, row_o in rows:
+                if (p_id is None or row_p == p_id) and (o_id is None or row_o == o_id):
+                    yield self.term(s_id), self.term(row_p), self.term(row_o)
+        elif p_id is not None:
+            lo, hi = _equal_range(self.pos_p, p_id)
+            if o_id is not None:
+                o_lo, o_hi = _equal_range(self.pos_o[lo:hi], o_id)
+                lo, hi = lo + o_lo, lo + o_hi
+            else:
+                # restore the dump order, triples with the same predicate are sorted by object
+                order = np.argsort(self.pos_position[lo:hi], kind="stable")
+                for i in (lo + order).tolist():
+                    yield self.term(int(self.pos_s[i])), self.term(p_id), self.term(int(self.pos_o[i]))
+                return
+            for row_s in self.pos_s[lo:hi].tolist():
+                yield self.term(row_s), self.term(p_id), self.term(o_id)
+        else:
+            order = np.argsort(self.pos_position, kind="stable")
+            for i in order.tolist():
+                if o_id is None or self.pos_o[i] == o_id:
+                    yield self.term(int(self.pos_s[i])), self.term(int(self.pos_p[i])), self.term(int(self.pos_o[i]))
+
+    def describe(self, uri):
+        """
+        Get the triples having the given resource as subject (e.g., a GCS fact or a sentence).
+
+        :param uri: (str) URI of the resource.
+        :return: (list(tuple(str, str, str))) triples of the resource, in dump order.
+        """
+        return list(self.search_triples(uri, None, None))
+
+
+def _equal_range(values, value):
+    """
+    Range of the positions of value in a sorted array.
+    """
+    return int(np.searchsorted(values, value, side="left")), int(np.searchsorted(values, value, side="right"))
+
+
+def _file_hash(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 24), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _write_meta(index_dir, meta):
+    with open(os.path.join(index_dir, "meta.json"), "w") as meta_file:
+        json.dump(meta, meta_file, indent=2)
+
+
+if __name__ == "__main__":
+    import logging
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build or query the triple index of the CORE-KB dump.")
+    parser.add_argument("dump", help="path to the dump file")
+    parser.add_argument("index", help="directory of the index")
+    parser.add_argument("uris", nargs="*", help="GCS or sentence URIs to look up")
+    args = parser.parse_args()
+    index = TripleIndex.load_or_build(args.dump, args.index, logging.getLogger())
+    for uri in args.uris:
+        for triple in index.describe(uri):
+            print(" ".join(triple) + " .")
@@ -1,3 +1,4 @@
+import argparse
 import gc
 
 import lightrdf
@@ -8,7 +9,19 @@ from datetime import datetime
 import pandas as pd
 from collections import defaultdict
 
-from prepare_dataset.extract_coreKB_facts_lightRDF import extract_facts
+from prepare_dataset.extract_coreKB_facts_lightRDF import extract_facts_chunked, extract_facts_single_pass, \
+    build_sentence_classes, GCS_PROPERTIES
+from prepare_dataset.chunked_output import ChunkedCSVWriter
+from prepare_dataset.parallel_extraction import extract_facts_parallel
+from prepare_dataset.columnar import typed_gcs, typed_gcs_sentence, to_parquet
+from prepare_dataset.triple_index import TripleIndex
+
+EXTRACTION_MODES = ["single_pass", "parallel", "search", "index"]
+
+parser = argparse.ArgumentParser(description="Extract GCS facts and sentences from the CORE-KB dump.")
+parser.add_argument("--resume", action="store_true",
+                    help="resume an interrupted search extraction from its checkpoint")
+args = parser.parse_args()
 
 # Logger
 Logger = DebugLogger(name="preprocess",
@@ -24,20 +37,64 @@ config.read(properties_file)
 
 datadir = config["PATHS"]["datadir"]
 
-# Load dump graph into memory
-dump = lightrdf.RDFDocument(datadir+config["PATHS.DATASET"]["ttl"])
+dump_path = datadir+config["PATHS.DATASET"]["ttl"]
+
+mode = config["EXTRACTION"]["mode"]
+if mode not in EXTRACTION_MODES:
+    raise ValueError(f"Unknown extraction mode {mode} (expected one of {EXTRACTION_MODES})")
 
 Logger.logger.info(f"+++ Extracting GCS facts and sentences from dump +++")
-gcs, gcs_sentence = extract_facts(dump, Logger.logger)
+output_formats = config["OUTPUT"]["formats"].split(",")
+if mode == "single_pass":
+    gcs, gcs_sentence = extract_facts_single_pass(dump_path, Logger.logger)
+elif mode == "parallel":
+    gcs, gcs_sentence = extract_facts_parallel(dump_path, datadir+config["PATHS.DATASET"]["nt"], Logger.logger,
+                                               workers=config["EXTRACTION"].getint("workers") or None,
+                                               shard_size=config["EXTRACTION"].getint("shard_size"))
+else:
+    # GCS facts and sentences are appended to the CSV files while they are extracted
+    if mode == "index":
+        # search the memory-mapped index of the dump (built once) instead of re-parsing the dump
+        dump = TripleIndex.load_or_build(dump_path, datadir+config["PATHS.DATASET"]["index"], Logger.logger,
+                                         verify_hash=config["EXTRACTION"].getboolean("verify_hash"))
+        index = dump
+    else:
+        dump = lightrdf.RDFDocument(dump_path)
+        index = None
+    writer = ChunkedCSVWriter(datadir+config["PATHS.OUTPUT"]["gcs"], datadir+config["PATHS.OUTPUT"]["gcs_sentence"],
+                              datadir+config["PATHS.OUTPUT"]["checkpoint"],
+                              ["id"] + [column for column, _, _ in GCS_PROPERTIES], ["gcs", "sentence", "sentenceClass"],
+                              chunk_size=config["OUTPUT"].getint("chunk_size"), resume=args.resume)
+    if writer.last_gcs:
+        Logger.logger.info(f"Resuming after GCS {writer.last_gcs} ({writer.gcs_count} GCS facts already stored)")
+    # classify all the sentences at once instead of searching their labels for every GCS (from the index, if any,
+    # instead of parsing the dump again)
+    sentence_classes = build_sentence_classes(dump_path, Logger.logger, index)
+    extract_facts_chunked(dump, writer, Logger.logger, sentence_classes)
+    gcs, gcs_sentence = None, None
+    if "parquet" in output_formats:
+        gcs = pd.read_csv(datadir+config["PATHS.OUTPUT"]["gcs"], index_col=False, dtype=str)
+        gcs_sentence = pd.read_csv(datadir+config["PATHS.OUTPUT"]["gcs_sentence"], index_col=False, dtype=str)
 Logger.logger.info(f"Finish test at {datetime.now()}")
-Logger.logger.info(f"+++ Saving GCS facts in a CSV file +++")
-gcs.to_csv(datadir+config["PATHS.OUTPUT"]["gcs"], index=False)
+# the search and index extractions already stored the CSV files
+store_csv = "csv" in output_formats and mode not in ("search", "index")
+
+if store_csv:
+    Logger.logger.info(f"+++ Saving GCS facts in a CSV file +++")
+    gcs.to_csv(datadir+config["PATHS.OUTPUT"]["gcs"], index=False)
+if "parquet" in output_formats:
+    Logger.logger.info(f"+++ Saving GCS facts in a Parquet file +++")
+    to_parquet(typed_gcs(gcs), datadir+config["PATHS.OUTPUT"]["gcs_parquet"])
 
 # delete GCS dataframe to reduce memory consumption
 del gcs
 gc.collect()
 
-Logger.logger.info(f"+++ Saving sentences supporting GCS facts in a CSV file +++")
-gcs_sentence.to_csv(datadir+config["PATHS.OUTPUT"]["gcs_sentence"], index=False)
+if store_csv:
+    Logger.logger.info(f"+++ Saving sentences supporting GCS facts in a CSV file +++")
+    gcs_sentence.to_csv(datadir+config["PATHS.OUTPUT"]["gcs_sentence"], index=False)
+if "parquet" in output_formats:
+    Logger.logger.info(f"+++ Saving sentences supporting GCS facts in a Parquet file +++")
+    to_parquet(typed_gcs_sentence(gcs_sentence), datadir+config["PATHS.OUTPUT"]["gcs_sentence_parquet"])
 
 Logger.logger.info(f'-----\nDataset preparation completed at {datetime.now()}\n-----')
\ No newline at end of file
@@ -1,13 +1,33 @@
+import argparse
 from datetime import datetime
 from Logger import DebugLogger
 from CoreNanopub.CoreNanopub import CoreNanopub
 
+parser = argparse.ArgumentParser(description="Serialize CORE-KB's GCS facts as extended nanopublications.")
+parser.add_argument("--delta", action="store_true",
+                    help="serialize only the GCS facts added or changed since the previous release")
+parser.add_argument("--retract", action="store_true",
+                    help="with --delta, retract the removed GCS facts and supersede the changed ones")
+parser.add_argument("--workers", type=int, default=1,
+                    help="number of processes serializing the nanopublications in parallel")
+parser.add_argument("--chunk-size", type=int, default=1000,
+                    help="number of GCS facts assigned to a process at a time")
+parser.add_argument("--sign", action="store_true",
+                    help="sign the nanopublications and store their trusty URIs")
+parser.add_argument("--partitions", type=int, default=0,
+                    help="split the facts and sentences into partitions serialized one at a time (bounded memory)")
+parser.add_argument("--profile", action="store_true",
+                    help="record the time of each stage of the serialization and store a report (see PROFILING)")
+args = parser.parse_args()
+
 # Logger
 Logger = DebugLogger("full")
 
 Logger.logger.info(f'-----\nCORE NANOPUB SERIALIZATION (run: {datetime.now()})\n-----')
 
 # Nanopubs creation and serialization
-npg = CoreNanopub().create_nanopub_graphs(sample=False)
+npg = CoreNanopub().create_nanopub_graphs(sample=False, delta=args.delta, retract=args.retract,
+                                         workers=args.workers, chunk_size=args.chunk_size, sign=args.sign,
+                                         partitions=args.partitions, profile=args.profile)
 
 Logger.logger.info(f'-----\nCORE NANOPUB SERIALIZATION COMPLETED at {datetime.now()}\n-----')